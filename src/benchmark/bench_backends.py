@@ -0,0 +1,81 @@
+"""
+추론 백엔드(keras / tflite / onnx)별 콜드 스타트 시간, 처리량, 최대 메모리(RSS)를 비교합니다.
+백엔드마다 별도 프로세스에서 실행해서 서로의 메모리 사용량이 섞이지 않도록 합니다.
+
+사용 예:
+    python src/benchmark/bench_backends.py --backends keras tflite onnx
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(SRC_DIR)
+
+DEFAULT_MODEL_PATH = os.path.join(SRC_DIR, "model/models/kfood_model.keras")
+DEFAULT_INDICES_PATH = os.path.join(SRC_DIR, "model/models/indices-fine-20250827-161229.json")
+
+
+def peak_rss_mb():
+    try:
+        import resource
+        # 리눅스는 KB, macOS는 byte 단위입니다.
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+
+
+def run_worker(backend, model_path, indices_path, images, batch_size):
+    start = time.perf_counter()
+    import numpy as np
+    from service.model_registry import get_classifier
+
+    classifier = get_classifier(model_path, indices_path, backend=backend)
+    cold_start = time.perf_counter() - start
+
+    data = np.random.default_rng(0).random((images,) + classifier.input_shape, dtype=np.float32)
+    start = time.perf_counter()
+    for i in range(0, images, batch_size):
+        classifier.predict_proba(data[i:i + batch_size])
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "backend": backend,
+        "cold_start_s": cold_start,
+        "images_per_s": images / elapsed,
+        "peak_rss_mb": peak_rss_mb(),
+    }))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--indices", default=DEFAULT_INDICES_PATH)
+    parser.add_argument("--backends", nargs="+", default=["keras", "tflite"])
+    parser.add_argument("--images", type=int, default=128)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.model, args.indices, args.images, args.batch_size)
+        sys.exit(0)
+
+    print(f"{'backend':<8} {'cold start':>11} {'images/s':>10} {'peak RSS':>10}")
+    for backend in args.backends:
+        output = subprocess.run(
+            [sys.executable, __file__, "--worker", backend, "--model", args.model, "--indices", args.indices,
+             "--images", str(args.images), "--batch-size", str(args.batch_size)],
+            capture_output=True, text=True,
+        )
+        if output.returncode != 0:
+            print(f"{backend:<8} 실행 실패: {output.stderr.strip().splitlines()[-1:]}")
+            continue
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        print(f"{backend:<8} {result['cold_start_s']:>10.2f}s {result['images_per_s']:>10.1f} "
+              f"{result['peak_rss_mb']:>8.0f}MB")
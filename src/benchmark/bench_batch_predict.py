@@ -0,0 +1,74 @@
+"""
+배치 크기별(1/8/32) 분류 처리량과 마이크로 배처의 동시 요청 처리량을 측정합니다.
+
+사용 예:
+    python src/benchmark/bench_batch_predict.py --images 256
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(SRC_DIR)
+from service.model_registry import get_classifier
+from service.predict import predict_batch
+from service.batcher import MicroBatcher
+
+DEFAULT_MODEL_PATH = os.path.join(SRC_DIR, "model/models/kfood_model.keras")
+DEFAULT_INDICES_PATH = os.path.join(SRC_DIR, "model/models/indices-fine-20250827-161229.json")
+
+
+def bench_batch_sizes(model_path, indices_path, images, batch_sizes):
+    rng = np.random.default_rng(0)
+    data = rng.random((images, 224, 224, 3), dtype=np.float32)
+
+    # 모델 로드와 첫 호출 비용은 측정에서 제외합니다.
+    get_classifier(model_path, indices_path)
+    predict_batch(data[:1], model_path, indices_path)
+
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        for i in range(0, images, batch_size):
+            predict_batch(data[i:i + batch_size], model_path, indices_path)
+        elapsed = time.perf_counter() - start
+        print(f"batch={batch_size:>3}: {images / elapsed:8.1f} images/sec ({elapsed:.2f}s)")
+
+
+def bench_micro_batcher(model_path, indices_path, images, clients, max_batch_size, max_wait_ms):
+    rng = np.random.default_rng(0)
+    data = rng.random((images, 1, 224, 224, 3), dtype=np.float32)
+    batcher = MicroBatcher(model_path, indices_path, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    batcher.predict(data[0])
+
+    def client(offset):
+        for i in range(offset, images, clients):
+            batcher.predict(data[i])
+
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    batcher.close()
+
+    stats = batcher.stats()
+    print(f"micro-batcher clients={clients} max_batch={max_batch_size} wait={max_wait_ms}ms: "
+          f"{images / elapsed:8.1f} images/sec, 평균 배치 {stats['avg_batch_size']:.1f}장")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--indices", default=DEFAULT_INDICES_PATH)
+    parser.add_argument("--images", type=int, default=256)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=int, default=10)
+    args = parser.parse_args()
+
+    bench_batch_sizes(args.model, args.indices, args.images, [1, 8, 32])
+    bench_micro_batcher(args.model, args.indices, args.images, args.clients, 32, args.max_wait_ms)
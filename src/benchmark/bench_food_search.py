@@ -0,0 +1,109 @@
+"""
+음식명 검색을 기존 방식(REPLACE ... LIKE '%x%' 전체 스캔)과 검색 인덱스 방식으로 비교합니다.
+분류 클래스 이름 전체를 검색해서 두 방식의 결과 순서가 같은지도 확인합니다.
+이름마다 검색해서 행을 고르는 방식과 일괄 조회 쿼리(build_batch_search_query)의 선택 결과와 속도도 비교합니다.
+
+DB에 검색 인덱스가 없으면 먼저 만들어야 합니다: python src/db/search_index.py
+
+사용 예:
+    python src/benchmark/bench_food_search.py --db food_nutrition.db
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(os.path.join(SRC_DIR, '..'))
+sys.path.append(SRC_DIR)
+from src.db.search_index import has_search_index, build_search_query, build_batch_search_query, like_escape
+from src.db.database import search_food_rows, choose_food_data
+from service.predict import convert_class_name_db
+
+DEFAULT_DB_PATH = os.path.join(SRC_DIR, '../food_nutrition.db')
+DEFAULT_INDICES_PATH = os.path.join(SRC_DIR, "model/models/indices-fine-20250827-161229.json")
+
+# 기존 전체 스캔 쿼리. 인덱스 검색과 같이 '%', '_'는 글자 그대로 비교합니다.
+LEGACY_QUERY = """
+    SELECT rowid
+    FROM FOOD_NUTRITION
+    WHERE REPLACE(FOOD_NAME, ' ', '') LIKE ? ESCAPE '\\'
+    ORDER BY
+        CASE
+            WHEN REPLACE(FOOD_NAME, ' ', '') LIKE ? ESCAPE '\\' THEN 1
+            WHEN REPLACE(FOOD_NAME, ' ', '') LIKE ? ESCAPE '\\' THEN 2
+            ELSE 3
+        END,
+        rowid
+"""
+
+
+def legacy_search(conn, food_name):
+    like_name = like_escape(food_name)
+    return [row[0] for row in conn.execute(LEGACY_QUERY, (f'%{like_name}%', f'{like_name}%', f'%{like_name}%'))]
+
+
+def indexed_search(conn, food_name):
+    query, param = build_search_query(food_name)
+    return [row["rowid"] for row in conn.execute(query.replace("SELECT f.*", "SELECT f.rowid AS rowid", 1), param)]
+
+
+def chosen_rows_single(conn, food_names):
+    return {name: choose_food_data(search_food_rows(conn.cursor(), name)) for name in food_names}
+
+
+def chosen_rows_batch(conn, food_names):
+    query, params = build_batch_search_query(food_names)
+    results = dict.fromkeys(food_names)
+    for row in conn.execute(query, params):
+        food_data = dict(row)
+        results[food_names[food_data.pop("query_index")]] = food_data
+    return results
+
+
+def bench(name, fn, conn, food_names, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for food_name in food_names:
+            fn(conn, food_name)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<8} {elapsed / (repeat * len(food_names)) * 1000:8.3f}ms/lookup")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--indices", default=DEFAULT_INDICES_PATH)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    conn.row_factory = sqlite3.Row
+    if not has_search_index(conn):
+        print("오류: 검색 인덱스가 없습니다. 먼저 python src/db/search_index.py 를 실행해주세요.")
+        sys.exit(1)
+
+    with open(args.indices, "r", encoding="utf-8") as f:
+        food_names = sorted({convert_class_name_db(name) for name in json.load(f)})
+
+    rows = conn.execute("SELECT COUNT(*) FROM food_nutrition").fetchone()[0]
+    print(f"food_nutrition {rows}건, 검색어 {len(food_names)}개")
+
+    different = [name for name in food_names if legacy_search(conn, name) != indexed_search(conn, name)]
+    print(f"결과 순서가 다른 검색어: {len(different)}개 {different[:10]}")
+
+    bench("legacy", legacy_search, conn, food_names, args.repeat)
+    bench("indexed", indexed_search, conn, food_names, args.repeat)
+
+    different = [name for name, row in chosen_rows_batch(conn, food_names).items()
+                 if row != chosen_rows_single(conn, [name])[name]]
+    print(f"선택 결과가 다른 검색어(일괄 조회): {len(different)}개 {different[:10]}")
+
+    for name, fn in [("single", chosen_rows_single), ("batch", chosen_rows_batch)]:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            fn(conn, food_names)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<8} {elapsed / (args.repeat * len(food_names)) * 1000:8.3f}ms/name ({len(food_names)}개 한 번에 조회)")
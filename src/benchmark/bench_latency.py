@@ -0,0 +1,48 @@
+"""
+배치 크기 1에서 model.predict()와 tf.function 직접 호출의 지연 시간(p50/p95)을 비교합니다.
+
+사용 예:
+    python src/benchmark/bench_latency.py --runs 200
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(SRC_DIR)
+from service.model_registry import get_classifier
+
+DEFAULT_MODEL_PATH = os.path.join(SRC_DIR, "model/models/kfood_model.keras")
+DEFAULT_INDICES_PATH = os.path.join(SRC_DIR, "model/models/indices-fine-20250827-161229.json")
+
+
+def measure(fn, img_array, runs):
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(img_array)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--indices", default=DEFAULT_INDICES_PATH)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    # 레지스트리가 로드 직후 워밍업까지 끝낸 분류기를 돌려줍니다.
+    classifier = get_classifier(args.model, args.indices, backend="keras")
+    model = classifier.backend.model
+    img_array = np.random.default_rng(0).random((1,) + classifier.input_shape, dtype=np.float32)
+
+    model.predict(img_array, verbose=0)
+    before = measure(lambda x: model.predict(x, verbose=0), img_array, args.runs)
+    after = measure(classifier.predict_proba, img_array, args.runs)
+
+    print(f"model.predict()      p50={before[0]:7.2f}ms p95={before[1]:7.2f}ms")
+    print(f"tf.function 직접 호출 p50={after[0]:7.2f}ms p95={after[1]:7.2f}ms")
+    print(f"p50 개선: {before[0] / after[0]:.1f}x")
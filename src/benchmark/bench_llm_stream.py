@@ -0,0 +1,52 @@
+"""
+LLM 영양 분석의 체감 지연 시간을 측정합니다. (캐시를 사용하지 않음, OPENAI_API_KEY 필요)
+- score: 건강 점수가 처음 확정될 때까지의 시간 (스트리밍)
+- first_tip: 첫 번째 개선 팁이 나올 때까지의 시간 (스트리밍)
+- full: 전체 응답을 받을 때까지의 시간 (기존 방식과 같은 시점)
+
+사용 예:
+    ANALYSIS_MODE=direct python src/benchmark/bench_llm_stream.py --foods 김치찌개 불고기 --runs 3
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(os.path.join(SRC_DIR, '..'))
+from src.service.food_nutrition_service import stream_analysis_for_ui, get_food_nutrition_info, get_engine
+
+
+def measure(food_name):
+    food_data = get_food_nutrition_info([food_name])
+    start = time.perf_counter()
+    score_at = first_tip_at = None
+    for partial in stream_analysis_for_ui(food_name, food_data, use_cache=False):
+        elapsed = time.perf_counter() - start
+        if score_at is None and partial["score"] is not None:
+            score_at = elapsed
+        if first_tip_at is None and partial["tips"]:
+            first_tip_at = elapsed
+    return score_at, first_tip_at, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--foods", nargs="+", default=["김치찌개", "불고기", "비빔밥"])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    get_engine()
+    results = {"score": [], "first_tip": [], "full": []}
+    for _ in range(args.runs):
+        for food_name in args.foods:
+            for key, value in zip(results, measure(food_name)):
+                if value is not None:
+                    results[key].append(value * 1000)
+
+    for key, values in results.items():
+        if values:
+            print(f"{key:<10} p50 {np.percentile(values, 50):8.0f}ms  p95 {np.percentile(values, 95):8.0f}ms  ({len(values)}회)")
+        else:
+            print(f"{key:<10} 측정값 없음")
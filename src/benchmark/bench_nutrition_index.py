@@ -0,0 +1,69 @@
+"""
+메모리 영양 인덱스(db/nutrition_index.py)와 SQLite 검색의 메모리 사용량과 조회 지연 시간을 비교합니다.
+분류 클래스 이름 전체로 검색해서 두 방식이 같은 행(모든 컬럼 값)을 같은 순서로 반환하는지도 확인합니다.
+
+사용 예:
+    python src/benchmark/bench_nutrition_index.py --db food_nutrition.db
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(os.path.join(SRC_DIR, '..'))
+sys.path.append(SRC_DIR)
+from src.db import database as DB
+from src.db.nutrition_index import NutritionIndex
+from service.predict import convert_class_name_db
+
+DEFAULT_DB_PATH = os.path.join(SRC_DIR, '../food_nutrition.db')
+DEFAULT_INDICES_PATH = os.path.join(SRC_DIR, "model/models/indices-fine-20250827-161229.json")
+
+
+def bench(name, fn, food_names, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for food_name in food_names:
+            fn(food_name)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<22} {elapsed / (repeat * len(food_names)) * 1e6:10.1f}us/lookup")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--indices", default=DEFAULT_INDICES_PATH)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    DB.pool = DB.ConnectionPool(args.db)
+
+    with open(args.indices, "r", encoding="utf-8") as f:
+        food_names = sorted({convert_class_name_db(name) for name in json.load(f)})
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = NutritionIndex.load(args.db)
+    load_seconds = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"인덱스 {index.size}행 로드 {load_seconds:.2f}s")
+    print(f"메모리: 인덱스 유지 {current / 1024 / 1024:.1f}MB (로드 중 최대 {peak / 1024 / 1024:.1f}MB), "
+          f"수치/문자열 데이터 {index.memory_bytes() / 1024 / 1024:.1f}MB, "
+          f"SQLite DB 파일 {os.path.getsize(args.db) / 1024 / 1024:.1f}MB")
+
+    def same_rows(name):
+        # 행 순서뿐 아니라 모든 컬럼 값이 같은지 비교합니다.
+        sqlite_rows = [dict(row) for row in DB.get_food_info_by_name(name)]
+        return sqlite_rows == index.search(name)
+
+    different = [name for name in food_names if not same_rows(name)]
+    print(f"결과가 다른 검색어: {len(different)}개 {different[:10]}")
+
+    bench("sqlite", DB.get_food_info_by_name, food_names, args.repeat)
+    bench("memory index (search)", index.search, food_names, args.repeat)
+    bench("memory index (exact)", index.get_by_name, food_names, args.repeat)
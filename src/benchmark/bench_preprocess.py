@@ -0,0 +1,71 @@
+"""
+12MP(4000x3000) JPEG 기준으로 기존 전처리와 새 전처리(draft 디코딩, float32 직접 출력)의 속도를 비교합니다.
+
+사용 예:
+    python src/benchmark/bench_preprocess.py --images 20
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from PIL import Image
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(SRC_DIR)
+from service.img import get_image_from_uploader, get_images_from_uploader
+
+
+def legacy_get_image_from_uploader(uploaded_file):
+    # 변경 전 service.img 구현 (전체 해상도 디코딩 후 float64로 정규화)
+    img = Image.open(uploaded_file)
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    img = img.resize((224, 224))
+    img_array = np.array(img)
+    img_array = np.expand_dims(img_array, axis=0)
+    img_array = img_array / 255.0
+
+    return img_array
+
+
+def make_jpegs(count, size=(4000, 3000)):
+    # 무늬가 있는 사진과 비슷한 크기의 JPEG를 만듭니다. (단색 이미지는 디코딩이 비현실적으로 빠름)
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 256, (size[1] // 8, size[0] // 8, 3), dtype=np.uint8)
+    img = Image.fromarray(base).resize(size, Image.BILINEAR)
+    jpegs = []
+    for i in range(count):
+        buffer = io.BytesIO()
+        img.rotate(i % 4 * 90, expand=False).save(buffer, format='JPEG', quality=90)
+        jpegs.append(buffer.getvalue())
+    return jpegs
+
+
+def bench(name, fn, jpegs):
+    start = time.perf_counter()
+    fn(jpegs)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {elapsed / len(jpegs) * 1000:8.1f}ms/image")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=20)
+    args = parser.parse_args()
+
+    jpegs = make_jpegs(args.images)
+    print(f"JPEG {len(jpegs)}장, 평균 {sum(map(len, jpegs)) / len(jpegs) / 1024 / 1024:.1f}MB")
+
+    bench("legacy (full decode, f64)", lambda js: [legacy_get_image_from_uploader(io.BytesIO(j)) for j in js], jpegs)
+    bench("get_image_from_uploader", lambda js: [get_image_from_uploader(io.BytesIO(j)) for j in js], jpegs)
+
+    buffer = np.empty((1, 224, 224, 3), dtype=np.float32)
+    bench("  + 버퍼 재사용", lambda js: [get_image_from_uploader(io.BytesIO(j), out=buffer) for j in js], jpegs)
+    bench("get_images_from_uploader", lambda js: get_images_from_uploader([io.BytesIO(j) for j in js]), jpegs)
+
+    legacy = legacy_get_image_from_uploader(io.BytesIO(jpegs[0]))
+    current = get_image_from_uploader(io.BytesIO(jpegs[0]))
+    print(f"출력 dtype/크기: legacy {legacy.dtype} {legacy.nbytes // 1024}KB -> {current.dtype} {current.nbytes // 1024}KB, "
+          f"평균 픽셀 차이 {np.abs(legacy - current).mean():.4f}")
@@ -0,0 +1,60 @@
+"""
+학습 입력 파이프라인의 처리량(images/sec)을 비교합니다.
+- generator: 기존 ImageDataGenerator.flow_from_directory (shear/zoom/flip 증강)
+- tf.data: src/model/train_input.py (병렬 디코딩 + 배치 증강 + cache + prefetch)
+
+tf.data는 첫 에포크(디코딩 + 캐시 생성)와 두 번째 에포크(캐시 사용)를 따로 측정합니다.
+캐시는 데이터셋을 끝까지 읽어야 만들어지므로 tf.data는 항상 전체 에포크를 측정합니다. (작은 폴더로 측정 권장)
+--shards에 file_pre_processing.py --pack으로 같은 데이터를 저장한 shard 폴더를 지정하면 shard 읽기도 측정합니다. (캐시 없음)
+
+사용 예:
+    python src/benchmark/bench_train_input.py --data E:\\AIWork\\Data\\테스트\\valid --shards E:\\AIWork\\Data\\테스트\\valid_shards
+"""
+import os
+import sys
+import time
+import argparse
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(os.path.join(SRC_DIR, 'model'))
+from tensorflow.keras.preprocessing.image import ImageDataGenerator
+from train_input import build_dataset, TARGET_SIZE
+
+
+def measure(iterator, batches):
+    images = 0
+    start = time.perf_counter()
+    for _ in range(batches):
+        try:
+            x, _ = next(iterator)
+        except StopIteration:
+            break
+        images += len(x)
+    elapsed = time.perf_counter() - start
+    return images / elapsed if elapsed else 0.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", required=True, help="클래스별 하위 폴더가 있는 학습 데이터 폴더")
+    parser.add_argument("--shards", default=None, help="같은 데이터를 저장한 shard 폴더")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--batches", type=int, default=None, help="generator로 측정할 배치 수 (기본값: 한 에포크)")
+    args = parser.parse_args()
+
+    generator = ImageDataGenerator(rescale=1. / 255.0, shear_range=0.2, zoom_range=0.2, horizontal_flip=True)
+    flow = generator.flow_from_directory(args.data, target_size=TARGET_SIZE, batch_size=args.batch_size,
+                                         class_mode='categorical', shuffle=True)
+    # flow_from_directory는 끝없이 반복되므로 배치 수를 정해서 측정합니다.
+    print(f"generator       {measure(iter(flow), args.batches or len(flow)):8.1f} images/sec")
+
+    dataset, _ = build_dataset(args.data, batch_size=args.batch_size, training=True)
+    batches = int(dataset.cardinality())
+    print(f"tf.data epoch 1 {measure(iter(dataset), batches):8.1f} images/sec")
+    print(f"tf.data epoch 2 {measure(iter(dataset), batches):8.1f} images/sec (cache)")
+
+    if args.shards:
+        dataset, _ = build_dataset(args.shards, batch_size=args.batch_size, training=True, cache=False)
+        batches = int(dataset.cardinality())
+        # shard 데이터셋은 unbatch를 사용하므로 배치 수를 미리 알 수 없습니다. (-2: UNKNOWN)
+        print(f"shards          {measure(iter(dataset), batches if batches > 0 else 10 ** 9):8.1f} images/sec")
@@ -0,0 +1,128 @@
+"""
+분류 모델의 클래스마다 사용할 영양 DB 행(food_code)을 미리 정해서 DB에 저장합니다.
+
+클래스 목록은 indices JSON으로 고정되어 있으므로, 요청마다 음식명 부분 일치 검색을 하지 않고
+빌드 시점에 한 번만 검색해서 (클래스 -> 식품코드) 매핑을 class_food_resolution 테이블에 저장합니다.
+서비스는 이 매핑으로 food_code 하나만 조회합니다.
+
+- 선택 규칙은 서비스와 같습니다: DB_CONVERT_DIC으로 이름을 바꾼 뒤 검색하고, '외식' 데이터 우선, 없으면 첫 번째 결과
+- DB에 없는 클래스(예: 과메기, 산낙지, 수정과)는 food_code를 비워서 저장하고 목록을 출력합니다.
+- 모델 버전은 indices JSON 파일의 내용 해시이며, 매핑을 만들 때의 데이터셋 버전(dataset_version)도 함께 저장합니다.
+
+사용 예 (DB를 마이그레이션/동기화한 뒤, 또는 모델을 바꾼 뒤 실행):
+    python src/db/class_resolution.py --indices src/model/models/indices-fine-20250827-161229.json
+"""
+import os
+import sys
+import json
+import sqlite3
+import hashlib
+import argparse
+from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.db.database import search_food_rows, choose_food_data
+from src.db.search_index import has_search_index
+from service.predict import convert_class_name_db
+
+DB_PATH = os.path.join(os.path.dirname(__file__), '../../food_nutrition.db')
+INDICES_PATH = os.path.join(os.path.dirname(__file__), '../model/models/indices-fine-20250827-161229.json')
+
+
+def indices_version(indices_path):
+    """indices JSON 파일 내용으로 클래스 목록의 버전을 만듭니다."""
+    with open(indices_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def create_resolution_table(cursor):
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS class_food_resolution (
+            model_version TEXT NOT NULL,
+            class_name TEXT NOT NULL,
+            db_name TEXT NOT NULL,
+            food_code TEXT,
+            food_name TEXT,
+            dataset_version INTEGER,
+            resolved_at TEXT NOT NULL,
+            PRIMARY KEY (model_version, class_name)
+        )
+        """
+    )
+
+
+def resolve_classes(cursor, class_names):
+    """
+    클래스 이름마다 서비스와 같은 규칙으로 DB 행을 고릅니다.
+
+    Returns:
+        list: (클래스명, DB 검색명, 식품코드 또는 None, 식품명 또는 None) 리스트
+    """
+    use_search_index = has_search_index(cursor.connection)
+    resolved = []
+    for class_name in class_names:
+        db_name = convert_class_name_db(class_name)
+        food_data = choose_food_data(search_food_rows(cursor, db_name, use_search_index))
+        if food_data is None:
+            resolved.append((class_name, db_name, None, None))
+        else:
+            resolved.append((class_name, db_name, food_data["food_code"], food_data["food_name"]))
+    return resolved
+
+
+def build_resolution(indices_path=INDICES_PATH, db_path=DB_PATH):
+    with open(indices_path, 'r', encoding='utf-8') as f:
+        class_indices = json.load(f)
+    # 클래스 인덱스 순서대로 처리합니다.
+    class_names = sorted(class_indices, key=class_indices.get)
+    model_version = indices_version(indices_path)
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA busy_timeout=5000")
+    cursor = conn.cursor()
+
+    try:
+        dataset_version = cursor.execute("SELECT MAX(version) FROM dataset_version").fetchone()[0]
+    except sqlite3.Error:
+        dataset_version = None
+
+    resolved = resolve_classes(cursor, class_names)
+    resolved_at = datetime.now().isoformat(timespec='seconds')
+
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        create_resolution_table(cursor)
+        cursor.execute("DELETE FROM class_food_resolution WHERE model_version = ?", (model_version,))
+        cursor.executemany(
+            """
+            INSERT INTO class_food_resolution
+                (model_version, class_name, db_name, food_code, food_name, dataset_version, resolved_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [(model_version, class_name, db_name, food_code, food_name, dataset_version, resolved_at)
+             for class_name, db_name, food_code, food_name in resolved],
+        )
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    unresolved = [class_name for class_name, _, food_code, _ in resolved if food_code is None]
+    print(f"'{db_path}'에 클래스 매핑을 저장했습니다. (모델 버전 {model_version}, 데이터셋 버전 {dataset_version}, "
+          f"{len(resolved) - len(unresolved)}/{len(resolved)}개 클래스 매핑)")
+    if unresolved:
+        print(f"DB에서 찾지 못한 클래스 {len(unresolved)}개: {', '.join(unresolved)}")
+    return resolved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="분류 클래스별 영양 DB 행(food_code)을 미리 정해서 저장합니다.")
+    parser.add_argument("--indices", default=INDICES_PATH)
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+
+    build_resolution(args.indices, args.db)
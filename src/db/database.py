@@ -1,23 +1,198 @@
 import os, sqlite3
+import sys
+import pathlib
+import queue
+import threading
 from contextlib import contextmanager
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+from src.db.search_index import has_search_index, build_search_query, build_batch_search_query, like_escape
 
 # DB_PATH = '../../food_nutrition.db'
 DB_PATH = os.path.join(os.path.dirname(__file__), '../../food_nutrition.db')
 
+# 연결 풀에 보관할 최대 연결 수 (기본값. 환경 변수(.env) DB_POOL_SIZE로 바꿀 수 있습니다)
+DB_POOL_SIZE = 8
+# 일괄 조회 시 한 쿼리에 넣을 최대 음식명/식품코드 수 (SQLite 파라미터 수 제한 대비)
+DB_BATCH_SIZE = 500
+
+# 서비스에서 사용하는 읽기 전용 연결에 적용할 설정
+READ_ONLY_PRAGMAS = [
+    "PRAGMA query_only = ON",       # 실수로라도 쓰기를 하지 않도록 막습니다.
+    "PRAGMA mmap_size = 268435456", # DB 파일을 최대 256MB까지 메모리 매핑해서 읽습니다.
+    "PRAGMA cache_size = -16384",   # 연결당 페이지 캐시 16MB
+    "PRAGMA temp_store = MEMORY",   # ORDER BY 등 임시 데이터는 메모리에서 처리합니다.
+]
+
+
+def read_only_uri(db_path):
+    """
+    DB 파일을 읽기 전용으로 여는 SQLite URI를 만듭니다.
+    Windows 드라이브 경로(E:\\...)나 '?', '#', '%'가 들어간 경로도 올바르게 인코딩됩니다.
+    """
+    return pathlib.Path(db_path).resolve().as_uri() + "?mode=ro"
+
+
+class ConnectionPool:
+    """
+    읽기 전용 SQLite 연결을 열어둔 채로 재사용하는 스레드 안전한 연결 풀입니다.
+    한 연결은 한 번에 한 스레드만 사용하며, 반납된 연결은 다른 스레드가 다시 가져다 씁니다.
+    DB가 WAL 모드이면 마이그레이션/동기화 중에도 읽기가 막히지 않습니다.
+    """
+
+    def __init__(self, db_path, size=None):
+        self.db_path = db_path
+        self._size = size
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.waits = 0
+        self.in_use = 0
+
+    @property
+    def size(self):
+        # 기본 풀은 import 시점(load_dotenv() 전)에 만들어지므로 DB_POOL_SIZE 환경 변수는 처음 사용할 때 읽습니다.
+        if self._size is None:
+            self._size = int(os.getenv("DB_POOL_SIZE", str(DB_POOL_SIZE)))
+        return self._size
+
+    def _connect(self):
+        conn = sqlite3.connect(read_only_uri(self.db_path), uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # 컬럼명으로 접근 가능하도록 설정
+        for pragma in READ_ONLY_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self.reused += 1
+                self.in_use += 1
+            return conn
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self.created < self.size
+            if can_create:
+                self.created += 1
+                self.in_use += 1
+
+        if can_create:
+            try:
+                return self._connect()
+            except sqlite3.Error:
+                with self._lock:
+                    self.created -= 1
+                    self.in_use -= 1
+                raise
+
+        # 최대 연결 수를 모두 사용 중이면 반납될 때까지 기다립니다.
+        with self._lock:
+            self.waits += 1
+        conn = self._idle.get()
+        with self._lock:
+            self.reused += 1
+            self.in_use += 1
+        return conn
+
+    def release(self, conn):
+        with self._lock:
+            self.in_use -= 1
+        self._idle.put(conn)
+
+    def close_all(self):
+        """보관 중인 연결을 모두 닫습니다. (사용 중인 연결은 반납 후 다시 호출해야 닫힙니다)"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self.created -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "created": self.created,
+                "in_use": self.in_use,
+                "idle": self._idle.qsize(),
+                "reused": self.reused,
+                "waits": self.waits,
+            }
+
+
+# 프로세스 전체에서 공유하는 기본 연결 풀
+pool = ConnectionPool(DB_PATH)
+
 @contextmanager
 def get_db_connection():
     """
     데이터베이스 연결을 위한 컨텍스트 관리자.
-    연결 및 종료를 자동으로 처리합니다.
+    연결 풀에서 읽기 전용 연결을 빌려오고, 사용이 끝나면 닫지 않고 풀에 반납합니다.
     """
-    conn = None
+    conn = pool.acquire()
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row  # 컬럼명으로 접근 가능하도록 설정
         yield conn
     finally:
-        if conn:
-            conn.close()
+        pool.release(conn)
+
+# 검색 인덱스(search_index.py) 존재 여부. 처음 조회할 때 한 번만 확인합니다.
+_search_index_available = None
+
+def _use_search_index(conn):
+    global _search_index_available
+    if _search_index_available is None:
+        _search_index_available = has_search_index(conn)
+    return _search_index_available
+
+def search_food_rows(cursor, food_name, use_search_index=True):
+    """
+    주어진 커서로 음식 이름을 검색합니다. 검색어로 시작하는 음식이 먼저 오도록 정렬합니다.
+    서비스의 연결 풀뿐 아니라 빌드 스크립트(class_resolution.py)의 연결에서도 사용합니다.
+    """
+    if use_search_index:
+        # 공백 제거 음식명 인덱스와 FTS5 trigram 테이블로 검색합니다.
+        query, param = build_search_query(food_name)
+        cursor.execute(query, param)
+    else:
+        # 검색 인덱스가 없는 DB는 기존 방식(전체 테이블 스캔)으로 검색합니다.
+        # SQL Injection을 방지하기 위해 파라미터화된 쿼리(placeholder '?')를 사용합니다.
+        # 사용자 입력은 두 번째 인자로 안전하게 전달됩니다.
+        # 인덱스 검색과 같이 '%', '_'는 와일드카드가 아닌 글자로 비교합니다.
+        like_name = like_escape(food_name)
+        query = """
+                SELECT * 
+                FROM FOOD_NUTRITION 
+                WHERE REPLACE(FOOD_NAME, ' ', '') LIKE ? ESCAPE '\\'
+                ORDER BY
+                    CASE
+                        WHEN REPLACE(FOOD_NAME, ' ', '') LIKE ? ESCAPE '\\' THEN 1
+                        WHEN REPLACE(FOOD_NAME, ' ', '') LIKE ? ESCAPE '\\' THEN 2
+                        ELSE 3
+                    END
+                """
+        param = (f'%{like_name}%', f'{like_name}%', f'%{like_name}%')
+        cursor.execute(query, param)
+
+    return [dict(row) for row in cursor.fetchall()]
+
+def choose_food_data(food_datas):
+    """
+    검색 결과 중 사용할 행을 고릅니다.
+    '외식'으로 분류된 음식을 우선적으로 반환하며, 없을 경우 첫 번째 검색 결과를 반환합니다.
+    """
+    if not food_datas:
+        return None
+    # '외식' 데이터가 있으면 우선적으로 반환합니다.
+    for food_data in food_datas:
+        if '외식 ' in (food_data.get("food_origin_name") or ""):
+            return food_data
+    # '외식' 데이터가 없으면 첫 번째 결과를 반환합니다.
+    return food_datas[0]
 
 def get_food_info_by_name(food_name):
     """
@@ -27,27 +202,94 @@ def get_food_info_by_name(food_name):
     """
     try:
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-
-            # SQL Injection을 방지하기 위해 파라미터화된 쿼리(placeholder '?')를 사용합니다.
-            # 사용자 입력은 두 번째 인자로 안전하게 전달됩니다.
-            query = """
-                    SELECT * 
-                    FROM FOOD_NUTRITION 
-                    WHERE REPLACE(FOOD_NAME, ' ', '') LIKE ?
-                    ORDER BY
-                        CASE
-                            WHEN REPLACE(FOOD_NAME, ' ', '') LIKE ? THEN 1
-                            WHEN REPLACE(FOOD_NAME, ' ', '') LIKE ? THEN 2
-                            ELSE 3
-                        END
-                    """
-            param = (f'%{food_name}%', f'{food_name}%', f'%{food_name}%')
-            cursor.execute(query, param)
-
-            rows = cursor.fetchall()
-
-            return [dict(row) for row in rows]
+            return search_food_rows(conn.cursor(), food_name, _use_search_index(conn))
     except sqlite3.Error as e:
         print(f"데이터베이스 오류: {e}")
         return []
+
+def get_food_info_by_names(food_names):
+    """
+    여러 음식 이름의 영양 정보를 한 번의 쿼리로 조회합니다.
+    음식 이름마다 검색 결과 중 '외식' 데이터를 우선, 없으면 첫 번째 결과를 고릅니다. (choose_food_data와 같은 규칙)
+    :param food_names: 검색할 음식 이름 리스트
+    :return: {음식 이름: 음식 영양 데이터 또는 None} (입력 순서 유지, 찾지 못한 이름은 None)
+    """
+    names = list(dict.fromkeys(food_names))
+    results = dict.fromkeys(names)
+    try:
+        with get_db_connection() as conn:
+            use_search_index = _use_search_index(conn)
+            for start in range(0, len(names), DB_BATCH_SIZE):
+                chunk = names[start:start + DB_BATCH_SIZE]
+                query, params = build_batch_search_query(chunk, use_search_index)
+                for row in conn.execute(query, params):
+                    food_data = dict(row)
+                    results[chunk[food_data.pop("query_index")]] = food_data
+    except sqlite3.Error as e:
+        print(f"데이터베이스 오류: {e}")
+    return results
+
+def get_food_info_by_codes(food_codes):
+    """
+    여러 식품코드의 영양 정보를 한 번의 쿼리로 조회합니다.
+    :param food_codes: 식품코드 리스트
+    :return: {식품코드: 음식 영양 데이터 또는 None}
+    """
+    codes = list(dict.fromkeys(food_codes))
+    results = dict.fromkeys(codes)
+    try:
+        with get_db_connection() as conn:
+            for start in range(0, len(codes), DB_BATCH_SIZE):
+                chunk = codes[start:start + DB_BATCH_SIZE]
+                placeholders = ', '.join('?' for _ in chunk)
+                # 같은 식품코드가 여러 행이면 get_food_info_by_code()와 같이 먼저 저장된 행을 사용합니다.
+                rows = conn.execute(
+                    f"SELECT * FROM food_nutrition WHERE food_code IN ({placeholders}) ORDER BY rowid DESC", chunk
+                )
+                for row in rows:
+                    results[row["food_code"]] = dict(row)
+    except sqlite3.Error as e:
+        print(f"데이터베이스 오류: {e}")
+    return results
+
+def get_food_info_by_code(food_code):
+    """
+    식품코드로 영양 정보 한 건을 조회합니다. (food_code 인덱스 조회)
+    :param food_code: 식품코드
+    :return: 음식 영양 데이터 딕셔너리. 없으면 None
+    """
+    try:
+        with get_db_connection() as conn:
+            row = conn.execute("SELECT * FROM food_nutrition WHERE food_code = ? ORDER BY rowid LIMIT 1", (food_code,)).fetchone()
+            return dict(row) if row else None
+    except sqlite3.Error as e:
+        print(f"데이터베이스 오류: {e}")
+        return None
+
+def get_class_resolution(model_version):
+    """
+    class_resolution.py로 미리 만들어 둔 분류 클래스 -> 식품코드 매핑을 읽습니다.
+    :param model_version: 클래스 목록(indices JSON)의 버전
+    :return: ({DB 검색명: 식품코드 또는 None}, 매핑을 만들 때의 데이터셋 버전). 매핑이 없으면 ({}, None)
+    """
+    try:
+        with get_db_connection() as conn:
+            rows = conn.execute(
+                "SELECT db_name, food_code, dataset_version FROM class_food_resolution WHERE model_version = ?",
+                (model_version,),
+            ).fetchall()
+    except sqlite3.Error:
+        # 매핑 테이블이 없는 DB
+        return {}, None
+    if not rows:
+        return {}, None
+    return {row["db_name"]: row["food_code"] for row in rows}, rows[0]["dataset_version"]
+
+def get_dataset_version():
+    """migrate.py가 기록한 최신 데이터셋 버전을 반환합니다. 기록이 없으면 None"""
+    try:
+        with get_db_connection() as conn:
+            row = conn.execute("SELECT MAX(version) FROM dataset_version").fetchone()
+            return row[0]
+    except sqlite3.Error:
+        return None
@@ -1,115 +1,591 @@
+import io
 import csv
+import os
+import sys
+import json
+import codecs
+import time
 import sqlite3
+import hashlib
+import argparse
+from datetime import datetime
+from contextlib import contextmanager
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+from src.db.search_index import create_search_index
 
-def migrate_data():
-    # CSV 파일 경로와 데이터베이스 경로
-    csv_file_path = '../../data.csv'
-    db_file_path = '../../food_nutrition.db'
-
-    # 한글 헤더와 영문 컬럼명 매핑
-    header_mapping = {
-        '식품코드': 'food_code',
-        '식품명': 'food_name',
-        '데이터구분코드': 'data_division_code',
-        '데이터구분명': 'data_division_name',
-        '식품기원코드': 'food_origin_code',
-        '식품기원명': 'food_origin_name',
-        '식품대분류코드': 'food_main_category_code',
-        '식품대분류명': 'food_main_category_name',
-        '대표식품코드': 'representative_food_code',
-        '대표식품명': 'representative_food_name',
-        '식품중분류코드': 'food_mid_category_code',
-        '식품중분류명': 'food_mid_category_name',
-        '식품소분류코드': 'food_sub_category_code',
-        '식품소분류명': 'food_sub_category_name',
-        '식품세분류코드': 'food_detail_category_code',
-        '식품세분류명': 'food_detail_category_name',
-        '영양성분함량기준량': 'nutrition_content_standard_amount',
-        '에너지(kcal)': 'energy_kcal',
-        '수분(g)': 'moisture_g',
-        '단백질(g)': 'protein_g',
-        '지방(g)': 'fat_g',
-        '회분(g)': 'ash_g',
-        '탄수화물(g)': 'carbohydrates_g',
-        '당류(g)': 'sugars_g',
-        '식이섬유(g)': 'dietary_fiber_g',
-        '칼슘(mg)': 'calcium_mg',
-        '철(mg)': 'iron_mg',
-        '인(mg)': 'phosphorus_mg',
-        '칼륨(mg)': 'potassium_mg',
-        '나트륨(mg)': 'sodium_mg',
-        '비타민 A(μg RAE)': 'vitamin_a_ug_rae',
-        '레티놀(μg)': 'retinol_ug',
-        '베타카로틴(μg)': 'beta_carotene_ug',
-        '티아민(mg)': 'thiamine_mg',
-        '리보플라빈(mg)': 'riboflavin_mg',
-        '니아신(mg)': 'niacin_mg',
-        '비타민 C(mg)': 'vitamin_c_mg',
-        '비타민 D(μg)': 'vitamin_d_ug',
-        '콜레스테롤(mg)': 'cholesterol_mg',
-        '포화지방산(g)': 'saturated_fatty_acids_g',
-        '트랜스지방산(g)': 'trans_fatty_acids_g',
-        '출처코드': 'source_code',
-        '출처명': 'source_name',
-        '식품중량': 'food_weight',
-        '전체내용량': 'total_content',
-        '데이터생성방법코드': 'data_creation_method_code',
-        '데이터생성방법명': 'data_creation_method_name',
-        '데이터생성일자': 'data_creation_date',
-        '데이터기준일자': 'data_reference_date',
-        '제공기관코드': 'provider_code',
-        '제공기관명': 'provider_name'
-    }
-
-    # 데이터베이스 연결
-    conn = sqlite3.connect(db_file_path)
-    cursor = conn.cursor()
+# CSV 파일 경로와 데이터베이스 경로
+CSV_FILE_PATH = '../../data.csv'
+DB_FILE_PATH = '../../food_nutrition.db'
+
+# 한 번에 executemany로 넣을 행 수. 메모리에는 이 수만큼의 행만 보관합니다.
+CHUNK_SIZE = 5000
+
+# 인코딩 자동 감지에 사용할 파일 앞부분 크기와 후보 인코딩 (앞에서부터 순서대로 시도)
+ENCODING_SAMPLE_BYTES = 1024 * 1024
+ENCODING_CANDIDATES = ['utf-8-sig', 'cp949', 'euc-kr']
+
+# 반드시 있어야 하는 컬럼 (동기화 키, 음식명 검색, '외식' 우선 규칙에 사용)
+REQUIRED_COLUMNS = ['food_code', 'food_name', 'food_origin_name']
+
+# 한글 헤더와 영문 컬럼명 매핑
+HEADER_MAPPING = {
+    '식품코드': 'food_code',
+    '식품명': 'food_name',
+    '데이터구분코드': 'data_division_code',
+    '데이터구분명': 'data_division_name',
+    '식품기원코드': 'food_origin_code',
+    '식품기원명': 'food_origin_name',
+    '식품대분류코드': 'food_main_category_code',
+    '식품대분류명': 'food_main_category_name',
+    '대표식품코드': 'representative_food_code',
+    '대표식품명': 'representative_food_name',
+    '식품중분류코드': 'food_mid_category_code',
+    '식품중분류명': 'food_mid_category_name',
+    '식품소분류코드': 'food_sub_category_code',
+    '식품소분류명': 'food_sub_category_name',
+    '식품세분류코드': 'food_detail_category_code',
+    '식품세분류명': 'food_detail_category_name',
+    '영양성분함량기준량': 'nutrition_content_standard_amount',
+    '에너지(kcal)': 'energy_kcal',
+    '수분(g)': 'moisture_g',
+    '단백질(g)': 'protein_g',
+    '지방(g)': 'fat_g',
+    '회분(g)': 'ash_g',
+    '탄수화물(g)': 'carbohydrates_g',
+    '당류(g)': 'sugars_g',
+    '식이섬유(g)': 'dietary_fiber_g',
+    '칼슘(mg)': 'calcium_mg',
+    '철(mg)': 'iron_mg',
+    '인(mg)': 'phosphorus_mg',
+    '칼륨(mg)': 'potassium_mg',
+    '나트륨(mg)': 'sodium_mg',
+    '비타민 A(μg RAE)': 'vitamin_a_ug_rae',
+    '레티놀(μg)': 'retinol_ug',
+    '베타카로틴(μg)': 'beta_carotene_ug',
+    '티아민(mg)': 'thiamine_mg',
+    '리보플라빈(mg)': 'riboflavin_mg',
+    '니아신(mg)': 'niacin_mg',
+    '비타민 C(mg)': 'vitamin_c_mg',
+    '비타민 D(μg)': 'vitamin_d_ug',
+    '콜레스테롤(mg)': 'cholesterol_mg',
+    '포화지방산(g)': 'saturated_fatty_acids_g',
+    '트랜스지방산(g)': 'trans_fatty_acids_g',
+    '출처코드': 'source_code',
+    '출처명': 'source_name',
+    '식품중량': 'food_weight',
+    '전체내용량': 'total_content',
+    '데이터생성방법코드': 'data_creation_method_code',
+    '데이터생성방법명': 'data_creation_method_name',
+    '데이터생성일자': 'data_creation_date',
+    '데이터기준일자': 'data_reference_date',
+    '제공기관코드': 'provider_code',
+    '제공기관명': 'provider_name'
+}
+
+# 단위가 붙은 헤더(예: '에너지(kcal)', '나트륨(mg)')는 영양 성분 수치이므로 REAL 컬럼으로 만듭니다.
+# 식품코드 등 '0'으로 시작하는 코드 값은 그대로 보존해야 하므로 TEXT로 둡니다.
+REAL_COLUMNS = {column for header, column in HEADER_MAPPING.items() if '(' in header}
+
+# 마이그레이션 후 생성할 인덱스 (인덱스명, 컬럼)
+INDEXES = [
+    ("idx_food_nutrition_food_code", "food_code"),
+    ("idx_food_nutrition_representative_food_name", "representative_food_name"),
+]
+
+
+def column_type(column):
+    return "REAL" if column in REAL_COLUMNS else "TEXT"
+
+
+def to_real(value):
+    """CSV 문자열을 숫자로 변환합니다. 빈 값이나 숫자가 아닌 값은 NULL(None)로 저장합니다."""
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        return float(value.replace(',', ''))
+    except ValueError:
+        return None
+
+
+def detect_encoding(csv_file_path, sample_size=ENCODING_SAMPLE_BYTES):
+    """
+    파일 앞부분 바이트 샘플로 CSV 인코딩을 추정합니다.
+    BOM이 있거나 UTF-8로 문제없이 디코딩되면 'utf-8-sig', 그렇지 않으면 후보(cp949, euc-kr) 중 디코딩되는 첫 번째 인코딩을 반환합니다.
+    cp949는 euc-kr을 포함하므로 euc-kr 파일도 cp949로 읽을 수 있습니다.
+    """
+    with open(csv_file_path, 'rb') as f:
+        sample = f.read(sample_size)
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    for encoding in ENCODING_CANDIDATES:
+        # 샘플 끝에서 잘린 멀티바이트 문자는 오류로 보지 않도록 incremental decoder(final=False)를 사용합니다.
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            decoder.decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    raise ValueError(f"지원하는 인코딩({', '.join(ENCODING_CANDIDATES)})으로 읽을 수 없는 파일입니다: {csv_file_path}")
+
+
+class ProgressBar:
+    """읽은 바이트 수 기준으로 진행률을 한 줄에 갱신해서 출력합니다. (stderr)"""
+
+    def __init__(self, total_bytes, enabled=True, interval=0.2):
+        self.total_bytes = max(total_bytes, 1)
+        self.enabled = enabled
+        self.interval = interval
+        self._last = 0.0
+
+    def update(self, position, rows, force=False):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+        ratio = min(position / self.total_bytes, 1.0)
+        filled = int(ratio * 30)
+        sys.stderr.write(f"\r[{'#' * filled}{'-' * (30 - filled)}] {ratio * 100:5.1f}% "
+                         f"{position / 1e6:.1f}/{self.total_bytes / 1e6:.1f}MB {rows:,}행")
+        sys.stderr.flush()
+
+    def close(self, position, rows):
+        if self.enabled:
+            self.update(position, rows, force=True)
+            sys.stderr.write("\n")
+
+
+class RejectWriter:
+    """적재하지 못한 행을 (줄 번호, 이유, 원본 값) 형식으로 별도 CSV 파일에 기록합니다. 첫 기록 때 파일을 만듭니다."""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, line_number, reason, row):
+        if self._file is None:
+            self._file = open(self.path, 'w', encoding='utf-8-sig', newline='')
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(['line_number', 'reason', 'row'])
+        self._writer.writerow([line_number, reason] + row)
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+@contextmanager
+def open_csv(csv_file_path, encoding='auto', show_progress=None):
+    """
+    CSV 파일을 스트리밍으로 읽기 위해 엽니다. 파일 전체를 메모리에 올리지 않습니다.
+
+    Yields:
+        tuple: (csv.reader, 사용한 인코딩, 진행률 표시기, 현재까지 읽은 바이트 수를 반환하는 함수)
+    """
+    if encoding == 'auto':
+        encoding = detect_encoding(csv_file_path)
+    if show_progress is None:
+        show_progress = sys.stderr.isatty()
+
+    raw = open(csv_file_path, 'rb')
+    try:
+        text = io.TextIOWrapper(raw, encoding=encoding, newline='')
+        progress = ProgressBar(os.path.getsize(csv_file_path), enabled=show_progress)
+        yield csv.reader(text), encoding, progress, raw.tell
+    finally:
+        raw.close()
+
+
+def iter_chunks(reader, header_indices, english_columns, chunk_size=CHUNK_SIZE, rejects=None):
+    """
+    CSV reader에서 행을 읽어 타입 변환을 마친 행 묶음(chunk)을 차례로 반환합니다.
+    한 번에 chunk_size개 행만 메모리에 보관합니다.
+    컬럼 수가 맞지 않거나 식품코드가 없는 행은 건너뛰고, rejects(RejectWriter)가 있으면 그 파일에 기록합니다.
+
+    Yields:
+        tuple: (변환된 행 리스트, 이번 chunk에서 건너뛴 행 중 식품코드를 읽을 수 있는 행의 식품코드 리스트)
+    """
+    converters = [to_real if column in REAL_COLUMNS else None for column in english_columns]
+    code_index = header_indices[english_columns.index('food_code')]
+    chunk = []
+    skipped_codes = []
+    for row in reader:
+        if len(row) <= header_indices[-1]:
+            reason = f"컬럼 수 불일치 ({len(row)}개)"
+        elif not row[code_index].strip():
+            reason = "식품코드 없음"
+        else:
+            chunk.append([row[i] if converter is None else converter(row[i])
+                          for i, converter in zip(header_indices, converters)])
+            if len(chunk) >= chunk_size:
+                yield chunk, skipped_codes
+                chunk = []
+                skipped_codes = []
+            continue
+
+        if len(row) > code_index and row[code_index].strip():
+            skipped_codes.append(row[code_index])
+        if rejects is not None:
+            rejects.write(reader.line_num, reason, row)
+    if chunk or skipped_codes:
+        yield chunk, skipped_codes
+
+
+def read_header(reader):
+    """
+    CSV 헤더를 읽어 매핑되는 컬럼의 (CSV 인덱스 리스트, 영문 컬럼명 리스트, 매핑되지 않은 헤더 리스트)를 반환합니다.
+    """
+    header = next(reader, [])
+    cleaned_header = [h.strip().lstrip('\ufeff') for h in header]
+
+    # 헤더를 영문명으로 변환
+    header_indices = []
+    english_columns = []
+    unmapped_headers = []
+    for i, h in enumerate(cleaned_header):
+        mapped_col = HEADER_MAPPING.get(h)
+        if mapped_col:
+            header_indices.append(i)
+            english_columns.append(mapped_col)
+        elif h:
+            unmapped_headers.append(h)
+    return header_indices, english_columns, unmapped_headers
+
+
+def validate_header(english_columns, unmapped_headers):
+    """
+    데이터를 읽기 전에 헤더를 검사합니다.
+
+    Returns:
+        tuple: (오류 메시지 리스트, 경고 메시지 리스트). 오류가 있으면 적재하지 않습니다.
+    """
+    errors = []
+    warnings = []
+    missing_required = [column for column in REQUIRED_COLUMNS if column not in english_columns]
+    if missing_required:
+        errors.append(f"필수 컬럼이 없습니다: {', '.join(missing_required)} "
+                      f"(인코딩이 맞지 않으면 헤더를 인식하지 못할 수 있습니다)")
+    duplicated = sorted({column for column in english_columns if english_columns.count(column) > 1})
+    if duplicated:
+        errors.append(f"같은 컬럼으로 매핑되는 헤더가 여러 개입니다: {', '.join(duplicated)}")
+
+    missing = [column for column in HEADER_MAPPING.values() if column not in english_columns]
+    if missing:
+        warnings.append(f"CSV에 없는 컬럼 {len(missing)}개는 테이블에서 제외됩니다: {', '.join(missing)}")
+    if unmapped_headers:
+        warnings.append(f"매핑되지 않은 헤더 {len(unmapped_headers)}개는 무시합니다: {', '.join(unmapped_headers)}")
+    return errors, warnings
+
+
+def check_header(english_columns, unmapped_headers):
+    """validate_header() 결과를 출력하고, 적재할 수 있으면 True를 반환합니다."""
+    errors, warnings = validate_header(english_columns, unmapped_headers)
+    for message in warnings:
+        print(f"경고: {message}")
+    for message in errors:
+        print(f"오류: {message}")
+    return not errors
+
+
+def create_indexes(cursor):
+    for index_name, column in INDEXES:
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {index_name} ON food_nutrition ("{column}")')
+
+
+def create_meta_tables(cursor):
+    """
+    동기화에 사용하는 보조 테이블을 만듭니다.
+    - food_nutrition_hash: food_code별 행 내용 해시 (변경 감지용)
+    - dataset_version: 마이그레이션/동기화 이력
+    """
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS food_nutrition_hash (
+            food_code TEXT PRIMARY KEY,
+            row_hash TEXT NOT NULL
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dataset_version (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            synced_at TEXT NOT NULL,
+            mode TEXT NOT NULL,
+            source_file TEXT NOT NULL,
+            source_sha256 TEXT NOT NULL,
+            row_count INTEGER NOT NULL,
+            inserted INTEGER NOT NULL,
+            updated INTEGER NOT NULL,
+            deleted INTEGER NOT NULL,
+            unchanged INTEGER NOT NULL
+        )
+        """
+    )
+
+
+def row_hash(values):
+    """타입 변환을 마친 행 값으로 내용 해시를 만듭니다. DB에서 읽은 값으로 계산해도 같은 결과가 나옵니다."""
+    return hashlib.sha1(json.dumps(values, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def record_version(cursor, mode, csv_file_path, source_sha256, row_count, inserted=0, updated=0, deleted=0, unchanged=0):
+    cursor.execute(
+        """
+        INSERT INTO dataset_version
+            (synced_at, mode, source_file, source_sha256, row_count, inserted, updated, deleted, unchanged)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (datetime.now().isoformat(timespec='seconds'), mode, os.path.abspath(csv_file_path), source_sha256,
+         row_count, inserted, updated, deleted, unchanged),
+    )
+    return cursor.lastrowid
+
+
+def open_for_write(db_file_path):
+    # 데이터베이스 연결 (트랜잭션은 직접 관리합니다)
+    conn = sqlite3.connect(db_file_path, isolation_level=None)
+    # WAL 모드에서는 쓰기 트랜잭션 중에도 서비스의 읽기가 막히지 않고 마지막 커밋 상태를 읽습니다.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+def rejects_path_for(csv_file_path):
+    return os.path.splitext(csv_file_path)[0] + '.rejected.csv'
+
+
+def migrate_data(csv_file_path=CSV_FILE_PATH, db_file_path=DB_FILE_PATH, encoding='auto', chunk_size=CHUNK_SIZE,
+                 rejects_path=None, show_progress=None):
+    """
+    CSV 전체를 읽어 food_nutrition 테이블을 새로 만듭니다. (기존 테이블은 삭제)
+    테이블 생성, 적재, 인덱스 생성까지 하나의 트랜잭션으로 처리하므로 서비스는 완료 전까지 이전 데이터를 읽습니다.
+    encoding이 'auto'이면 파일 앞부분으로 인코딩을 추정하고, 적재하지 못한 행은 rejects_path 파일에 기록합니다.
+    완료하면 True, 헤더 검증에 실패해서 적재하지 않았으면 False를 반환합니다.
+    """
+    start = time.perf_counter()
+    source_sha256 = file_sha256(csv_file_path)
+    rejects = RejectWriter(rejects_path or rejects_path_for(csv_file_path))
+
+    inserted = 0
 
     # CSV 파일 열기
-    with open(csv_file_path, 'r', encoding='cp949') as f:
-        reader = csv.reader(f)
-        header = next(reader)
-        cleaned_header = [h.strip().lstrip('\ufeff') for h in header]
-
-        # 헤더를 영문명으로 변환
-        english_columns = []
-        original_header_for_insert = []
-        for h in cleaned_header:
-            mapped_col = header_mapping.get(h)
-            if mapped_col:
-                english_columns.append(mapped_col)
-                original_header_for_insert.append(h)
-
-        # 유효한 헤더가 있는지 확인
-        if not english_columns:
-            print("오류: 유효한 헤더를 찾을 수 없습니다.")
+    with open_csv(csv_file_path, encoding, show_progress) as (reader, encoding, progress, position):
+        header_indices, english_columns, unmapped_headers = read_header(reader)
+
+        # 데이터를 읽기 전에 헤더가 유효한지 확인합니다.
+        if not check_header(english_columns, unmapped_headers):
+            return False
+
+        conn = open_for_write(db_file_path)
+        cursor = conn.cursor()
+
+        quoted_columns = ', '.join(f'"{col_name}"' for col_name in english_columns)
+        placeholders = ', '.join(['?' for _ in english_columns])
+        insert_sql = f'INSERT INTO food_nutrition ({quoted_columns}) VALUES ({placeholders})'
+        code_index = english_columns.index('food_code')
+
+        # 전체 적재를 하나의 트랜잭션으로 처리합니다. 실패하면 기존 테이블이 그대로 남습니다.
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            # 테이블 생성 (기존 테이블이 있으면 삭제 후 다시 생성)
+            cursor.execute("DROP TABLE IF EXISTS food_nutrition")
+            columns_with_types = [f'"{col_name}" {column_type(col_name)}' for col_name in english_columns]
+            cursor.execute(f"CREATE TABLE food_nutrition ({', '.join(columns_with_types)})")
+            create_meta_tables(cursor)
+            cursor.execute("DELETE FROM food_nutrition_hash")
+
+            # 데이터 삽입 (chunk 단위 executemany)
+            for chunk, _ in iter_chunks(reader, header_indices, english_columns, chunk_size, rejects):
+                cursor.executemany(insert_sql, chunk)
+                cursor.executemany("INSERT OR REPLACE INTO food_nutrition_hash (food_code, row_hash) VALUES (?, ?)",
+                                   [(values[code_index], row_hash(values)) for values in chunk])
+                inserted += len(chunk)
+                progress.update(position(), inserted)
+            progress.close(position(), inserted)
+            load_seconds = time.perf_counter() - start
+
+            # 인덱스는 데이터를 모두 넣은 뒤에 만드는 것이 훨씬 빠릅니다.
+            create_indexes(cursor)
+            # 음식명 검색 인덱스(공백 제거 음식명 + FTS5 trigram) 생성
+            create_search_index(conn, commit=False)
+            version = record_version(cursor, 'full', csv_file_path, source_sha256, inserted, inserted=inserted)
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        finally:
             conn.close()
-            return
+            rejects.close()
+
+    elapsed = time.perf_counter() - start
+    if rejects.count:
+        print(f"적재하지 못한 {rejects.count}개 행을 '{rejects.path}'에 기록했습니다.")
+    print(f"'{db_file_path}'에 데이터 마이그레이션을 완료했습니다. (버전 {version}, 인코딩 {encoding}, "
+          f"{inserted}행, 적재 {load_seconds:.1f}초 {inserted / max(load_seconds, 1e-9):.0f} rows/sec, "
+          f"인덱스 생성 포함 전체 {elapsed:.1f}초)")
+    return True
+
 
-        # 테이블 생성 (기존 테이블이 있으면 삭제 후 다시 생성)
-        cursor.execute("DROP TABLE IF EXISTS food_nutrition")
-        columns_with_types = [f'"{col_name}" TEXT' for col_name in english_columns]
-        create_table_sql = f"CREATE TABLE food_nutrition ({ ', '.join(columns_with_types) })"
-        cursor.execute(create_table_sql)
+def fill_missing_hashes(cursor, quoted_columns, code_index, chunk_size=CHUNK_SIZE):
+    """해시 테이블이 없던 DB는 현재 데이터로 해시를 먼저 계산합니다. (chunk 단위로 읽고 씀)"""
+    rows = cursor.connection.execute(f"SELECT {quoted_columns} FROM food_nutrition")
+    while True:
+        chunk = rows.fetchmany(chunk_size)
+        if not chunk:
+            break
+        cursor.executemany("INSERT OR REPLACE INTO food_nutrition_hash (food_code, row_hash) VALUES (?, ?)",
+                           [(values[code_index], row_hash(list(values))) for values in chunk])
+
+
+def sync_data(csv_file_path=CSV_FILE_PATH, db_file_path=DB_FILE_PATH, encoding='auto', chunk_size=CHUNK_SIZE,
+              rejects_path=None, show_progress=None):
+    """
+    CSV와 기존 food_nutrition 테이블을 food_code 기준으로 비교해서 바뀐 행만 반영합니다.
+    - CSV에만 있는 행은 추가, 내용 해시가 달라진 행은 수정, CSV에서 사라진 행은 삭제합니다.
+    - 테이블을 다시 만들지 않으므로 rowid와 검색 인덱스가 유지되고, 트리거로 검색 테이블도 함께 갱신됩니다.
+    - WAL 모드이므로 동기화 중에도 서비스는 이전 커밋 상태를 계속 읽을 수 있습니다.
+    - 기존 해시와 CSV에서 본 식품코드는 chunk마다 DB에서 조회/기록하므로 파일이 커져도 메모리 사용량이 늘지 않습니다.
+    완료하면 True, 헤더 검증에 실패했거나 컬럼 구성이 달라서 동기화하지 않았으면 False를 반환합니다.
+    """
+    start = time.perf_counter()
+
+    conn = open_for_write(db_file_path)
+    table_columns = [row[1] for row in conn.execute("PRAGMA table_info(food_nutrition)")]
+    if not table_columns:
+        conn.close()
+        print("food_nutrition 테이블이 없어서 전체 마이그레이션을 실행합니다.")
+        return migrate_data(csv_file_path, db_file_path, encoding, chunk_size, rejects_path, show_progress)
+
+    source_sha256 = file_sha256(csv_file_path)
+    rejects = RejectWriter(rejects_path or rejects_path_for(csv_file_path))
+    cursor = conn.cursor()
+    inserted = updated = unchanged = 0
 
-        # 데이터 삽입
-        header_indices = [i for i, h in enumerate(cleaned_header) if h in original_header_for_insert]
-        
+    with open_csv(csv_file_path, encoding, show_progress) as (reader, encoding, progress, position):
+        header_indices, english_columns, unmapped_headers = read_header(reader)
+        if not check_header(english_columns, unmapped_headers):
+            conn.close()
+            return False
+        if english_columns != table_columns:
+            conn.close()
+            print("오류: CSV 컬럼 구성이 기존 테이블과 달라서 동기화할 수 없습니다. 전체 마이그레이션(--mode full)을 실행해주세요.")
+            return False
+
+        quoted_columns = ', '.join(f'"{col_name}"' for col_name in english_columns)
         placeholders = ', '.join(['?' for _ in english_columns])
-        insert_sql = f'INSERT INTO food_nutrition ("{ '", "'.join(english_columns) }") VALUES ({placeholders})'
+        insert_sql = f'INSERT INTO food_nutrition ({quoted_columns}) VALUES ({placeholders})'
+        assignments = ', '.join(f'"{col_name}" = ?' for col_name in english_columns)
+        update_sql = f'UPDATE food_nutrition SET {assignments} WHERE food_code = ?'
+        code_index = english_columns.index('food_code')
+
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            create_meta_tables(cursor)
+            if cursor.execute("SELECT NOT EXISTS (SELECT 1 FROM food_nutrition_hash)").fetchone()[0]:
+                fill_missing_hashes(cursor, quoted_columns, code_index, chunk_size)
+            # CSV에서 본 식품코드 (삭제 대상 계산용)
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS sync_seen (food_code TEXT PRIMARY KEY)")
+            cursor.execute("DELETE FROM sync_seen")
+
+            rows = 0
+            for chunk, skipped_codes in iter_chunks(reader, header_indices, english_columns, chunk_size, rejects):
+                rows += len(chunk)
+                # 형식이 잘못되어 건너뛴 행도 CSV에 있는 식품코드이므로 기존 DB 행을 삭제하지 않고 그대로 둡니다.
+                cursor.executemany("INSERT OR IGNORE INTO sync_seen (food_code) VALUES (?)",
+                                   [(code,) for code in skipped_codes])
+                codes = [values[code_index] for values in chunk]
+                existing = {}
+                for offset in range(0, len(codes), 500):
+                    batch = codes[offset:offset + 500]
+                    existing.update(cursor.execute(
+                        f"SELECT food_code, row_hash FROM food_nutrition_hash "
+                        f"WHERE food_code IN ({', '.join('?' for _ in batch)})", batch))
+                cursor.executemany("INSERT OR IGNORE INTO sync_seen (food_code) VALUES (?)", [(code,) for code in codes])
 
-        for row in reader:
-            selected_row_data = [row[i] for i in header_indices if i < len(row)]
-            if len(selected_row_data) == len(english_columns):
-                cursor.execute(insert_sql, selected_row_data)
-            else:
-                print(f"컬럼 수가 일치하지 않아 다음 행을 건너뜁니다: {row}")
+                to_insert = []
+                to_update = []
+                hashes = []
+                for values in chunk:
+                    food_code = values[code_index]
+                    new_hash = row_hash(values)
+                    old_hash = existing.get(food_code)
+                    if old_hash == new_hash:
+                        unchanged += 1
+                        continue
+                    if old_hash is None:
+                        to_insert.append(values)
+                    else:
+                        to_update.append(values + [food_code])
+                    existing[food_code] = new_hash
+                    hashes.append((food_code, new_hash))
 
-    # 변경사항 저장 및 연결 종료
-    conn.commit()
-    conn.close()
+                cursor.executemany(insert_sql, to_insert)
+                cursor.executemany(update_sql, to_update)
+                cursor.executemany("INSERT OR REPLACE INTO food_nutrition_hash (food_code, row_hash) VALUES (?, ?)", hashes)
+                inserted += len(to_insert)
+                updated += len(to_update)
+                progress.update(position(), rows)
+            progress.close(position(), rows)
+
+            cursor.execute("DELETE FROM food_nutrition WHERE food_code NOT IN (SELECT food_code FROM sync_seen)")
+            deleted = cursor.rowcount
+            cursor.execute("DELETE FROM food_nutrition_hash WHERE food_code NOT IN (SELECT food_code FROM sync_seen)")
+            cursor.execute("DELETE FROM sync_seen")
+
+            # 바뀐 행이 없으면 새 버전을 기록하지 않습니다. (이전 버전으로 만든 클래스 매핑이 그대로 유효)
+            version = cursor.execute("SELECT MAX(version) FROM dataset_version").fetchone()[0]
+            if inserted or updated or deleted or version is None:
+                row_count = cursor.execute("SELECT COUNT(*) FROM food_nutrition").fetchone()[0]
+                version = record_version(cursor, 'sync', csv_file_path, source_sha256, row_count,
+                                         inserted, updated, deleted, unchanged)
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+            rejects.close()
+
+    elapsed = time.perf_counter() - start
+    if rejects.count:
+        print(f"적재하지 못한 {rejects.count}개 행을 '{rejects.path}'에 기록했습니다.")
+    print(f"'{db_file_path}' 동기화를 완료했습니다. (버전 {version}, 인코딩 {encoding}, 추가 {inserted}, 수정 {updated}, "
+          f"삭제 {deleted}, 변경 없음 {unchanged}, {elapsed:.1f}초)")
+    return True
 
-    print(f"'{db_file_path}'에 데이터 마이그레이션을 완료했습니다.")
 
 if __name__ == "__main__":
-    migrate_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="영양 정보 CSV를 SQLite DB로 가져옵니다.")
+    parser.add_argument("--mode", choices=["full", "sync"], default="full",
+                        help="full: 테이블을 새로 만듭니다. sync: food_code 기준으로 바뀐 행만 반영합니다.")
+    parser.add_argument("--csv", default=CSV_FILE_PATH)
+    parser.add_argument("--db", default=DB_FILE_PATH)
+    parser.add_argument("--encoding", default="auto",
+                        help=f"CSV 인코딩. auto이면 파일 앞부분으로 추정합니다. ({', '.join(ENCODING_CANDIDATES)})")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--rejects", default=None, help="적재하지 못한 행을 기록할 파일 (기본값: <csv>.rejected.csv)")
+    parser.add_argument("--no-progress", action="store_true", help="진행률 표시를 끕니다.")
+    args = parser.parse_args()
+
+    show_progress = False if args.no_progress else None
+    if args.mode == "sync":
+        ok = sync_data(args.csv, args.db, args.encoding, args.chunk_size, args.rejects, show_progress)
+    else:
+        ok = migrate_data(args.csv, args.db, args.encoding, args.chunk_size, args.rejects, show_progress)
+    if not ok:
+        sys.exit(1)
@@ -0,0 +1,174 @@
+"""
+서비스 시작 시 food_nutrition 테이블 전체를 메모리에 올려두는 읽기 전용 인덱스입니다.
+
+- 영양 성분 수치 컬럼은 컬럼별 float64 NumPy 배열로 저장합니다. (빈 값은 NaN, SQLite REAL 값과 같은 값을 반환)
+- 수치 컬럼에 float가 아닌 값이 일부 섞여 있으면 배열에는 NaN을 넣고, 원래 값은 행 번호별로 따로 보관해서 그대로 반환합니다.
+- 문자열 컬럼은 컬럼별 리스트로 저장하고, 반복되는 값('해당없음' 등)은 intern해서 메모리를 줄입니다.
+- 공백을 제거한 음식명과 대표식품명을 키로 하는 해시 맵으로 행을 바로 찾습니다.
+"""
+import os
+import sys
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+from src.db.search_index import normalize_name
+from src.db.database import read_only_uri
+
+DB_PATH = os.path.join(os.path.dirname(__file__), '../../food_nutrition.db')
+
+# float64 배열로 저장할 영양 성분 컬럼
+NUMERIC_COLUMNS = [
+    'energy_kcal', 'moisture_g', 'protein_g', 'fat_g', 'ash_g', 'carbohydrates_g', 'sugars_g',
+    'dietary_fiber_g', 'calcium_mg', 'iron_mg', 'phosphorus_mg', 'potassium_mg', 'sodium_mg',
+    'vitamin_a_ug_rae', 'retinol_ug', 'beta_carotene_ug', 'thiamine_mg', 'riboflavin_mg', 'niacin_mg',
+    'vitamin_c_mg', 'vitamin_d_ug', 'cholesterol_mg', 'saturated_fatty_acids_g', 'trans_fatty_acids_g',
+]
+
+# 음식명 부분 일치 검색 결과를 보관할 검색어 수. (에이전트 도구 검색어는 종류가 많으므로 오래된 것부터 버림)
+SEARCH_CACHE_SIZE = 4096
+
+
+def _numeric_column(rows, i):
+    """
+    i번째 컬럼을 (float64 배열, {행 번호: float가 아닌 원래 값})으로 만듭니다.
+    NULL과 float가 아닌 값은 배열에 NaN으로 넣고, float가 아닌 값만 따로 기록합니다.
+    """
+    values = np.full(len(rows), np.nan, dtype=np.float64)
+    others = {}
+    for n, row in enumerate(rows):
+        value = row[i]
+        if type(value) is float:
+            values[n] = value
+        elif value is not None:
+            others[n] = value
+    return values, others
+
+
+class NutritionIndex:
+    """food_nutrition 테이블의 메모리 인덱스. load()로 만듭니다."""
+
+    def __init__(self, columns, text_data, numeric_data, numeric_others=None):
+        self.columns = columns
+        self.text_data = text_data
+        self.numeric_data = numeric_data
+        # 수치 컬럼별 {행 번호: float가 아닌 원래 값}
+        self.numeric_others = numeric_others or {}
+        self.size = len(next(iter(text_data.values()))) if text_data else 0
+
+        # SQLite LIKE와 같이 영문 대소문자는 구분하지 않도록 소문자로 맞춰 둡니다.
+        self.norm_names = [normalize_name(name or '').lower() for name in text_data['food_name']]
+        self._by_name = {}
+        self._by_representative = {}
+        self._by_code = {}
+        for i, name in enumerate(self.norm_names):
+            self._by_name.setdefault(name, []).append(i)
+        for i, code in enumerate(text_data.get('food_code', [])):
+            self._by_code.setdefault(code, i)
+        for i, name in enumerate(text_data.get('representative_food_name', [])):
+            if name:
+                self._by_representative.setdefault(normalize_name(name).lower(), []).append(i)
+
+        # 음식명 부분 일치 검색 결과는 최근 검색어 SEARCH_CACHE_SIZE개까지 보관합니다. (LRU)
+        self._search_cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, db_path=DB_PATH):
+        """DB에서 food_nutrition 테이블 전체를 rowid 순서로 읽어 인덱스를 만듭니다."""
+        conn = sqlite3.connect(read_only_uri(db_path), uri=True)
+        try:
+            cursor = conn.execute("SELECT * FROM food_nutrition ORDER BY rowid")
+            columns = [d[0] for d in cursor.description]
+            numeric_columns = [c for c in columns if c in NUMERIC_COLUMNS]
+            rows = cursor.fetchall()
+        finally:
+            conn.close()
+
+        numeric_data = {}
+        numeric_others = {}
+        text_data = {}
+        for i, column in enumerate(columns):
+            if column in numeric_columns:
+                numeric_data[column], others = _numeric_column(rows, i)
+                if others:
+                    numeric_others[column] = others
+            else:
+                text_data[column] = [sys.intern(row[i]) if isinstance(row[i], str) else row[i] for row in rows]
+        return cls(columns, text_data, numeric_data, numeric_others)
+
+    def row(self, i):
+        """i번째 행을 get_food_info_by_name()과 같은 형태의 딕셔너리로 반환합니다."""
+        result = {}
+        for column in self.columns:
+            if column in self.numeric_data:
+                value = self.numeric_data[column][i]
+                if np.isnan(value):
+                    result[column] = self.numeric_others.get(column, {}).get(i)
+                else:
+                    result[column] = float(value)
+            else:
+                result[column] = self.text_data[column][i]
+        return result
+
+    def get_by_name(self, food_name):
+        """공백을 제거한 음식명이 정확히 같은 행들을 반환합니다."""
+        return [self.row(i) for i in self._by_name.get(normalize_name(food_name).lower(), [])]
+
+    def get_by_code(self, food_code):
+        """식품코드가 같은 행을 반환합니다. 없으면 None"""
+        i = self._by_code.get(food_code)
+        return None if i is None else self.row(i)
+
+    def get_by_representative_name(self, representative_food_name):
+        """대표식품명이 같은 행들을 반환합니다."""
+        return [self.row(i) for i in self._by_representative.get(normalize_name(representative_food_name).lower(), [])]
+
+    def search(self, food_name):
+        """
+        get_food_info_by_name()과 같은 규칙으로 음식명을 검색합니다.
+        검색어로 시작하는 음식을 먼저, 그 외 부분 일치 음식을 그 다음에 rowid 순서로 반환합니다.
+        """
+        norm_name = normalize_name(food_name).lower()
+        with self._lock:
+            indices = self._search_cache.get(norm_name)
+            if indices is not None:
+                self._search_cache.move_to_end(norm_name)
+        if indices is None:
+            prefix = [i for i, name in enumerate(self.norm_names) if name.startswith(norm_name)]
+            others = [i for i, name in enumerate(self.norm_names) if norm_name in name and not name.startswith(norm_name)]
+            indices = prefix + others
+            with self._lock:
+                self._search_cache[norm_name] = indices
+                self._search_cache.move_to_end(norm_name)
+                while len(self._search_cache) > SEARCH_CACHE_SIZE:
+                    self._search_cache.popitem(last=False)
+        return [self.row(i) for i in indices]
+
+    def memory_bytes(self):
+        """수치 배열과 문자열 리스트가 차지하는 대략적인 메모리(byte)를 반환합니다."""
+        total = sum(array.nbytes for array in self.numeric_data.values())
+        total += sum(sys.getsizeof(others) for others in self.numeric_others.values())
+        seen = set()
+        for values in self.text_data.values():
+            total += sys.getsizeof(values)
+            for value in values:
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    total += sys.getsizeof(value)
+        return total
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_nutrition_index(db_path=DB_PATH):
+    """프로세스 전체에서 공유하는 인덱스를 반환합니다. 처음 호출될 때 한 번만 DB에서 읽습니다."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = NutritionIndex.load(db_path)
+    return _index
@@ -0,0 +1,204 @@
+"""
+음식명 검색용 인덱스를 만듭니다.
+
+1. food_name_search: 공백을 제거한 음식명(food_name_norm)을 미리 계산해서 저장하고 인덱스를 만듭니다.
+2. food_name_fts: food_name_norm에 대한 FTS5 trigram 테이블로, 3글자 이상의 부분 문자열 검색에 사용합니다.
+
+food_nutrition 테이블에 트리거를 걸어서 행이 추가/수정/삭제될 때 검색 테이블도 함께 갱신됩니다.
+
+사용 예 (기존 DB에 검색 인덱스 추가):
+    python src/db/search_index.py
+"""
+import os
+import sqlite3
+
+DB_PATH = os.path.join(os.path.dirname(__file__), '../../food_nutrition.db')
+
+# FTS5 trigram 토크나이저는 3글자 미만의 검색어를 처리하지 못합니다.
+TRIGRAM_MIN_LENGTH = 3
+
+
+def normalize_name(food_name):
+    """DB 검색 기준과 같이 음식명에서 공백을 제거합니다."""
+    return food_name.replace(' ', '')
+
+
+def has_search_index(conn):
+    row = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ('food_name_search', 'food_name_fts')"
+    ).fetchone()
+    return row[0] == 2
+
+
+SEARCH_INDEX_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS food_nutrition_search_ai",
+    "DROP TRIGGER IF EXISTS food_nutrition_search_ad",
+    "DROP TRIGGER IF EXISTS food_nutrition_search_au",
+    "DROP TABLE IF EXISTS food_name_search",
+    "DROP TABLE IF EXISTS food_name_fts",
+    """
+    CREATE TABLE food_name_search (
+        rowid INTEGER PRIMARY KEY,
+        food_name_norm TEXT NOT NULL
+    )
+    """,
+    "CREATE VIRTUAL TABLE food_name_fts USING fts5(food_name_norm, tokenize = 'trigram')",
+    """
+    INSERT INTO food_name_search (rowid, food_name_norm)
+        SELECT rowid, REPLACE(food_name, ' ', '') FROM food_nutrition
+    """,
+    """
+    INSERT INTO food_name_fts (rowid, food_name_norm)
+        SELECT rowid, food_name_norm FROM food_name_search
+    """,
+    "CREATE INDEX idx_food_name_search_norm ON food_name_search (food_name_norm)",
+    """
+    CREATE TRIGGER food_nutrition_search_ai AFTER INSERT ON food_nutrition BEGIN
+        INSERT INTO food_name_search (rowid, food_name_norm) VALUES (new.rowid, REPLACE(new.food_name, ' ', ''));
+        INSERT INTO food_name_fts (rowid, food_name_norm) VALUES (new.rowid, REPLACE(new.food_name, ' ', ''));
+    END
+    """,
+    """
+    CREATE TRIGGER food_nutrition_search_ad AFTER DELETE ON food_nutrition BEGIN
+        DELETE FROM food_name_search WHERE rowid = old.rowid;
+        DELETE FROM food_name_fts WHERE rowid = old.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER food_nutrition_search_au AFTER UPDATE OF food_name ON food_nutrition BEGIN
+        UPDATE food_name_search SET food_name_norm = REPLACE(new.food_name, ' ', '') WHERE rowid = old.rowid;
+        DELETE FROM food_name_fts WHERE rowid = old.rowid;
+        INSERT INTO food_name_fts (rowid, food_name_norm) VALUES (new.rowid, REPLACE(new.food_name, ' ', ''));
+    END
+    """,
+]
+
+
+def create_search_index(conn, commit=True):
+    """
+    검색 테이블과 트리거를 (다시) 만들고 현재 food_nutrition 데이터로 채웁니다.
+
+    Args:
+        conn (sqlite3.Connection): 쓰기 가능한 DB 연결
+        commit (bool): False이면 호출한 쪽의 트랜잭션 안에서 실행하고 커밋하지 않습니다.
+    """
+    cursor = conn.cursor()
+    for statement in SEARCH_INDEX_STATEMENTS:
+        cursor.execute(statement)
+    if commit:
+        conn.commit()
+
+
+def like_escape(norm_name):
+    """LIKE의 '%', '_'를 글자 그대로 비교하도록 이스케이프합니다. (ESCAPE '\\'와 함께 사용)"""
+    return norm_name.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def build_search_query(food_name):
+    """
+    음식명 검색에 사용할 (쿼리, 파라미터)를 만듭니다.
+    결과 순서는 기존 검색과 같습니다: 검색어로 시작하는 음식 먼저, 그 외 부분 일치 음식은 그 다음 (같은 순위는 rowid 순).
+    """
+    norm_name = normalize_name(food_name)
+    # LIKE 특수문자는 이스케이프해서 글자 그대로 비교합니다.
+    like_name = like_escape(norm_name)
+
+    if len(norm_name) >= TRIGRAM_MIN_LENGTH:
+        # 3글자 이상은 trigram 인덱스로 후보를 찾습니다. 따옴표로 감싸서 검색어 전체를 하나의 구문으로 취급합니다.
+        query = """
+                SELECT f.*
+                FROM food_name_fts
+                JOIN food_name_search s ON s.rowid = food_name_fts.rowid
+                JOIN food_nutrition f ON f.rowid = food_name_fts.rowid
+                WHERE food_name_fts MATCH ?
+                ORDER BY
+                    CASE WHEN s.food_name_norm LIKE ? ESCAPE '\\' THEN 1 ELSE 2 END,
+                    f.rowid
+                """
+        param = ('"' + norm_name.replace('"', '""') + '"', f'{like_name}%')
+    else:
+        # 짧은 검색어는 미리 공백을 제거해 둔 좁은 테이블만 훑습니다. (행마다 REPLACE를 하지 않음)
+        query = """
+                SELECT f.*
+                FROM food_name_search s
+                JOIN food_nutrition f ON f.rowid = s.rowid
+                WHERE s.food_name_norm LIKE ? ESCAPE '\\'
+                ORDER BY
+                    CASE WHEN s.food_name_norm LIKE ? ESCAPE '\\' THEN 1 ELSE 2 END,
+                    f.rowid
+                """
+        param = (f'%{like_name}%', f'{like_name}%')
+    return query, param
+
+
+def build_batch_search_query(food_names, use_search_index=True):
+    """
+    여러 음식명을 한 번의 쿼리로 검색하고, 음식명마다 선택된 행 하나만 돌려주는 (쿼리, 파라미터)를 만듭니다.
+    선택 규칙은 단건 검색 + 선택과 같습니다: 검색 결과 순서(검색어로 시작하는 음식 먼저, rowid 순)에서
+    '외식' 데이터가 있으면 그 중 첫 번째, 없으면 첫 번째 결과.
+
+    결과 행에는 입력 목록의 위치(query_index)가 함께 들어 있고, 찾지 못한 음식명은 결과에 없습니다.
+    """
+    values = []
+    params = []
+    for i, food_name in enumerate(food_names):
+        norm_name = normalize_name(food_name)
+        like_name = like_escape(norm_name)
+        # 3글자 이상은 trigram 인덱스를, 짧은 검색어는 LIKE 검색을 사용합니다. (build_search_query와 같은 기준)
+        phrase = '"' + norm_name.replace('"', '""') + '"' if use_search_index and len(norm_name) >= TRIGRAM_MIN_LENGTH else None
+        values.append("(?, ?, ?, ?)")
+        params.extend([i, phrase, f'%{like_name}%', f'{like_name}%'])
+
+    if use_search_index:
+        candidates = """
+            SELECT q.idx AS query_index, s.food_name_norm AS norm_name, f.rowid AS food_rowid
+            FROM q
+            CROSS JOIN food_name_fts
+            JOIN food_name_search s ON s.rowid = food_name_fts.rowid
+            JOIN food_nutrition f ON f.rowid = food_name_fts.rowid
+            WHERE q.phrase IS NOT NULL AND food_name_fts MATCH q.phrase
+            UNION ALL
+            SELECT q.idx, s.food_name_norm, s.rowid
+            FROM q
+            CROSS JOIN food_name_search s
+            WHERE q.phrase IS NULL AND s.food_name_norm LIKE q.pattern ESCAPE '\\'
+        """
+    else:
+        # 검색 인덱스가 없는 DB는 전체 테이블을 한 번에 훑으면서 모든 검색어와 비교합니다.
+        candidates = """
+            SELECT q.idx AS query_index, REPLACE(f.food_name, ' ', '') AS norm_name, f.rowid AS food_rowid
+            FROM q
+            CROSS JOIN food_nutrition f
+            WHERE REPLACE(f.food_name, ' ', '') LIKE q.pattern ESCAPE '\\'
+        """
+
+    query = f"""
+        WITH q(idx, phrase, pattern, prefix) AS (VALUES {', '.join(values)}),
+        candidates AS ({candidates}),
+        ranked AS (
+            SELECT c.query_index, c.food_rowid,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY c.query_index
+                       ORDER BY
+                           CASE WHEN instr(COALESCE(f.food_origin_name, ''), '외식 ') > 0 THEN 1 ELSE 2 END,
+                           CASE WHEN c.norm_name LIKE q.prefix ESCAPE '\\' THEN 1 ELSE 2 END,
+                           c.food_rowid
+                   ) AS choice
+            FROM candidates c
+            JOIN q ON q.idx = c.query_index
+            JOIN food_nutrition f ON f.rowid = c.food_rowid
+        )
+        SELECT ranked.query_index, f.*
+        FROM ranked
+        JOIN food_nutrition f ON f.rowid = ranked.food_rowid
+        WHERE ranked.choice = 1
+    """
+    return query, params
+
+
+if __name__ == "__main__":
+    conn = sqlite3.connect(DB_PATH)
+    create_search_index(conn)
+    count = conn.execute("SELECT COUNT(*) FROM food_name_search").fetchone()[0]
+    conn.close()
+    print(f"'{DB_PATH}'에 음식명 검색 인덱스를 만들었습니다. ({count}건)")
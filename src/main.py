@@ -1,11 +1,24 @@
 import streamlit as st
+from dotenv import load_dotenv
+
+# 서비스 모듈이 import 시점에 읽는 설정(PREDICT_BACKEND, 캐시 경로 등)에도 .env 값이 적용되도록 가장 먼저 불러옵니다.
+load_dotenv()
+
 from service.img import get_image_from_uploader
 from service.predict import predict
-from service.food_nutrition_service import ask_llm_for_ui
+from service.model_registry import get_classifier
+from service.result_cache import get_result_cache, make_cache_key
+from service.food_nutrition_service import get_nutrients_for_ui, build_ui_result, get_engine, load_class_resolution
+from service.analysis_jobs import analysis_jobs
 from streamlit_star_rating import st_star_rating
 import pandas as pd
 import math
 
+MODEL_PATH = "model/models/kfood_model.keras"
+INDICES_PATH = "model/models/indices-fine-20250827-161229.json"
+# 스트리밍 중인 LLM 분석 결과를 화면에 다시 그리는 주기(초)
+ANALYSIS_POLL_SECONDS = 0.3
+
 def arranged_text(raw_text):
     """텍스트를 정리하여 HTML에서 사용할 수 있도록 포맷팅합니다."""
     text_group = ""
@@ -58,13 +71,14 @@ def result_fragment():
                         st.badge(f"{st.session_state.current_image_confidence}%", icon="💯", color=badge_color, width="content")
                 
                 if st.session_state.image_classified_or_not == True:
-                    # 점수
-                    with st.container(border=False, gap=None):
-                        star_value = map_quarter_to_half(float(st.session_state.current_score / 100) * 5.0)
-                        print("scoring")
-                        print(st.session_state.current_score)
-                        print(star_value)
-                        st_star_rating("", read_only=True, maxValue=5, defaultValue=star_value, key="rating_widget")
+                    # 점수 (LLM 분석이 끝난 뒤에 표시)
+                    if st.session_state.analysis_job is None and not st.session_state.analysis_error:
+                        with st.container(border=False, gap=None):
+                            star_value = map_quarter_to_half(float(st.session_state.current_score / 100) * 5.0)
+                            print("scoring")
+                            print(st.session_state.current_score)
+                            print(star_value)
+                            st_star_rating("", read_only=True, maxValue=5, defaultValue=star_value, key="rating_widget")
                     # 영양 성분
                     with st.container(border=False, gap=None):
                         nuts = st.session_state.current_nutrients
@@ -84,59 +98,129 @@ def result_fragment():
                 else:
                     with st.container(border=False, gap=None):
                         st.write("분류할수 없는 음식입니다")
-            if st.session_state.image_classified_or_not == True:
+            if st.session_state.image_classified_or_not == True and st.session_state.analysis_error:
+                st.markdown("------")
+                st.warning("영양 분석 결과를 가져오지 못했습니다. 잠시 후 다시 시도해주세요.")
+            elif st.session_state.image_classified_or_not == True and st.session_state.analysis_job is None:
                 st.markdown("------")
 
-                style_sheet = """
-                            <style>
-                                .title {
-                                    font-size: 24px;
-                                    font-weight: bold;
-                                    margin: 0;
-                                    padding: 0;
-                                }
-                                .contents {
-                                    font-size: 16px;
-                                    margin: 4px 0 12px 0;
-                                    padding: 0;
-                                    line-height: 1.4;
-                                }
-                                .container {
-                                    margin: 0;
-                                    padding: 0;
-                                }
-                                .score-text, .score-reason, .score-tips {
-                                    margin: 0;
-                                    padding: 0;
-                                }
-                                .mid-title {
-                                    margin-top: 16px;
-                                }
-                                .one-line-result {
-                                    margin-top: 24px;
-                                    font-weight: bold;
-                                    font-size: 20px;
-                                }
-                            </style>
-                """
                 # GPT 내용
-                with st.container():
-                    st.html(style_sheet + f"""
-                            <div style="border-radius: 8px; background-color: rgba(127, 127, 127, 0.5); padding: 16px; margin: 0;">
-                                <div class="container" style="line-height: 64px;">
-                                    <div class="title">💯 건강점수</div>
-                                    <div class="contents score-text">{st.session_state.score_text}</div>
-                                    <div class="title mid-title">📊 영양소별 분석</div>
-                                    <div class="contents score-reason">{arranged_text(st.session_state.reason)}</div>
-                                    <div class="title mid-title">👍 식생활 개선 팁</div>
-                                    <div class="contents score-tips">{arranged_text(st.session_state.tips[:-1])}</div>
-                                    <div class="contents one-line-result">{one_line_text(st.session_state.tips[-1])}</div>
-                                </div>
-                            </div>
-                            """)
+                render_analysis(st.session_state.score_text, st.session_state.reason, st.session_state.tips)
+
+
+def render_analysis(score_text, reason, tips, final=True):
+    """
+    LLM 분석 결과(건강 점수, 영양소별 분석, 개선 팁)를 그립니다.
+    final이 False이면 스트리밍 중인 결과로 보고, 아직 받지 못한 항목은 비워 둡니다.
+    """
+    style_sheet = """
+                <style>
+                    .title {
+                        font-size: 24px;
+                        font-weight: bold;
+                        margin: 0;
+                        padding: 0;
+                    }
+                    .contents {
+                        font-size: 16px;
+                        margin: 4px 0 12px 0;
+                        padding: 0;
+                        line-height: 1.4;
+                    }
+                    .container {
+                        margin: 0;
+                        padding: 0;
+                    }
+                    .score-text, .score-reason, .score-tips {
+                        margin: 0;
+                        padding: 0;
+                    }
+                    .mid-title {
+                        margin-top: 16px;
+                    }
+                    .one-line-result {
+                        margin-top: 24px;
+                        font-weight: bold;
+                        font-size: 20px;
+                    }
+                </style>
+    """
+    if final and tips:
+        # 마지막 팁은 한 줄 요약으로 따로 강조합니다.
+        tips_text = arranged_text(tips[:-1])
+        one_line = one_line_text(tips[-1])
+    else:
+        tips_text = arranged_text(tips or [])
+        one_line = ""
+    with st.container():
+        st.html(style_sheet + f"""
+                <div style="border-radius: 8px; background-color: rgba(127, 127, 127, 0.5); padding: 16px; margin: 0;">
+                    <div class="container" style="line-height: 64px;">
+                        <div class="title">💯 건강점수</div>
+                        <div class="contents score-text">{score_text or "분석 중..."}</div>
+                        <div class="title mid-title">📊 영양소별 분석</div>
+                        <div class="contents score-reason">{arranged_text(reason or [])}</div>
+                        <div class="title mid-title">👍 식생활 개선 팁</div>
+                        <div class="contents score-tips">{tips_text}</div>
+                        <div class="contents one-line-result">{one_line}</div>
+                    </div>
+                </div>
+                """)
+
+
+@st.fragment(run_every=ANALYSIS_POLL_SECONDS)
+def analysis_poll_fragment():
+    """
+    백그라운드 LLM 분석의 진행 상황을 주기적으로 그립니다. 건강 점수가 먼저, 이유와 팁은 받는 대로 채워집니다.
+    분석이 끝나면 결과를 세션에 저장한 뒤 화면 전체를 다시 그립니다.
+    """
+    job = st.session_state.analysis_job
+    if job is None:
+        return
+    if not job.done():
+        partial = job.partial()
+        st.markdown("------")
+        if partial is None:
+            st.info("🤖 AI가 영양 정보를 분석하고 있습니다...")
+            return
+        if partial["score"] is not None:
+            star_value = map_quarter_to_half(float(partial["score"] / 100) * 5.0)
+            st_star_rating("", read_only=True, maxValue=5, defaultValue=star_value, key="rating_widget_stream")
+        render_analysis(partial["score_text"], partial["reason"], partial["tips"], final=False)
+        return
+
+    st.session_state.analysis_job = None
+    try:
+        analysis = job.result()
+    except Exception as e:
+        print(f"LLM 분석 오류: {e}")
+        st.session_state.analysis_error = True
+        st.rerun()
+        return
+
+    results = build_ui_result(st.session_state.current_nutrients, analysis)
+    apply_results(results)
+    get_result_cache().put(st.session_state.cache_key, {"pred": st.session_state.current_pred, "results": results})
+    st.rerun()
+
+
+def apply_results(results):
+    """분석 결과(ask_llm_for_ui() 형식)를 화면 표시용 세션 상태에 저장합니다."""
+    st.session_state.current_score = results["score"]
+    st.session_state.current_nutrients = results["nutrients"]
+    st.session_state.score_text = results["analysis"]["score_text"]
+    st.session_state.reason = results["analysis"]["reason"]
+    st.session_state.tips = results["analysis"]["tips"]
 
 
 def main():
+    # 앱 시작 시 모델을 미리 로드하고 워밍업합니다. 이후 실행에서는 레지스트리 캐시를 그대로 사용합니다.
+    get_classifier(MODEL_PATH, INDICES_PATH)
+    # LLM 분석 엔진(에이전트, HTTP 클라이언트)도 시작 시 한 번만 만들어 둡니다.
+    get_engine()
+    # 분류 클래스별 식품코드 매핑을 읽어서 요청마다 음식명 검색을 하지 않도록 합니다.
+    load_class_resolution(INDICES_PATH)
+
     st.title("🥣 AI 기반 한식 영양 분석 서비스")
     st.badge("음식 사진을 업로드해서 좋은 음식인지 나쁜 음식인지 알아보세요", color="blue")
     st.divider()
@@ -166,6 +250,15 @@ def main():
         st.session_state.current_image_confidence = None
     if "image_classified_or_not" not in st.session_state:
         st.session_state.image_classified_or_not = None
+    # 백그라운드에서 실행 중인 LLM 분석 작업 (없으면 None)
+    if "analysis_job" not in st.session_state:
+        st.session_state.analysis_job = None
+    if "analysis_error" not in st.session_state:
+        st.session_state.analysis_error = False
+    if "cache_key" not in st.session_state:
+        st.session_state.cache_key = None
+    if "current_pred" not in st.session_state:
+        st.session_state.current_pred = None
 
     if uploaded_file is not None:
         if st.session_state.current_file_name != uploaded_file.name:
@@ -188,31 +281,47 @@ def main():
         # 이미지 처리 및 예측 (새 파일일 때만)
         if st.session_state.current_score is None:
             st.session_state.current_image = uploaded_file
-            img_array = get_image_from_uploader(uploaded_file)
-            # 예측 코드
-            # 첫번째는 이미지 배열, 두번째는 모델 경로, 세번째는 class_indices경로를 넣어주면 됩니다!
-            pred = predict(img_array, 
-                           "model/models/kfood_model.keras",
-                           "model/models/indices-fine-20250827-161229.json")
-            
+            # 같은 사진은 파일명과 관계없이 이미지 내용 해시 + 모델 버전으로 캐시된 결과를 재사용합니다.
+            classifier = get_classifier(MODEL_PATH, INDICES_PATH)
+            cache_key = make_cache_key(uploaded_file.getvalue(), classifier.version)
+            cached = get_result_cache().get(cache_key)
+            if cached is not None:
+                pred = cached["pred"]
+                results = cached["results"]
+            else:
+                img_array = get_image_from_uploader(uploaded_file)
+                # 예측 코드
+                # 첫번째는 이미지 배열, 두번째는 모델 경로, 세번째는 class_indices경로를 넣어주면 됩니다!
+                pred = predict(img_array, MODEL_PATH, INDICES_PATH)
+                results = None
+                if float(pred['confidence']) < 50.0:
+                    get_result_cache().put(cache_key, {"pred": pred, "results": None})
+
+            st.session_state.cache_key = cache_key
+            st.session_state.current_pred = pred
             st.session_state.current_image_confidence = pred['confidence']
             if float(pred['confidence']) < 50.0:
                 st.session_state.image_classified_or_not = False
                 st.session_state.current_image_name = "미분류"
                 st.session_state.current_score = 1
+            elif results is not None:
+                st.session_state.image_classified_or_not = True
+                st.session_state.current_image_name = pred['predict'][0]
+                apply_results(results)
             else:
+                # 분류 결과와 영양소 표는 바로 표시하고, LLM 분석은 백그라운드에서 실행합니다.
                 st.session_state.image_classified_or_not = True
                 st.session_state.current_image_name = pred['predict'][0]
-                # LLM 호출 코드
-                results = ask_llm_for_ui(pred['predict'][0])
-                st.session_state.current_score = results["score"]
-                st.session_state.current_nutrients = results["nutrients"]
-                st.session_state.score_text = results["analysis"]["score_text"]
-                st.session_state.reason = results["analysis"]["reason"]
-                st.session_state.tips = results["analysis"]["tips"]
+                food_data, nutrients = get_nutrients_for_ui(pred['predict'][0])
+                st.session_state.current_nutrients = nutrients
+                st.session_state.current_score = 0
+                st.session_state.analysis_job = analysis_jobs.submit(pred['predict'][0], food_data)
 
         # 결과 컨테이너 - fragment로 독립적으로 렌더링
         result_fragment()
+        # LLM 분석이 진행 중이면 완료될 때까지 주기적으로 확인합니다. 완료되면 화면 전체를 다시 그립니다.
+        if st.session_state.analysis_job is not None:
+            analysis_poll_fragment()
         
     st.markdown("------")
     st.write("제작자 : ICT-3기 A팀")
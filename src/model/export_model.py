@@ -0,0 +1,150 @@
+"""
+학습된 Keras 분류 모델(kfood_model.keras)을 TFLite(선택적으로 ONNX) 형식으로 변환합니다.
+
+변환 후에는 Keras 모델과 변환 모델이 같은 이미지에 대해 같은 top-1 클래스를 내는지 확인(parity check)하고,
+하나라도 다르면 종료 코드 1로 끝납니다.
+
+사용 예:
+    python export_model.py --model ./models/kfood_model.keras --onnx --check-dir E:\\AIWork\\Data\\테스트\\valid
+"""
+import os
+import sys
+import random
+import argparse
+import numpy as np
+import tensorflow as tf
+from PIL import Image
+from tensorflow.keras.models import load_model
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from service.backends import TFLiteBackend, OnnxBackend
+
+MODEL_PATH = './models/kfood_model.keras'
+TARGET_SIZE = (224, 224)
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.bmp']
+
+
+def export_tflite(model, out_path, optimizations=None, representative_dataset=None, int8=False):
+    """
+    Keras 모델을 TFLite 파일로 변환합니다.
+
+    Args:
+        model: 변환할 Keras 모델
+        out_path (str): 저장할 .tflite 파일 경로
+        optimizations (list): tf.lite.Optimize 목록. None이면 float32 그대로 변환합니다.
+        representative_dataset (callable): 전체 정수 양자화에 사용할 대표 데이터셋 생성 함수
+        int8 (bool): True이면 입력/출력까지 모두 int8 연산으로 변환합니다.
+
+    Returns:
+        int: 저장된 파일 크기(byte)
+    """
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if optimizations:
+        converter.optimizations = optimizations
+    if representative_dataset is not None:
+        converter.representative_dataset = representative_dataset
+    if int8:
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.uint8
+        converter.inference_output_type = tf.uint8
+
+    tflite_model = converter.convert()
+    with open(out_path, 'wb') as f:
+        f.write(tflite_model)
+    return len(tflite_model)
+
+
+def export_onnx(model, out_path, opset=13):
+    """Keras 모델을 ONNX 파일로 변환합니다. tf2onnx 패키지가 필요합니다."""
+    import tf2onnx
+
+    input_signature = [tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32, name="input")]
+    model_proto, _ = tf2onnx.convert.from_keras(model, input_signature=input_signature, opset=opset)
+    with open(out_path, 'wb') as f:
+        f.write(model_proto.SerializeToString())
+    return os.path.getsize(out_path)
+
+
+def load_sample_images(image_dir, count, target_size=TARGET_SIZE, seed=42, offset=0):
+    """
+    디렉토리(하위 폴더 포함)에서 이미지를 count장 골라 (N, H, W, 3) float32 배열로 반환합니다.
+    학습 때와 같이 0~1 범위로 정규화합니다. 폴더명(클래스명) 리스트도 함께 반환합니다.
+    seed로 섞은 목록의 offset번째부터 고르므로, 같은 seed에 겹치지 않는 offset을 주면 서로 다른 이미지를 얻습니다.
+    """
+    image_paths = []
+    for root, _, files in os.walk(image_dir):
+        for file in files:
+            if os.path.splitext(file)[1].lower() in IMAGE_EXTENSIONS:
+                image_paths.append(os.path.join(root, file))
+    image_paths.sort()
+
+    random.Random(seed).shuffle(image_paths)
+    image_paths = image_paths[offset:offset + count]
+
+    images = np.empty((len(image_paths),) + tuple(target_size) + (3,), dtype=np.float32)
+    labels = []
+    for i, path in enumerate(image_paths):
+        with Image.open(path) as img:
+            img = img.convert('RGB').resize(target_size)
+            images[i] = np.asarray(img, dtype=np.float32) / 255.0
+        labels.append(os.path.basename(os.path.dirname(path)))
+    return images, labels
+
+
+def check_parity(model, backend, images, batch_size=32):
+    """
+    Keras 모델과 변환된 백엔드의 top-1 예측을 비교합니다.
+
+    Returns:
+        int: top-1 클래스가 다른 이미지 수
+    """
+    mismatches = 0
+    for i in range(0, len(images), batch_size):
+        batch = images[i:i + batch_size]
+        expected = np.argmax(model(batch, training=False).numpy(), axis=1)
+        actual = np.argmax(backend.predict_proba(batch), axis=1)
+        mismatches += int(np.sum(expected != actual))
+    return mismatches
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Keras 분류 모델을 TFLite/ONNX로 변환합니다.")
+    parser.add_argument('--model', default=MODEL_PATH, help="변환할 Keras 모델 경로")
+    parser.add_argument('--out-dir', default=None, help="변환 파일을 저장할 폴더 (기본값: 모델과 같은 폴더)")
+    parser.add_argument('--onnx', action='store_true', help="ONNX 파일도 함께 생성합니다.")
+    parser.add_argument('--check-dir', default=None, help="parity check에 사용할 이미지 폴더 (없으면 랜덤 입력 사용)")
+    parser.add_argument('--check-count', type=int, default=200, help="parity check에 사용할 이미지 수")
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+    out_dir = args.out_dir or os.path.dirname(os.path.abspath(args.model))
+    os.makedirs(out_dir, exist_ok=True)
+    base_name = os.path.splitext(os.path.basename(args.model))[0]
+
+    if args.check_dir:
+        images, _ = load_sample_images(args.check_dir, args.check_count)
+    else:
+        images = np.random.default_rng(0).random((args.check_count,) + TARGET_SIZE + (3,), dtype=np.float32)
+
+    exported = []
+    tflite_path = os.path.join(out_dir, f"{base_name}.tflite")
+    size = export_tflite(model, tflite_path)
+    print(f"TFLite 변환 완료: {tflite_path} ({size / 1024 / 1024:.1f}MB)")
+    exported.append((tflite_path, TFLiteBackend(tflite_path)))
+
+    if args.onnx:
+        onnx_path = os.path.join(out_dir, f"{base_name}.onnx")
+        size = export_onnx(model, onnx_path)
+        print(f"ONNX 변환 완료: {onnx_path} ({size / 1024 / 1024:.1f}MB)")
+        exported.append((onnx_path, OnnxBackend(onnx_path)))
+
+    failed = False
+    for path, backend in exported:
+        mismatches = check_parity(model, backend, images)
+        print(f"parity check [{backend.name}]: top-1 불일치 {mismatches}/{len(images)}")
+        if mismatches:
+            failed = True
+
+    if failed:
+        print("오류: 변환된 모델의 top-1 예측이 Keras 모델과 다릅니다.")
+        sys.exit(1)
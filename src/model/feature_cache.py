@@ -0,0 +1,197 @@
+"""
+동결된(frozen) MobileNetV2 백본의 출력 특징을 미리 계산해서 저장하고, 분류기(Dense head)만 그 특징으로 학습합니다.
+
+1단계 학습에서는 base_model.trainable = False이므로 매 에포크 같은 이미지에 대해 같은 백본 연산을 반복합니다.
+백본을 한 번만 실행해서 GlobalAveragePooling 결과(1280차원)를 memory-mapped .npy 파일로 저장해 두면,
+head 학습은 작은 Dense 층만 계산하므로 에포크당 몇 초 안에 끝납니다. 미세 조정(2단계)은 기존처럼 이미지로 학습합니다.
+
+저장 형식 (cache_dir):
+    features.npy  (N, 1280) float32, np.load(mmap_mode='r')로 읽음
+    labels.npy    (N,) int32 클래스 인덱스
+    meta.json     class_indices, 원본 폴더와 내용 해시, 이미지 크기, 증강 복사본 수 등 (추출이 끝난 뒤에 씀)
+
+사용 예:
+    python src/model/feature_cache.py --data E:\\AIWork\\Data\\테스트\\train --out ./features/train --augment-copies 2
+"""
+import os
+import json
+import argparse
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.applications import MobileNetV2
+from tensorflow.keras.layers import Dense, GlobalAveragePooling2D, Dropout, Input
+from tensorflow.keras.models import Model
+from train_input import build_dataset, describe_dataset, dataset_digest, TARGET_SIZE, SEED
+
+FEATURE_DIM = 1280
+BATCH_SIZE = 64
+FEATURES_FILE = 'features.npy'
+LABELS_FILE = 'labels.npy'
+META_FILE = 'meta.json'
+
+
+def build_backbone(target_size=TARGET_SIZE):
+    """학습 스크립트와 같은 ImageNet 가중치의 MobileNetV2 (분류층 제외)"""
+    return MobileNetV2(weights='imagenet', include_top=False, input_shape=(target_size[0], target_size[1], 3))
+
+
+def extract_features(directory, cache_dir, base_model=None, target_size=TARGET_SIZE, batch_size=BATCH_SIZE,
+                     augment_copies=0, subset=None, validation_split=0.0, seed=SEED, class_indices=None):
+    """
+    폴더의 이미지를 동결된 백본에 한 번만 통과시켜 풀링된 특징을 cache_dir에 저장합니다.
+
+    Args:
+        augment_copies (int): 원본 외에 추가로 저장할 증강(shear/zoom/flip) 복사본 수. 0이면 원본만 저장합니다.
+        class_indices (dict): 지정하면 라벨을 클래스 이름 기준으로 이 인덱스(학습 데이터의 class_indices)에 맞춥니다.
+                              검증 데이터에 없는 클래스가 있어도 라벨이 밀리지 않습니다.
+
+    Returns:
+        dict: 저장한 캐시의 meta 정보
+    """
+    if base_model is None:
+        base_model = build_backbone(target_size)
+    extractor = tf.function(lambda images: GlobalAveragePooling2D()(base_model(images, training=False)))
+
+    image_count, class_indices = describe_dataset(directory, subset, validation_split, class_indices)
+    content_digest = dataset_digest(directory, subset, validation_split, class_indices)
+    total = image_count * (1 + augment_copies)
+    os.makedirs(cache_dir, exist_ok=True)
+    # meta.json은 추출이 끝난 뒤에만 쓰므로, 중간에 중단되면 캐시가 없는 것으로 처리되어 다음 실행에서 다시 추출합니다.
+    meta_path = os.path.join(cache_dir, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    # 특징은 파일에 바로 쓰므로 데이터 크기와 관계없이 메모리에는 배치 하나만 올라갑니다.
+    features = np.lib.format.open_memmap(os.path.join(cache_dir, FEATURES_FILE), mode='w+',
+                                         dtype=np.float32, shape=(total, FEATURE_DIM))
+    labels = np.lib.format.open_memmap(os.path.join(cache_dir, LABELS_FILE), mode='w+', dtype=np.int32, shape=(total,))
+
+    position = 0
+    for copy in range(1 + augment_copies):
+        # 첫 번째는 증강 없는 원본, 이후는 복사본마다 다른 시드로 증강한 이미지
+        dataset, _ = build_dataset(directory, target_size, batch_size, training=copy > 0, subset=subset,
+                                   validation_split=validation_split, seed=seed + copy, cache=False,
+                                   class_indices=class_indices)
+        for images, one_hot in dataset:
+            batch_features = extractor(images).numpy()
+            count = len(batch_features)
+            features[position:position + count] = batch_features
+            labels[position:position + count] = np.argmax(one_hot.numpy(), axis=1)
+            position += count
+        print(f"특징 추출 {position}/{total}")
+
+    features.flush()
+    labels.flush()
+    meta = {
+        "source_dir": os.path.abspath(directory),
+        "subset": subset,
+        "validation_split": validation_split,
+        "target_size": list(target_size),
+        "augment_copies": augment_copies,
+        "seed": seed,
+        "content_digest": content_digest,
+        "count": total,
+        "feature_dim": FEATURE_DIM,
+        "class_indices": class_indices,
+    }
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=4)
+    return meta
+
+
+def load_features(cache_dir):
+    """저장된 특징 캐시를 (features memmap, labels, meta)로 읽습니다. 캐시가 없으면 None을 반환합니다."""
+    meta_path = os.path.join(cache_dir, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    features = np.load(os.path.join(cache_dir, FEATURES_FILE), mmap_mode='r')
+    labels = np.load(os.path.join(cache_dir, LABELS_FILE))
+    return features, labels, meta
+
+
+def get_or_extract_features(directory, cache_dir, base_model=None, **kwargs):
+    """
+    같은 설정, 같은 데이터로 만든 캐시가 있으면 재사용하고, 없거나 설정/데이터가 다르면 새로 추출합니다.
+    데이터는 폴더 경로뿐 아니라 내용 해시(파일 목록, 크기, 수정 시각 또는 shard digest)로 비교합니다.
+    """
+    cached = load_features(cache_dir)
+    if cached is not None:
+        meta = cached[2]
+        subset = kwargs.get("subset")
+        validation_split = kwargs.get("validation_split", 0.0)
+        expected = {
+            "source_dir": os.path.abspath(directory),
+            "content_digest": dataset_digest(directory, subset, validation_split, kwargs.get("class_indices")),
+            "subset": subset,
+            "validation_split": validation_split,
+            "target_size": list(kwargs.get("target_size", TARGET_SIZE)),
+            "augment_copies": kwargs.get("augment_copies", 0),
+            "seed": kwargs.get("seed", SEED),
+        }
+        if all(meta.get(key) == value for key, value in expected.items()):
+            print(f"특징 캐시 사용: {cache_dir} ({meta['count']}개)")
+            return cached
+        print(f"특징 캐시의 설정 또는 데이터가 달라서 다시 추출합니다: {cache_dir}")
+    extract_features(directory, cache_dir, base_model, **kwargs)
+    return load_features(cache_dir)
+
+
+def feature_dataset(features, labels, num_classes, batch_size=BATCH_SIZE, shuffle=False, seed=SEED):
+    """
+    memmap 특징 배열을 배치 단위로 읽는 tf.data 데이터셋을 만듭니다. 전체 배열을 메모리에 올리지 않습니다.
+    """
+    count = len(labels)
+    indices = tf.data.Dataset.range(count)
+    if shuffle:
+        indices = indices.shuffle(count, seed=seed, reshuffle_each_iteration=True)
+    indices = indices.batch(batch_size)
+
+    def gather(batch_indices):
+        # 디스크에서 순서대로 읽도록 정렬한 뒤 가져옵니다. (배치 안의 순서는 학습에 영향 없음)
+        batch_indices = np.sort(batch_indices)
+        return np.asarray(features[batch_indices], dtype=np.float32), labels[batch_indices]
+
+    def to_model_input(batch_indices):
+        batch_features, batch_labels = tf.numpy_function(gather, [batch_indices], [tf.float32, tf.int32])
+        batch_features.set_shape([None, features.shape[1]])
+        return batch_features, tf.one_hot(batch_labels, num_classes)
+
+    return indices.map(to_model_input, num_parallel_calls=tf.data.AUTOTUNE).prefetch(tf.data.AUTOTUNE)
+
+
+def build_head(num_classes, feature_dim=FEATURE_DIM):
+    """korean_foods_model_cho_fine.py와 같은 구조의 분류기(Dense head)를 특징 입력으로 만듭니다."""
+    inputs = Input(shape=(feature_dim,))
+    x = Dense(1024, activation='relu')(inputs)
+    x = Dropout(0.5)(x)
+    x = Dense(512, activation='relu')(x)
+    outputs = Dense(num_classes, activation='softmax')(x)
+    return Model(inputs=inputs, outputs=outputs)
+
+
+def attach_head(base_model, head):
+    """
+    백본 + GlobalAveragePooling + head 층으로 이미지 입력 모델을 만들고, 특징으로 학습한 head 가중치를 복사합니다.
+    만들어지는 모델의 층 구성은 기존 학습 스크립트의 모델과 같습니다.
+    """
+    x = GlobalAveragePooling2D()(base_model.output)
+    for layer in head.layers[1:]:
+        new_layer = layer.__class__.from_config(layer.get_config())
+        x = new_layer(x)
+        new_layer.set_weights(layer.get_weights())
+    return Model(inputs=base_model.input, outputs=x)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="동결된 MobileNetV2 특징을 미리 추출해서 저장합니다.")
+    parser.add_argument("--data", required=True, help="클래스별 하위 폴더가 있는 데이터 폴더")
+    parser.add_argument("--out", required=True, help="특징 캐시를 저장할 폴더")
+    parser.add_argument("--augment-copies", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    meta = extract_features(args.data, args.out, batch_size=args.batch_size, augment_copies=args.augment_copies,
+                            seed=args.seed)
+    print(f"'{args.out}'에 특징 {meta['count']}개를 저장했습니다.")
@@ -6,6 +6,12 @@
 4. 하위의 폴더들에는 'crop_area.properties'파일이 있는 경우는 프로퍼티 파일을 읽어서 해당파일명이 있으면 프로퍼티에 입력되어 있는 좌표대로 이미지를 크롭한다.
 5. 크롭된 이미지를 인자로 입력된 dest폴더로 복사한다  
 6. 'crop_area.properties'파일이 없으면 dest폴더로 복사한다. 
+7. 처리 결과는 dest폴더의 result.json(manifest)에 기록하고, 다시 실행하면 이미 처리된 파일은 건너뛴다.
+
+사용 예:
+    python file_pre_processing.py --count 100
+    python file_pre_processing.py --count 100 --valid --workers 8
+    python file_pre_processing.py --count 100 --pack --dest E:/AIWork/Data/테스트/train_shards
 """
 
 import os
@@ -16,6 +22,24 @@ from typing import List, Dict, Tuple
 import time
 import json
 import random
+import hashlib
+import argparse
+import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from shard_index import SHARD_INDEX_FILE, read_shard_index
+
+CROP_PROPERTIES = 'crop_area.properties'
+MANIFEST_FILE = 'result.json'
+# 파일 샘플링 시드. 같은 값이면 같은 파일을 선택합니다.
+SEED = 123
+# 검증용 파일 수 비율 (폴더별 학습용 파일 수 기준)
+VALID_RATIO = 0.3
+# 이 개수만큼 처리할 때마다 진행 상황을 출력하고 manifest를 중간 저장합니다.
+PROGRESS_EVERY = 1000
+
+# 학습용 shard 설정 (pack_shards)
+PACK_IMAGE_SIZE = (224, 224)
+SHARD_SIZE = 1024
 
 
 def read_properties(prop_file: str) -> Dict[str, Tuple[int, int, int, int]]:
@@ -69,6 +93,20 @@ def get_lowest_dirs(target_dir: str) -> List[str]:
     return lowest_dirs
 
 
+def read_image(image_path: str) -> any:
+    """한글 경로 문제를 해결하기 위해 numpy로 파일을 읽어 OpenCV(BGR) 이미지로 디코딩합니다. 실패 시 None을 반환합니다."""
+    try:
+        with open(image_path, 'rb') as f:
+            img_array = np.frombuffer(f.read(), np.uint8)
+            img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+        if img is None:
+            raise IOError("Failed to decode image")
+    except Exception as e:
+        print(f"Error: 이미지 읽기 실패 {image_path} - {e}")
+        return None
+    return img
+
+
 def crop_image(image_path: str, coords: Tuple[int, int, int, int]) -> any:
     """
     주어진 좌표에 따라 이미지를 자릅니다. 한글 경로 문제를 해결하기 위해 numpy로 파일을 읽습니다.
@@ -80,128 +118,431 @@ def crop_image(image_path: str, coords: Tuple[int, int, int, int]) -> any:
     Returns:
         any: 잘린 이미지 객체 (OpenCV 이미지). 실패 시 None을 반환합니다.
     """
-    try:
-        with open(image_path, 'rb') as f:
-            img_array = np.frombuffer(f.read(), np.uint8)
-            img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
-        if img is None:
-            raise IOError("Failed to decode image")
-    except Exception as e:
-        print(f"Error: 이미지 읽기 실패 {image_path} - {e}")
+    img = read_image(image_path)
+    if img is None:
         return None
-    
+
     x, y, w, h = coords
     return img[y:y + h, x:x + w]
 
 
-def train_files_pre_process(target_dir, dest_dir, count, is_valid=False):
+def split_counts(total: int, count: int) -> Tuple[int, int]:
     """
-    대상 디렉토리의 이미지 파일들을 전처리하여 목적 디렉토리로 복사합니다.
+    파일이 total개인 폴더의 (학습용, 검증용) 파일 수를 반환합니다.
+    기본은 (count, count * VALID_RATIO)이고, 폴더의 파일이 부족하면 같은 비율로 나눠서 검증용이 비지 않게 합니다.
+    """
+    valid = max(int(count * VALID_RATIO), 1)
+    if total >= count + valid:
+        return count, valid
+    # 파일이 2개 이상이면 검증용을 최소 1개 남깁니다.
+    valid = min(max(int(total * VALID_RATIO / (1 + VALID_RATIO)), 1), total - 1) if total >= 2 else 0
+    return total - valid, valid
 
-    'crop_area.properties' 파일이 있는 경우, 해당 파일의 좌표 정보를 이용해 이미지를 자른 후 복사합니다.
-    파일이 없으면 원본 이미지를 그대로 복사합니다.
-    한글 경로 문제를 해결하기 위해 cv2.imencode를 사용하여 파일을 저장합니다.
+
+def plan_files(target_dir: str, count: int, is_valid: bool = False, seed: int = SEED) -> Tuple[List[Dict], List[str]]:
+    """
+    처리할 파일 목록과 각 파일의 저장 위치(dest 폴더 기준 상대 경로)를 정합니다.
+
+    폴더와 파일을 정렬한 뒤 고정된 시드로 섞으므로 같은 인자로 실행하면 항상 같은 파일을 선택합니다.
+    학습용과 검증용은 폴더마다 같은 순서로 섞은 목록을 나눠 쓰므로 겹치지 않습니다.
+    (학습용은 앞에서 count개, 검증용은 그 다음 count * VALID_RATIO개. 파일이 부족한 폴더는 split_counts()의 비율로 나눔)
+    저장 파일명도 여기서 미리 정하므로 다시 실행해도 '_1' 같은 중복 파일이 생기지 않습니다.
 
     Args:
         target_dir (str): 원본 이미지 파일들이 있는 대상 디렉토리
-        dest_dir (str): 전처리된 파일들을 저장할 목적 디렉토리
-        count (int): 각 하위 폴더에서 처리할 파일의 수. 0이면 모든 파일을 처리합니다.
+        count (int): 각 하위 폴더의 학습용 파일 수. 0이면 학습용/검증용 모두 모든 파일을 처리합니다. (나누지 않음)
+        is_valid (bool): True이면 검증용 파일 목록을 만듭니다.
 
     Returns:
-        dict: 처리된 파일명을 키로, {'folder': 원본폴더명, 'type': 파일유형}을 값으로 하는 딕셔너리
+        Tuple[List[Dict], List[str]]: ({'source', 'dest', 'type', 'crop'} 딕셔너리의 리스트,
+                                       선택된 파일이 없는 클래스(폴더명) 리스트)
     """
+    used_names = {}
+    tasks = []
 
-    if is_valid:
-        count = int(count * 0.3)
-
-
-    os.makedirs(dest_dir, exist_ok=True)
-    result = {}
-
-    for dir_path in get_lowest_dirs(target_dir):
+    for dir_path in sorted(get_lowest_dirs(target_dir)):
         # Use only the last directory name for destination
         folder_type = os.path.basename(dir_path)
-        current_dest_dir = os.path.join(dest_dir, folder_type)
-        os.makedirs(current_dest_dir, exist_ok=True)
-
-        prop_file = os.path.join(dir_path, 'crop_area.properties')
-        crop_areas = read_properties(prop_file)
+        crop_areas = read_properties(os.path.join(dir_path, CROP_PROPERTIES))
 
-        files = [f for f in os.listdir(dir_path) if os.path.isfile(os.path.join(dir_path, f))
-                 and f != 'crop_area.properties']
+        files = sorted(f for f in os.listdir(dir_path) if os.path.isfile(os.path.join(dir_path, f))
+                       and f != CROP_PROPERTIES)
 
         if count > 0:
-            # Set random seed based on current time
-            random.seed(int(time.time()))
-            files = random.sample(files, min(count, len(files)))
-
+            # 폴더마다 (시드, 폴더명)으로 정해지는 순서로 섞고, 학습용/검증용이 서로 다른 구간을 사용합니다.
+            files = random.Random(f"{seed}:{folder_type}").sample(files, len(files))
+            train_count, valid_count = split_counts(len(files), count)
+            if is_valid:
+                files = files[train_count:train_count + valid_count]
+            else:
+                files = files[:train_count]
+
+        names = used_names.setdefault(folder_type, set())
         for file in files:
-            src_path = os.path.join(dir_path, file)
-            dest_path = os.path.join(current_dest_dir, file)
-
             # 파일명이 중복되면 폴더명을 포함하여 이름 변경
             base, ext = os.path.splitext(file)
+            dest_name = file
             counter = 1
-            while os.path.exists(dest_path):
-                dest_path = os.path.join(current_dest_dir, f"{base}_{folder_type}_{counter}{ext}")
+            while dest_name in names:
+                dest_name = f"{base}_{folder_type}_{counter}{ext}"
                 counter += 1
+            names.add(dest_name)
 
-            try:
-                file_name_only = os.path.splitext(file)[0]
-                if file_name_only in crop_areas:
-                    cropped = crop_image(src_path, crop_areas[file_name_only])
-                    if cropped is not None:
-                        extension = os.path.splitext(dest_path)[1]
-                        result_encode, encoded_img = cv2.imencode(extension, cropped)
-                        if result_encode:
-                            with open(dest_path, 'wb') as f:
-                                f.write(encoded_img)
-                            result[file] = folder_type
-                        else:
-                            print(f"Warning: 이미지 인코딩 실패 {src_path}")
-                    else:
-                        print(f"Warning: 이미지 크롭 실패 {src_path}")
-                else:
-                    for attempt in range(3):
-                        try:
-                            shutil.copy2(src_path, dest_path)
-                            result[file] = {'folder': dir_path, 'type': folder_type}
-                            break
-                        except PermissionError as e:
-                            print(f"파일 사용 중, {file} - {e}, 재시도 {attempt + 1}/3")
-                            time.sleep(1)
-                    else:
-                        print(f"복사 실패: {file}")
-            except Exception as e:
-                print(f"처리 중 오류 발생 {file}: {e}")
+            tasks.append({
+                'source': os.path.join(dir_path, file),
+                'dest': os.path.join(folder_type, dest_name),
+                'type': folder_type,
+                'crop': crop_areas.get(base),
+            })
+
+    # 파일이 너무 적은 클래스는 빠지므로 알려 줍니다. (라벨은 학습 시 class_indices 기준으로 맞춤)
+    empty_classes = sorted(set(used_names) - {task['type'] for task in tasks})
+    if empty_classes:
+        print(f"경고: {'검증' if is_valid else '학습'}용으로 선택된 파일이 없는 클래스 {len(empty_classes)}개: {empty_classes[:10]}")
+    return tasks, empty_classes
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
 
-    return result
+
+def source_signature(path: str) -> List[int]:
+    """원본 파일이 바뀌었는지 확인하기 위한 (크기, 수정 시각) 값"""
+    stat = os.stat(path)
+    return [stat.st_size, int(stat.st_mtime)]
+
+
+def process_file(task: Dict, dest_dir: str, previous: Dict = None) -> Dict:
+    """
+    파일 하나를 크롭(또는 복사)해서 저장합니다. 프로세스 풀의 작업 프로세스에서 실행됩니다.
+
+    이전 manifest 기록(previous)과 원본/크롭 좌표가 같고, 저장된 파일의 해시가 기록과 같으면 다시 처리하지 않습니다.
+
+    Returns:
+        Dict: manifest에 기록할 결과. status는 'processed', 'skipped', 'failed' 중 하나
+    """
+    src_path = task['source']
+    dest_path = os.path.join(dest_dir, task['dest'])
+    crop = list(task['crop']) if task['crop'] else None
+    record = {'source': src_path, 'type': task['type'], 'crop': crop}
+
+    try:
+        record['source_signature'] = source_signature(src_path)
+        if (previous and previous.get('source') == src_path and previous.get('crop') == crop
+                and previous.get('source_signature') == record['source_signature']
+                and os.path.exists(dest_path) and file_sha256(dest_path) == previous.get('sha256')):
+            record['sha256'] = previous['sha256']
+            record['status'] = 'skipped'
+            return record
+
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        if crop:
+            cropped = crop_image(src_path, task['crop'])
+            if cropped is None:
+                print(f"Warning: 이미지 크롭 실패 {src_path}")
+                record['status'] = 'failed'
+                return record
+            result_encode, encoded_img = cv2.imencode(os.path.splitext(dest_path)[1], cropped)
+            if not result_encode:
+                print(f"Warning: 이미지 인코딩 실패 {src_path}")
+                record['status'] = 'failed'
+                return record
+            with open(dest_path, 'wb') as f:
+                f.write(encoded_img)
+        else:
+            for attempt in range(3):
+                try:
+                    shutil.copy2(src_path, dest_path)
+                    break
+                except PermissionError as e:
+                    print(f"파일 사용 중, {src_path} - {e}, 재시도 {attempt + 1}/3")
+                    time.sleep(1)
+            else:
+                print(f"복사 실패: {src_path}")
+                record['status'] = 'failed'
+                return record
+
+        record['sha256'] = file_sha256(dest_path)
+        record['status'] = 'processed'
+    except Exception as e:
+        print(f"처리 중 오류 발생 {src_path}: {e}")
+        record['status'] = 'failed'
+    return record
+
+
+def load_manifest(dest_dir: str) -> Dict:
+    """이전 실행의 manifest(result.json)를 읽습니다. 없거나 예전 형식이면 빈 manifest를 반환합니다."""
+    manifest_path = os.path.join(dest_dir, MANIFEST_FILE)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    # 예전 버전은 result.json에 dest_dir 문자열만 저장했습니다.
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def save_manifest(dest_dir: str, manifest: Dict):
+    """중간에 중단되어도 manifest가 깨지지 않도록 임시 파일에 쓴 뒤 교체합니다."""
+    manifest_path = os.path.join(dest_dir, MANIFEST_FILE)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def remove_stale_outputs(dest_dir: str, tasks: List[Dict], previous_files: Dict) -> Tuple[List[str], List[str]]:
+    """
+    이번 실행 계획에 없는 클래스 폴더의 파일을 정리합니다. (이전 --count/--seed로 만든 파일이 학습 데이터에 섞이지 않도록)
+    이전 manifest에 기록된 파일은 이 스크립트가 만든 것이므로 삭제하고, 기록에 없는 파일은 지우지 않고 목록만 반환합니다.
+
+    Returns:
+        Tuple[List[str], List[str]]: (삭제한 파일, manifest에 없어서 남겨 둔 파일) dest_dir 기준 상대 경로
+    """
+    planned = {os.path.normpath(task['dest']) for task in tasks}
+    tracked = {os.path.normpath(dest) for dest in previous_files}
+    removed = []
+    untracked = []
+    for root, _, file_names in sorted(os.walk(dest_dir)):
+        # dest_dir 바로 아래에는 manifest만 있고, 이미지는 클래스 폴더에 저장합니다.
+        if os.path.samefile(root, dest_dir):
+            continue
+        for file_name in sorted(file_names):
+            path = os.path.join(root, file_name)
+            rel_path = os.path.normpath(os.path.relpath(path, dest_dir))
+            if rel_path in planned:
+                continue
+            if rel_path in tracked:
+                os.remove(path)
+                removed.append(rel_path)
+            else:
+                untracked.append(rel_path)
+    return removed, untracked
+
+
+def train_files_pre_process(target_dir, dest_dir, count, is_valid=False, workers=None, seed=SEED):
+    """
+    대상 디렉토리의 이미지 파일들을 전처리하여 목적 디렉토리로 복사합니다.
+
+    'crop_area.properties' 파일이 있는 경우, 해당 파일의 좌표 정보를 이용해 이미지를 자른 후 복사합니다.
+    파일이 없으면 원본 이미지를 그대로 복사합니다.
+    한글 경로 문제를 해결하기 위해 cv2.imencode를 사용하여 파일을 저장합니다.
+
+    파일 처리는 프로세스 풀에서 병렬로 실행하고, 결과는 dest_dir/result.json manifest에 기록합니다.
+    다시 실행하면 manifest의 해시와 같은 파일은 건너뛰므로 중단된 작업을 이어서 처리할 수 있습니다.
+    이전 실행에서 만들었지만 이번 계획에 없는 파일은 삭제하고(remove_stale_outputs), manifest의 stale 항목에 기록합니다.
+
+    Args:
+        target_dir (str): 원본 이미지 파일들이 있는 대상 디렉토리
+        dest_dir (str): 전처리된 파일들을 저장할 목적 디렉토리
+        count (int): 각 하위 폴더의 학습용 파일 수. 검증용은 plan_files()와 같이 count * VALID_RATIO개입니다.
+        workers (int): 작업 프로세스 수. None이면 CPU 코어 수
+        seed (int): 파일 샘플링 시드
+
+    Returns:
+        dict: manifest. files는 저장 경로(dest_dir 기준)를 키로, {'source', 'type', 'crop', 'sha256', 'status'}를 값으로 합니다.
+    """
+
+    os.makedirs(dest_dir, exist_ok=True)
+    tasks, empty_classes = plan_files(target_dir, count, is_valid, seed)
+    previous_files = load_manifest(dest_dir).get('files', {})
+    removed, untracked = remove_stale_outputs(dest_dir, tasks, previous_files)
+    if removed:
+        print(f"이번 계획에 없는 이전 출력 파일 {len(removed)}개를 삭제했습니다.")
+    if untracked:
+        print(f"경고: manifest에 없는 파일 {len(untracked)}개가 클래스 폴더에 남아 있습니다. "
+              f"학습 데이터에 포함되므로 확인 후 삭제해주세요: {untracked[:10]}")
+
+    manifest = {
+        'target_dir': target_dir,
+        'dest_dir': dest_dir,
+        'count': count,
+        'is_valid': is_valid,
+        'seed': seed,
+        'started_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'empty_classes': empty_classes,
+        'stale': {'removed': removed, 'untracked': untracked},
+        'files': {},
+    }
+    # 이전 기록은 그대로 두고 이번 실행 결과로 덮어씁니다. (중간에 저장해도 완료된 파일 정보가 사라지지 않음)
+    files = manifest['files']
+    files.update({task['dest']: previous_files[task['dest']] for task in tasks if task['dest'] in previous_files})
+
+    stats = {'processed': 0, 'skipped': 0, 'failed': 0}
+    print(f"{len(tasks)}개 파일 처리 시작 (workers={workers or os.cpu_count()}, 이전 기록 {len(files)}개)")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(process_file, task, dest_dir, previous_files.get(task['dest'])): task['dest']
+                   for task in tasks}
+        for done, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            files[futures[future]] = record
+            stats[record['status']] += 1
+            if done % PROGRESS_EVERY == 0:
+                print(f"{done}/{len(tasks)} 처리 (처리 {stats['processed']}, 건너뜀 {stats['skipped']}, 실패 {stats['failed']})")
+                save_manifest(dest_dir, manifest)
+
+    manifest['finished_at'] = datetime.datetime.now().isoformat(timespec='seconds')
+    manifest['stats'] = stats
+    save_manifest(dest_dir, manifest)
+    print(f"완료: 처리 {stats['processed']}, 건너뜀 {stats['skipped']}, 실패 {stats['failed']}")
+    return manifest
+
+
+def shard_digest(tasks: List[Dict], image_size: Tuple[int, int]) -> str:
+    """shard에 들어갈 원본 파일/크롭 좌표/크기로 만든 해시. 같으면 이미 만든 shard를 다시 만들지 않습니다."""
+    digest = hashlib.sha256(json.dumps(list(image_size)).encode('utf-8'))
+    for task in tasks:
+        entry = [task['source'], source_signature(task['source']), task['crop'] and list(task['crop'])]
+        digest.update(json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def pack_shard(shard_name: str, tasks: List[Dict], class_indices: Dict[str, int], out_dir: str,
+               image_size: Tuple[int, int], previous: Dict = None) -> Dict:
+    """
+    이미지 여러 개를 크롭/리사이즈해서 uint8 (N, H, W, 3) RGB 배열 하나와 라벨 배열로 저장합니다.
+    프로세스 풀의 작업 프로세스에서 실행됩니다.
+
+    리사이즈는 학습 입력(train_input.load_image, load_img)과 같은 nearest 방식을 사용합니다.
+    """
+    digest = shard_digest(tasks, image_size)
+    images_file = f"{shard_name}-images.npy"
+    labels_file = f"{shard_name}-labels.npy"
+    images_path = os.path.join(out_dir, images_file)
+    labels_path = os.path.join(out_dir, labels_file)
+    if (previous and previous.get('digest') == digest
+            and os.path.exists(images_path) and os.path.exists(labels_path)):
+        return dict(previous, status='skipped')
+
+    height, width = image_size
+    images = np.empty((len(tasks), height, width, 3), dtype=np.uint8)
+    labels = np.empty((len(tasks),), dtype=np.int32)
+    failed = []
+    count = 0
+    for task in tasks:
+        img = crop_image(task['source'], task['crop']) if task['crop'] else read_image(task['source'])
+        if img is None or img.size == 0:
+            failed.append(task['source'])
+            continue
+        img = cv2.resize(img, (width, height), interpolation=cv2.INTER_NEAREST)
+        images[count] = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        labels[count] = class_indices[task['type']]
+        count += 1
+
+    # 다 쓴 뒤에 이름을 바꾸므로 중간에 중단되어도 반쯤 쓴 shard가 남지 않습니다.
+    for path, array in ((images_path, images[:count]), (labels_path, labels[:count])):
+        with open(path + '.tmp', 'wb') as f:
+            np.save(f, array)
+        os.replace(path + '.tmp', path)
+
+    return {'images': images_file, 'labels': labels_file, 'count': count, 'digest': digest,
+            'failed': failed, 'status': 'processed'}
+
+
+def pack_shards(target_dir, out_dir, count, is_valid=False, image_size=PACK_IMAGE_SIZE, shard_size=SHARD_SIZE,
+                workers=None, seed=SEED):
+    """
+    train_files_pre_process와 같은 파일(같은 샘플링, 같은 크롭)을 미리 리사이즈해서 uint8 NPY shard로 저장합니다.
+
+    학습 시 원본 JPEG을 매 에포크 디코딩/리사이즈하지 않고 shard를 그대로 읽습니다.
+    out_dir/shards.json에 클래스 인덱스와 shard 목록을 기록하며, train_input.build_dataset(out_dir)로 바로 읽을 수 있습니다.
+    shard마다 원본 파일 해시(digest)를 기록하므로 다시 실행하면 바뀐 shard만 새로 만듭니다.
+
+    Args:
+        target_dir (str): 원본 이미지 파일들이 있는 대상 디렉토리
+        out_dir (str): shard를 저장할 디렉토리
+        count (int): 각 하위 폴더의 학습용 파일 수. 검증용은 plan_files()와 같이 count * VALID_RATIO개입니다.
+        image_size (Tuple[int, int]): 저장할 이미지 크기 (높이, 너비)
+        shard_size (int): shard 하나에 넣을 이미지 수
+
+    Returns:
+        dict: shards.json에 저장한 shard 인덱스
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    tasks, empty_classes = plan_files(target_dir, count, is_valid, seed)
+    # 클래스 인덱스는 flow_from_directory와 같이 폴더명 정렬 순서를 사용합니다.
+    # 파일이 선택되지 않은 클래스도 포함해서 학습용/검증용 shard의 인덱스가 같게 합니다.
+    class_indices = {name: i for i, name in enumerate(sorted({task['type'] for task in tasks} | set(empty_classes)))}
+    # shard마다 여러 클래스가 섞이도록 파일 순서를 고정된 시드로 섞습니다.
+    random.Random(seed).shuffle(tasks)
+    groups = [tasks[i:i + shard_size] for i in range(0, len(tasks), shard_size)]
+
+    index_path = os.path.join(out_dir, SHARD_INDEX_FILE)
+    previous_shards = {shard['name']: shard for shard in (read_shard_index(out_dir) or {}).get('shards', [])}
+
+    print(f"{len(tasks)}개 파일을 shard {len(groups)}개로 저장 시작 (workers={workers or os.cpu_count()})")
+    shards = [None] * len(groups)
+    stats = {'processed': 0, 'skipped': 0}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for i, group in enumerate(groups):
+            name = f"shard-{i:05d}"
+            future = executor.submit(pack_shard, name, group, class_indices, out_dir, tuple(image_size),
+                                     previous_shards.get(name))
+            futures[future] = (i, name)
+        for done, future in enumerate(as_completed(futures), 1):
+            i, name = futures[future]
+            shard = future.result()
+            stats[shard.pop('status')] += 1
+            shards[i] = dict(shard, name=name)
+            print(f"shard {done}/{len(groups)} 완료 ({name}, {shard['count']}개)")
+
+    index = {
+        'target_dir': target_dir,
+        'count': count,
+        'is_valid': is_valid,
+        'seed': seed,
+        'image_size': list(image_size),
+        'class_indices': class_indices,
+        'empty_classes': empty_classes,
+        'total': sum(shard['count'] for shard in shards),
+        'shards': shards,
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, index_path)
+
+    # 이전 실행에서 shard 수가 더 많았으면 목록에서 빠진 shard 파일을 삭제합니다.
+    current_names = {shard['name'] for shard in shards}
+    for name, shard in previous_shards.items():
+        if name not in current_names:
+            for file_name in (shard['images'], shard['labels']):
+                if os.path.exists(os.path.join(out_dir, file_name)):
+                    os.remove(os.path.join(out_dir, file_name))
+
+    failed = sum(len(shard['failed']) for shard in shards)
+    print(f"완료: 이미지 {index['total']}개, 새로 만든 shard {stats['processed']}, 건너뜀 {stats['skipped']}, 실패 {failed}")
+    return index
 
 
 if __name__ == '__main__':
-    target_dir = "E:/AIWork/Data/한국음식"
+    parser = argparse.ArgumentParser(description="원본 이미지를 크롭/복사해서 학습/검증 폴더를 만듭니다.")
+    parser.add_argument("--target", default="E:/AIWork/Data/한국음식", help="원본 데이터 폴더")
+    parser.add_argument("--dest", default=None, help="저장할 폴더 (기본값: 학습용/검증용 기본 경로)")
+    parser.add_argument("--count", type=int, default=100, help="폴더별 학습용 파일 수. 0이면 전체 (검증용은 학습용 다음 30%%)")
+    parser.add_argument("--valid", action="store_true", help="검증용 데이터로 처리합니다.")
+    parser.add_argument("--workers", type=int, default=None, help="작업 프로세스 수 (기본값: CPU 코어 수)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--pack", action="store_true", help="이미지 파일 대신 리사이즈된 NPY shard로 저장합니다.")
+    parser.add_argument("--image-size", type=int, default=PACK_IMAGE_SIZE[0], help="shard 이미지 크기 (정사각형)")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE, help="shard 하나에 넣을 이미지 수")
+    args = parser.parse_args()
+
     train_dest_dir = "E:/AIWork/Data/테스트/train"
     valid_dest_dir = "E:/AIWork/Data/테스트/valid"
-    count = 100
-
-    # for dest_dir in [train_dest_dir, valid_dest_dir]:
-    #     result = train_files_pre_process(target_dir, dest_dir, count)
-    #     # Save process_result to JSON file
-    #     result_file = os.path.join(dest_dir, 'result.json')
-    #     with open(result_file, 'w', encoding='utf-8') as f:
-    #         json.dump(dest_dir, f, ensure_ascii=False, indent=2)
-
-    # result = train_files_pre_process(target_dir, train_dest_dir, count)
-    # # Save process_result to JSON file
-    # result_file = os.path.join(train_dest_dir, 'result.json')
-    # with open(result_file, 'w', encoding='utf-8') as f:
-    #     json.dump(train_dest_dir, f, ensure_ascii=False, indent=2)
-
-    result_valid = train_files_pre_process(target_dir, valid_dest_dir, count, is_valid=True)
-    # Save process_result to JSON file
-    result_valid_file = os.path.join(valid_dest_dir, 'result.json')
-    with open(result_valid_file, 'w', encoding='utf-8') as f:
-        json.dump(valid_dest_dir, f, ensure_ascii=False, indent=2)
-
+    dest_dir = args.dest or (valid_dest_dir if args.valid else train_dest_dir)
+
+    if args.pack:
+        pack_shards(args.target, dest_dir, args.count, is_valid=args.valid, image_size=(args.image_size, args.image_size),
+                    shard_size=args.shard_size, workers=args.workers, seed=args.seed)
+    else:
+        train_files_pre_process(args.target, dest_dir, args.count, is_valid=args.valid, workers=args.workers,
+                                seed=args.seed)
 
     print("종료")
@@ -1,9 +1,12 @@
+import os
+import sys
 from tensorflow.keras.applications import MobileNetV2
 from tensorflow.keras.layers import Dense, GlobalAveragePooling2D
 from tensorflow.keras.models import Model
 from tensorflow.keras.optimizers import Adam
-from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from train_input import build_dataset
 
 data_dir = "/Users/james/Desktop/dataset/21_korean/kfood_correct_model_files"
 
@@ -11,32 +14,24 @@ img_size = (224, 224)
 batch_size = 32
 seed = 123
 
-train_datagen = ImageDataGenerator(
-    rescale=1. / 255.0,
-    shear_range=0.2,
-    zoom_range=0.2,
-    horizontal_flip=True,
-    validation_split=0.2
-)
-
-train_generator = train_datagen.flow_from_directory(
+train_dataset, class_indices = build_dataset(
     data_dir,
     target_size=img_size,
     batch_size=batch_size,
-    class_mode='categorical',
+    training=True,
     subset='training',
+    validation_split=0.2,
     seed=seed,
-    shuffle=True
 )
 
-valid_generator = train_datagen.flow_from_directory(
+valid_dataset, _ = build_dataset(
     data_dir,
     target_size=img_size,
     batch_size=batch_size,
-    class_mode='categorical',
     subset='validation',
+    validation_split=0.2,
     seed=seed,
-    shuffle=True
+    class_indices=class_indices,
 )
 
 base_model = MobileNetV2(weights='imagenet', include_top=False, input_shape=(224,224,3))
@@ -60,16 +55,14 @@ current_time = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
 indices_json_file = f"indices-{current_time}.json"
 
 with open(indices_json_file, "w", encoding='utf-8') as f:
-    json.dump(train_generator.class_indices, f, ensure_ascii=False, indent=4)
+    json.dump(class_indices, f, ensure_ascii=False, indent=4)
 
 check_point_callback = ModelCheckpoint(filepath=f'food-{current_time}.keras', monitor='val_loss', save_best_only=True)
 early_stopper_callback = EarlyStopping(patience=5, restore_best_weights=True, monitor='val_loss')
 
 history = model.fit(
-    train_generator,  
-    steps_per_epoch = train_generator.samples // train_generator.batch_size, 
-    validation_data = valid_generator,
-    validation_steps = valid_generator.samples // valid_generator.batch_size,
+    train_dataset,
+    validation_data = valid_dataset,
     epochs=10,
     callbacks=[early_stopper_callback, check_point_callback],
 )
@@ -5,47 +5,54 @@ from tensorflow.keras.applications import MobileNetV2
 from tensorflow.keras.layers import Dense, GlobalAveragePooling2D, Dropout
 from tensorflow.keras.models import Model
 from tensorflow.keras.optimizers import Adam
-from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping
+from train_input import build_dataset
+from feature_cache import get_or_extract_features, feature_dataset, build_head, attach_head
 
 # --- 설정 변수 ---
 # 경로, 이미지 크기, 배치 사이즈 등을 변수로 관리하여 유지보수를 용이하게 합니다.
 TRAIN_DIR = 'E:\\AIWork\\Data\\테스트\\train'  # 사용자의 기존 경로 유지
 VALID_DIR = 'E:\\AIWork\\Data\\테스트\\valid'  # 사용자의 기존 경로 유지
+# 두 경로에는 file_pre_processing.py --pack으로 만든 shard 폴더를 지정할 수도 있습니다. (JPEG 디코딩/리사이즈 생략)
 MODEL_SAVE_DIR = './models'
 TARGET_SIZE = (224, 224)
 BATCH_SIZE = 32
 NUM_CLASSES = 150
 INITIAL_EPOCHS = 100  # 초기 학습 에포크
 FINE_TUNE_EPOCHS = 20  # 미세 조정 에포크
+SEED = 123  # 셔플/증강 시드 (같은 값이면 학습 입력이 재현됩니다)
+# 디코딩된 이미지 캐시. True는 메모리, 문자열은 캐시 파일 경로 앞부분 (메모리가 부족하면 파일 경로를 지정)
+# 파일 경로를 지정하면 학습용은 '<CACHE>-train', 검증용은 '<CACHE>-valid' 파일을 사용합니다.
+CACHE = True
 
-# 훈련 데이터 생성기: 데이터 증강 적용
-train_datagen = ImageDataGenerator(
-    rescale=1. / 255.0,
-    shear_range=0.2,
-    zoom_range=0.2,
-    horizontal_flip=True
-)
 
-train_generator = train_datagen.flow_from_directory(
+def cache_for(name):
+    """학습용/검증용 데이터셋이 같은 캐시 파일을 쓰지 않도록 파일 경로 뒤에 이름을 붙입니다."""
+    return f"{CACHE}-{name}" if isinstance(CACHE, str) else CACHE
+
+# 1단계(백본 동결)에서 백본 특징을 한 번만 추출해 두고 분류기만 학습합니다. False이면 기존처럼 이미지로 학습합니다.
+USE_FEATURE_CACHE = True
+FEATURE_CACHE_DIR = './features'
+# 특징 캐시에 원본 외에 추가로 저장할 증강 이미지 복사본 수 (0이면 증강 없음)
+AUGMENT_COPIES = 2
+
+# 훈련 데이터: 데이터 증강(shear/zoom/flip) 적용, tf.data로 병렬 디코딩/캐시/prefetch
+train_dataset, class_indices = build_dataset(
     TRAIN_DIR,
     target_size=TARGET_SIZE,
     batch_size=BATCH_SIZE,
-    class_mode='categorical',
-    shuffle=True
-)
-
-# 검증 데이터 생성기: 데이터 증강 없이 스케일링만 적용
-valid_datagen = ImageDataGenerator(
-    rescale=1. / 255.0,
+    training=True,
+    seed=SEED,
+    cache=cache_for('train'),
 )
 
-validation_generator = valid_datagen.flow_from_directory(
+# 검증 데이터: 데이터 증강 없이 스케일링만 적용 (라벨은 클래스 이름 기준으로 훈련 데이터의 class_indices에 맞춤)
+validation_dataset, _ = build_dataset(
     VALID_DIR,
     target_size=TARGET_SIZE,
     batch_size=BATCH_SIZE,
-    class_mode='categorical',
-    shuffle=False
+    cache=cache_for('valid'),
+    class_indices=class_indices,
 )
 
 current_time = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
@@ -53,37 +60,61 @@ os.makedirs(MODEL_SAVE_DIR, exist_ok=True)
 indices_json_file = os.path.join(MODEL_SAVE_DIR, f"indices-fine-{current_time}.json")
 
 with open(indices_json_file, "w", encoding='utf-8') as f:
-    json.dump(train_generator.class_indices, f, ensure_ascii=False, indent=4)
+    json.dump(class_indices, f, ensure_ascii=False, indent=4)
 
 # 모델 불러오기 (사전 학습된 가중치 사용. 최사위 레이어 제거)
 base_model = MobileNetV2(weights='imagenet', include_top=False, input_shape=(TARGET_SIZE[0], TARGET_SIZE[1], 3))
 base_model.trainable = False
 
-x = base_model.output
-x = GlobalAveragePooling2D()(x)
-x = Dense(1024, activation='relu')(x)
-# --- Dense 층 추가 및 Dropout 적용 ---
-# 모델의 표현력을 높이고 과적합을 방지하기 위해 Dense 층과 Dropout을 추가합니다.
-x = Dropout(0.5)(x)  # 50%의 뉴런을 랜덤하게 비활성화하여 과적합 방지
-x = Dense(512, activation='relu')(x)
-predictions = Dense(NUM_CLASSES, activation='softmax')(x)
-
-model = Model(inputs=base_model.input, outputs=predictions)
-
 print("--- 1단계: 상위 분류기 학습 시작 ---")
-model.compile(optimizer=Adam(learning_rate=0.001), loss='categorical_crossentropy', metrics=['accuracy'])
-
 earlyStopping = EarlyStopping(monitor="val_loss", patience=10, verbose=1, restore_best_weights=True)
 model_path = os.path.join(MODEL_SAVE_DIR, f"cho_korean_food_classifier-fine-{current_time}.keras")
-modelCheckpoint = ModelCheckpoint(model_path, monitor="val_loss", verbose=1, save_best_only=True)
 
-history = model.fit(train_generator,
-                    epochs=INITIAL_EPOCHS,
-                    validation_data=validation_generator,
-                    steps_per_epoch=train_generator.samples // BATCH_SIZE,
-                    validation_steps=validation_generator.samples // BATCH_SIZE,
-                    callbacks=[earlyStopping, modelCheckpoint]
-                    )
+if USE_FEATURE_CACHE:
+    # 동결된 백본은 매 에포크 같은 결과를 내므로 한 번만 실행해서 특징을 저장하고, Dense 층만 특징으로 학습합니다.
+    train_features, train_labels, _ = get_or_extract_features(
+        TRAIN_DIR, os.path.join(FEATURE_CACHE_DIR, 'train'), base_model,
+        target_size=TARGET_SIZE, augment_copies=AUGMENT_COPIES, seed=SEED,
+    )
+    valid_features, valid_labels, _ = get_or_extract_features(
+        VALID_DIR, os.path.join(FEATURE_CACHE_DIR, 'valid'), base_model,
+        target_size=TARGET_SIZE, seed=SEED, class_indices=class_indices,
+    )
+
+    head = build_head(NUM_CLASSES)
+    head.compile(optimizer=Adam(learning_rate=0.001), loss='categorical_crossentropy', metrics=['accuracy'])
+    history = head.fit(feature_dataset(train_features, train_labels, NUM_CLASSES, BATCH_SIZE, shuffle=True, seed=SEED),
+                       epochs=INITIAL_EPOCHS,
+                       validation_data=feature_dataset(valid_features, valid_labels, NUM_CLASSES, BATCH_SIZE),
+                       callbacks=[earlyStopping]
+                       )
+
+    # 학습한 분류기 가중치를 백본에 연결해서 이미지 입력 모델을 만듭니다. (2단계와 추론은 이 모델을 사용)
+    model = attach_head(base_model, head)
+    model.save(model_path)
+    # 2단계에서는 1단계 최고 val_loss보다 좋아질 때만 모델을 덮어씁니다.
+    modelCheckpoint = ModelCheckpoint(model_path, monitor="val_loss", verbose=1, save_best_only=True,
+                                      initial_value_threshold=min(history.history['val_loss']))
+else:
+    x = base_model.output
+    x = GlobalAveragePooling2D()(x)
+    x = Dense(1024, activation='relu')(x)
+    # --- Dense 층 추가 및 Dropout 적용 ---
+    # 모델의 표현력을 높이고 과적합을 방지하기 위해 Dense 층과 Dropout을 추가합니다.
+    x = Dropout(0.5)(x)  # 50%의 뉴런을 랜덤하게 비활성화하여 과적합 방지
+    x = Dense(512, activation='relu')(x)
+    predictions = Dense(NUM_CLASSES, activation='softmax')(x)
+
+    model = Model(inputs=base_model.input, outputs=predictions)
+    model.compile(optimizer=Adam(learning_rate=0.001), loss='categorical_crossentropy', metrics=['accuracy'])
+
+    modelCheckpoint = ModelCheckpoint(model_path, monitor="val_loss", verbose=1, save_best_only=True)
+
+    history = model.fit(train_dataset,
+                        epochs=INITIAL_EPOCHS,
+                        validation_data=validation_dataset,
+                        callbacks=[earlyStopping, modelCheckpoint]
+                        )
 
 print("\n--- 2단계: 미세 조정(Fine-tuning) 시작 ---")
 # 베이스 모델의 일부 상위 레이어의 동결을 해제합니다.
@@ -100,12 +131,10 @@ model.compile(optimizer=Adam(learning_rate=1e-5), loss='categorical_crossentropy
 
 total_epochs = INITIAL_EPOCHS + FINE_TUNE_EPOCHS
 
-model.fit(train_generator,
+model.fit(train_dataset,
           epochs=total_epochs,
           initial_epoch=history.epoch[-1],  # 이전 학습이 끝난 지점부터 시작
-          validation_data=validation_generator,
-          steps_per_epoch=train_generator.samples // BATCH_SIZE,
-          validation_steps=validation_generator.samples // BATCH_SIZE,
+          validation_data=validation_dataset,
           callbacks=[earlyStopping, modelCheckpoint]  # 동일한 콜백 사용
           )
 
@@ -2,10 +2,10 @@ import datetime, json
 from keras import Model
 from keras.src.applications.mobilenet_v2 import MobileNetV2
 from keras.src.layers import Dense, Dropout
-from keras.src.legacy.preprocessing.image import ImageDataGenerator
 from tensorflow.keras.layers import GlobalAveragePooling2D
 from tensorflow.keras.optimizers import Adam
 from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping
+from train_input import build_dataset
 
 train_dir = 'E:\\AIWork\\Data\\테스트\\train'
 valid_dir = 'E:\\AIWork\\Data\\테스트\\valid'
@@ -13,44 +13,32 @@ valid_dir = 'E:\\AIWork\\Data\\테스트\\valid'
 # raccoon_train_dir = './train/raccoon'
 # squirrel_train_dir = './train/squirrel'
 
-train_datagen = ImageDataGenerator(
-    rescale=1. / 255.0,
-    shear_range=0.2,
-    zoom_range=0.2,
-    horizontal_flip=True,
-    validation_split=0.2
-)
-
-train_generator = train_datagen.flow_from_directory(
+train_dataset, train_class_indices = build_dataset(
     train_dir,
     target_size=(224, 224),
     batch_size=8,
-    class_mode='categorical',
+    training=True,
     subset='training',
-    shuffle=True
-)
-
-valid_datagen = ImageDataGenerator(
-    rescale=1. / 255.0,
+    validation_split=0.2,
 )
 
-validation_generator = valid_datagen.flow_from_directory(
+# 검증 데이터의 라벨은 클래스 이름 기준으로 훈련 데이터의 class_indices에 맞춥니다.
+validation_dataset, valid_class_indices = build_dataset(
     valid_dir,
     target_size=(224, 224),
     batch_size=8,
-    class_mode='categorical',
-    shuffle=False
+    class_indices=train_class_indices,
 )
 
 current_time = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
 
 indices_train_json_file = f"indices-train-{current_time}.json"
 with open(indices_train_json_file, "w", encoding='utf-8') as f:
-    json.dump(train_generator.class_indices, f, ensure_ascii=False, indent=4)
+    json.dump(train_class_indices, f, ensure_ascii=False, indent=4)
 
 indices_valid_json_file = f"indices-valid-{current_time}.json"
 with open(indices_valid_json_file, "w", encoding='utf-8') as f:
-    json.dump(validation_generator.class_indices, f, ensure_ascii=False, indent=4)
+    json.dump(valid_class_indices, f, ensure_ascii=False, indent=4)
 
 # 모델 불러오기 (사전 학습된 가중치 사용. 최사위 레이어 제거)
 base_model = MobileNetV2(weights='imagenet', include_top=False, input_shape=(224, 224, 3))
@@ -76,11 +64,9 @@ model.compile(optimizer=Adam(learning_rate=0.001), loss='categorical_crossentrop
 earlyStopping = EarlyStopping(monitor="val_loss", patience=10, verbose=1, restore_best_weights=True)
 modelCheckpoint = ModelCheckpoint(f"./models/cho_korean_food_classifier-{current_time}.keras", monitor="val_loss", verbose=1, save_best_only=True)
 
-model.fit(train_generator,
+model.fit(train_dataset,
           epochs=100,
-          validation_data=validation_generator,
-          steps_per_epoch=train_generator.samples // 8,  # // train_generator.batch_size,
-          validation_steps=validation_generator.samples // 8,  # // validation_generator.batch_size
+          validation_data=validation_dataset,
           callbacks=[earlyStopping, modelCheckpoint]
           )
 
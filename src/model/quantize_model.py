@@ -0,0 +1,122 @@
+"""
+학습된 분류 모델을 사후 양자화(post-training quantization)해서 TFLite 파일로 만듭니다.
+
+1. dynamic: 가중치만 int8로 저장하는 dynamic-range 양자화
+2. int8: 검증 폴더에서 뽑은 대표 데이터셋으로 활성값까지 보정하는 전체 정수 양자화
+
+양자화 모델과 원본(float) 모델의 top-1/top-5 정확도를 검증 데이터로 비교하고,
+정확도 하락이 --max-drop(%p)보다 크면 양자화 파일을 저장하지 않고 종료 코드 1로 끝납니다.
+
+사용 예:
+    python quantize_model.py --mode int8 --max-drop 1.0
+"""
+import os
+import sys
+import json
+import argparse
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from service.backends import TFLiteBackend
+from export_model import export_tflite, load_sample_images
+
+# --- 설정 ---
+MODEL_PATH = './models/kfood_model.keras'
+INDICES_JSON_PATH = './models/indices-fine-20250827-161229.json'
+VALID_DIR = 'E:\\AIWork\\Data\\테스트\\valid'  # 검증 데이터 경로
+BATCH_SIZE = 64
+
+
+def top_k_accuracy(predict_fn, images, label_indices, batch_size=BATCH_SIZE):
+    """
+    예측 함수로 이미지를 배치 단위로 분류해서 top-1, top-5 정확도(%)를 계산합니다.
+    """
+    top1 = 0
+    top5 = 0
+    for i in range(0, len(images), batch_size):
+        probs = predict_fn(images[i:i + batch_size])
+        labels = label_indices[i:i + batch_size]
+        top5_indices = np.argsort(-probs, axis=1, kind="stable")[:, :5]
+        top1 += int(np.sum(top5_indices[:, 0] == labels))
+        top5 += int(np.sum(np.any(top5_indices == labels[:, None], axis=1)))
+    return top1 / len(images) * 100, top5 / len(images) * 100
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="분류 모델을 int8로 양자화하고 정확도를 검증합니다.")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--indices', default=INDICES_JSON_PATH)
+    parser.add_argument('--valid-dir', default=VALID_DIR)
+    parser.add_argument('--mode', choices=['dynamic', 'int8'], default='int8')
+    parser.add_argument('--representative-count', type=int, default=200, help="대표 데이터셋 이미지 수")
+    parser.add_argument('--eval-count', type=int, default=2000, help="정확도 비교에 사용할 검증 이미지 수")
+    parser.add_argument('--max-drop', type=float, default=1.0, help="허용하는 top-1 정확도 하락폭(%%p)")
+    parser.add_argument('--out', default=None, help="저장할 .tflite 경로 (기본값: 모델명-<mode>.tflite). 서비스에 바로 쓰려면 모델명.tflite로 지정합니다.")
+    args = parser.parse_args()
+
+    # 1. 훈련 시 사용된 클래스 인덱스 불러오기 (valify_model.py와 같은 클래스 순서)
+    try:
+        with open(args.indices, 'r', encoding='utf-8') as f:
+            class_indices = json.load(f)
+    except FileNotFoundError:
+        print(f"오류: 클래스 인덱스 파일({args.indices})을 찾을 수 없습니다.")
+        sys.exit(1)
+
+    class_labels = sorted(class_indices.keys(), key=lambda x: class_indices[x])
+
+    # 2. 원본 모델 불러오기
+    model = load_model(args.model)
+    print(f"모델 로딩 성공: {args.model}")
+
+    # 3. 검증 이미지 준비. 같은 시드로 섞은 목록에서 평가용은 앞부분, 대표 데이터셋은 그 뒤를 사용해서 겹치지 않게 합니다.
+    images, labels = load_sample_images(args.valid_dir, args.eval_count, seed=42)
+    known = [i for i, label in enumerate(labels) if label in class_indices]
+    images = images[known]
+    label_indices = np.array([class_indices[labels[i]] for i in known])
+    print(f"평가 이미지 {len(images)}장, 클래스 {len(class_labels)}개")
+    if len(images) == 0:
+        print(f"오류: 검증 폴더({args.valid_dir})에 클래스 인덱스에 있는 클래스의 이미지가 없어서 정확도를 비교할 수 없습니다.")
+        sys.exit(1)
+
+    representative_dataset = None
+    if args.mode == 'int8':
+        representative_images, _ = load_sample_images(args.valid_dir, args.representative_count, seed=42,
+                                                       offset=args.eval_count)
+        if len(representative_images) == 0:
+            print(f"오류: 평가용 {args.eval_count}장 외에 대표 데이터셋으로 쓸 이미지가 없습니다. --eval-count를 줄여주세요.")
+            sys.exit(1)
+
+        def representative_dataset():
+            for img in representative_images:
+                yield [img[np.newaxis, ...]]
+
+    # 4. 양자화. 정확도 검증을 통과하기 전까지는 임시 파일에만 저장합니다.
+    base_name = os.path.splitext(args.model)[0]
+    out_path = args.out or f"{base_name}-{args.mode}.tflite"
+    tmp_path = out_path + ".tmp"
+    size = export_tflite(model,
+                         tmp_path,
+                         optimizations=[tf.lite.Optimize.DEFAULT],
+                         representative_dataset=representative_dataset,
+                         int8=args.mode == 'int8')
+
+    # 5. 정확도 비교
+    float_top1, float_top5 = top_k_accuracy(lambda x: model(x, training=False).numpy(), images, label_indices)
+    quantized = TFLiteBackend(tmp_path)
+    quant_top1, quant_top5 = top_k_accuracy(quantized.predict_proba, images, label_indices)
+    drop = float_top1 - quant_top1
+
+    print(f"\n평가 결과:")
+    print(f"  - float : top-1 {float_top1:.2f}%, top-5 {float_top5:.2f}% ({os.path.getsize(args.model) / 1024 / 1024:.1f}MB)")
+    print(f"  - {args.mode:<6}: top-1 {quant_top1:.2f}%, top-5 {quant_top5:.2f}% ({size / 1024 / 1024:.1f}MB)")
+    print(f"  - top-1 하락폭: {drop:.2f}%p (허용 {args.max_drop:.2f}%p)")
+
+    if drop > args.max_drop:
+        os.remove(tmp_path)
+        print("오류: 정확도 하락이 허용 범위를 넘어서 양자화 모델을 저장하지 않습니다.")
+        sys.exit(1)
+
+    os.replace(tmp_path, out_path)
+    print(f"양자화 모델 저장 완료: {out_path}")
@@ -0,0 +1,19 @@
+"""
+file_pre_processing.py --pack으로 만든 shard 폴더의 인덱스 파일(shards.json) 이름과 읽기 함수입니다.
+shard를 만드는 쪽(file_pre_processing, cv2 사용)과 읽는 쪽(train_input, TensorFlow 사용)이 함께 사용하므로
+이 모듈은 표준 라이브러리만 사용합니다.
+"""
+import os
+import json
+
+# shard 목록/라벨 인덱스 파일
+SHARD_INDEX_FILE = 'shards.json'
+
+
+def read_shard_index(directory):
+    """directory가 shard 폴더이면 shards.json 내용을, 이미지 폴더이면 None을 반환합니다."""
+    index_path = os.path.join(directory, SHARD_INDEX_FILE)
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,331 @@
+"""
+학습 스크립트에서 공통으로 사용하는 tf.data 입력 파이프라인입니다.
+ImageDataGenerator.flow_from_directory와 같은 폴더 구조(클래스별 하위 폴더), 같은 클래스 인덱스, 같은 증강(shear/zoom/flip)을 사용합니다.
+
+- 이미지 디코딩/리사이즈는 여러 스레드에서 병렬로 처리합니다. (num_parallel_calls=AUTOTUNE)
+- 증강은 배치 단위로 한 번의 projective transform 연산으로 처리합니다.
+- 디코딩된 이미지는 uint8로 cache()해서 두 번째 에포크부터는 파일을 다시 읽지 않습니다.
+- 셔플과 증강은 seed로 재현 가능하며, 에포크마다 다른 순서/증강을 사용합니다.
+- file_pre_processing.py --pack으로 만든 shard 폴더(shards.json)를 지정하면 JPEG 디코딩/리사이즈 없이 shard를 읽습니다.
+
+사용 예:
+    train_ds, class_indices = build_dataset(TRAIN_DIR, training=True, batch_size=32)
+    valid_ds, _ = build_dataset(VALID_DIR, batch_size=32)
+    model.fit(train_ds, validation_data=valid_ds, epochs=10)
+"""
+import os
+import json
+import math
+import hashlib
+import numpy as np
+import tensorflow as tf
+from shard_index import read_shard_index
+
+TARGET_SIZE = (224, 224)
+BATCH_SIZE = 32
+SEED = 123
+# cache() 이후 셔플할 때 메모리에 보관할 이미지 수
+SHUFFLE_BUFFER = 2048
+
+# flow_from_directory가 읽는 이미지 확장자
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.ppm', '.tif', '.tiff')
+
+# shard에서 한 번에 읽을 이미지 수
+SHARD_READ_ROWS = 256
+
+# 기존 학습 스크립트의 ImageDataGenerator 증강 설정과 같은 값
+SHEAR_RANGE = 0.2  # 도(degree) 단위, ImageDataGenerator와 같음
+ZOOM_RANGE = 0.2
+HORIZONTAL_FLIP = True
+
+
+def list_image_files(directory, subset=None, validation_split=0.0, class_indices=None):
+    """
+    클래스별 하위 폴더에서 이미지 파일 목록을 만듭니다.
+    클래스 인덱스(폴더명 정렬 순서)와 validation_split 분할 방식은 flow_from_directory와 같습니다.
+    (클래스마다 정렬된 파일 중 앞쪽 validation_split 비율이 검증용, 나머지가 학습용)
+
+    Args:
+        directory (str): 클래스별 하위 폴더가 있는 데이터 폴더
+        subset (str): None, 'training', 'validation' 중 하나
+        validation_split (float): 검증용으로 나눌 비율
+        class_indices (dict): 지정하면 폴더명 대신 이 인덱스(학습 시 class_indices)로 라벨을 붙이고, 여기에 없는 폴더는 건너뜁니다.
+
+    Returns:
+        tuple: (파일 경로 리스트, 라벨 인덱스 리스트, class_indices 딕셔너리)
+    """
+    classes = sorted(name for name in os.listdir(directory) if os.path.isdir(os.path.join(directory, name)))
+    if class_indices is None:
+        class_indices = {name: i for i, name in enumerate(classes)}
+    else:
+        skipped = [name for name in classes if name not in class_indices]
+        if skipped:
+            print(f"class_indices에 없는 클래스 {len(skipped)}개는 건너뜁니다: {skipped[:10]} ({directory})")
+        classes = [name for name in classes if name in class_indices]
+
+    paths = []
+    labels = []
+    for class_name in classes:
+        class_dir = os.path.join(directory, class_name)
+        files = []
+        for root, _, file_names in sorted(os.walk(class_dir)):
+            for file_name in sorted(file_names):
+                if file_name.lower().endswith(IMAGE_EXTENSIONS):
+                    files.append(os.path.join(root, file_name))
+
+        split_at = int(validation_split * len(files))
+        if subset == 'validation':
+            files = files[:split_at]
+        elif subset == 'training':
+            files = files[split_at:]
+
+        paths.extend(files)
+        labels.extend([class_indices[class_name]] * len(files))
+    return paths, labels, class_indices
+
+
+def describe_dataset(directory, subset=None, validation_split=0.0, class_indices=None):
+    """
+    이미지 폴더 또는 shard 폴더의 (이미지 수, class_indices)를 반환합니다.
+    class_indices를 지정하면 build_dataset()과 같이 그 인덱스에 없는 클래스를 뺀 이미지 수를 반환합니다.
+    """
+    index = read_shard_index(directory)
+    if index is not None:
+        if class_indices is None:
+            return index['total'], index['class_indices']
+        return shard_label_map(directory, index, class_indices)[1], class_indices
+    paths, _, class_indices = list_image_files(directory, subset, validation_split, class_indices)
+    return len(paths), class_indices
+
+
+def dataset_digest(directory, subset=None, validation_split=0.0, class_indices=None):
+    """
+    데이터 내용을 나타내는 해시를 반환합니다. 파일이 추가/삭제/수정되거나 shard를 다시 만들면 값이 바뀝니다.
+    - 이미지 폴더: class_indices와 파일별 (상대 경로, 라벨, 크기, 수정 시각)
+    - shard 폴더: class_indices와 shard별 (이름, 이미지 수, 원본 digest)
+    class_indices를 지정하면 라벨이 그 인덱스 기준이 되므로 해시에도 포함합니다.
+    """
+    digest = hashlib.sha256()
+    index = read_shard_index(directory)
+    if index is not None:
+        digest.update(json.dumps(index['class_indices'], ensure_ascii=False, sort_keys=True).encode('utf-8'))
+        if class_indices is not None:
+            digest.update(json.dumps(class_indices, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+        for shard in index['shards']:
+            digest.update(json.dumps([shard['name'], shard['count'], shard['digest']]).encode('utf-8'))
+        return digest.hexdigest()
+
+    paths, labels, class_indices = list_image_files(directory, subset, validation_split, class_indices)
+    digest.update(json.dumps(class_indices, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+    for path, label in zip(paths, labels):
+        stat = os.stat(path)
+        entry = [os.path.relpath(path, directory), label, stat.st_size, stat.st_mtime_ns]
+        digest.update(json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load_shards(directory, index, target_size=TARGET_SIZE, training=False, seed=SEED, cache=True):
+    """
+    shard 폴더에서 (uint8 이미지, 라벨) 데이터셋을 만듭니다. 이미지는 이미 target_size로 리사이즈되어 있습니다.
+    shard 여러 개를 동시에 읽고, 학습 시에는 에포크마다(캐시하는 경우 처음 한 번) shard 순서를 섞습니다.
+    """
+    height, width = target_size
+    if tuple(index['image_size']) != (height, width):
+        raise ValueError(f"shard 이미지 크기 {index['image_size']}가 target_size {target_size}와 다릅니다. ({directory})")
+
+    shards = [shard for shard in index['shards'] if shard['count'] > 0]
+    images_paths = [os.path.join(directory, shard['images']) for shard in shards]
+    labels_paths = [os.path.join(directory, shard['labels']) for shard in shards]
+
+    def read_shard(images_path, labels_path):
+        # mmap으로 열어서 필요한 부분만 읽습니다.
+        images = np.load(images_path.decode('utf-8'), mmap_mode='r')
+        labels = np.load(labels_path.decode('utf-8'))
+        for start in range(0, len(labels), SHARD_READ_ROWS):
+            yield np.asarray(images[start:start + SHARD_READ_ROWS]), labels[start:start + SHARD_READ_ROWS]
+
+    signature = (tf.TensorSpec(shape=(None, height, width, 3), dtype=tf.uint8),
+                 tf.TensorSpec(shape=(None,), dtype=tf.int32))
+    dataset = tf.data.Dataset.from_tensor_slices((images_paths, labels_paths))
+    if training:
+        dataset = dataset.shuffle(max(len(shards), 1), seed=seed, reshuffle_each_iteration=not cache)
+    dataset = dataset.interleave(
+        lambda images_path, labels_path: tf.data.Dataset.from_generator(
+            read_shard, args=(images_path, labels_path), output_signature=signature),
+        cycle_length=4,
+        num_parallel_calls=tf.data.AUTOTUNE,
+    )
+    return dataset.unbatch()
+
+
+def shard_label_map(directory, index, class_indices):
+    """
+    shard 라벨(shards.json의 class_indices 기준)을 클래스 이름이 같은 class_indices의 라벨로 바꾸는 배열을 만듭니다.
+
+    Returns:
+        tuple: (shard 라벨 -> 새 라벨 배열 (class_indices에 없으면 -1), 남는 이미지 수, 건너뛰는 클래스 리스트)
+    """
+    shard_indices = index['class_indices']
+    remap = np.full(len(shard_indices), -1, dtype=np.int32)
+    for name, i in shard_indices.items():
+        remap[i] = class_indices.get(name, -1)
+
+    skipped = sorted(name for name in shard_indices if name not in class_indices)
+    count = index['total']
+    if skipped:
+        for shard in index['shards']:
+            if shard['count'] > 0:
+                labels = np.load(os.path.join(directory, shard['labels']))
+                count -= int(np.count_nonzero(remap[labels] < 0))
+    return remap, count, skipped
+
+
+def remap_shard_labels(dataset, directory, index, class_indices):
+    """
+    shard 라벨을 클래스 이름 기준으로 class_indices의 라벨로 바꿉니다. (shard_label_map 참고)
+    class_indices에 없는 클래스의 이미지는 제외하고, (데이터셋, 남은 이미지 수)를 반환합니다.
+    """
+    remap, count, skipped = shard_label_map(directory, index, class_indices)
+    if skipped:
+        print(f"class_indices에 없는 클래스 {len(skipped)}개는 건너뜁니다: {skipped[:10]} ({directory})")
+
+    remap = tf.constant(remap)
+    dataset = dataset.map(lambda image, label: (image, tf.gather(remap, label)), num_parallel_calls=tf.data.AUTOTUNE)
+    if skipped:
+        dataset = dataset.filter(lambda image, label: label >= 0)
+    return dataset, count
+
+
+def load_image(path, target_size=TARGET_SIZE):
+    """이미지 파일을 읽어 RGB uint8 (H, W, 3) 텐서로 반환합니다. (load_img와 같은 nearest 리사이즈)"""
+    img = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+    img = tf.image.resize(img, target_size, method='nearest')
+    return tf.cast(img, tf.uint8)
+
+
+def random_affine_transforms(batch_size, height, width, seed, shear_range=SHEAR_RANGE, zoom_range=ZOOM_RANGE,
+                             horizontal_flip=HORIZONTAL_FLIP):
+    """
+    ImageDataGenerator와 같은 분포의 shear/zoom/flip 변환을 이미지마다 만들어 (batch, 8) 변환 행렬로 반환합니다.
+    - shear: [-shear_range, shear_range]도, zoom: 행/열 방향 각각 [1 - zoom_range, 1 + zoom_range], flip: 50%
+    - 행렬은 출력 좌표(x=열, y=행)를 입력 좌표로 바꾸며, 이미지 중심을 기준으로 적용합니다.
+
+    Args:
+        seed (tf.Tensor): stateless random 연산에 사용할 (2,) int 시드
+    """
+    seeds = tf.random.experimental.stateless_split(seed, num=4)
+    shear = tf.random.stateless_uniform([batch_size], seeds[0], -shear_range, shear_range) * (math.pi / 180.0)
+    zoom = tf.random.stateless_uniform([batch_size, 2], seeds[1], 1.0 - zoom_range, 1.0 + zoom_range)
+    zoom_row, zoom_col = zoom[:, 0], zoom[:, 1]
+
+    # ImageDataGenerator: (행, 열) 좌표 기준 행렬 = shear @ zoom
+    #   [[zoom_row, -sin(shear) * zoom_col],
+    #    [0,         cos(shear) * zoom_col]]
+    m00 = zoom_row
+    m01 = -tf.sin(shear) * zoom_col
+    m10 = tf.zeros_like(shear)
+    m11 = tf.cos(shear) * zoom_col
+
+    # 이미지 중심 기준으로 적용: 입력 = M @ (출력 - 중심) + 중심
+    center_row = height / 2.0 - 0.5
+    center_col = width / 2.0 - 0.5
+    offset_row = center_row - m00 * center_row - m01 * center_col
+    offset_col = center_col - m10 * center_row - m11 * center_col
+
+    # ImageProjectiveTransform 형식 (x=열, y=행): x_in = a0*x + a1*y + a2, y_in = a3*x + a4*y + a5
+    a0, a1, a2 = m11, m10, offset_col
+    a3, a4, a5 = m01, m00, offset_row
+
+    if horizontal_flip:
+        # 변환 후 좌우 반전: 출력 열 x 대신 (width - 1 - x)를 사용합니다.
+        flip = tf.random.stateless_uniform([batch_size], seeds[2]) < 0.5
+        a2 = tf.where(flip, a0 * (width - 1) + a2, a2)
+        a5 = tf.where(flip, a3 * (width - 1) + a5, a5)
+        a0 = tf.where(flip, -a0, a0)
+        a3 = tf.where(flip, -a3, a3)
+
+    zeros = tf.zeros_like(shear)
+    return tf.stack([a0, a1, a2, a3, a4, a5, zeros, zeros], axis=1)
+
+
+def augment_batch(images, seed, shear_range=SHEAR_RANGE, zoom_range=ZOOM_RANGE, horizontal_flip=HORIZONTAL_FLIP):
+    """float32 이미지 배치에 shear/zoom/flip 증강을 한 번의 연산으로 적용합니다. (빈 영역은 가장자리 값으로 채움)"""
+    shape = tf.shape(images)
+    transforms = random_affine_transforms(shape[0], tf.cast(shape[1], tf.float32), tf.cast(shape[2], tf.float32),
+                                          seed, shear_range, zoom_range, horizontal_flip)
+    return tf.raw_ops.ImageProjectiveTransformV3(
+        images=images,
+        transforms=transforms,
+        output_shape=shape[1:3],
+        fill_value=0.0,
+        interpolation='BILINEAR',
+        fill_mode='NEAREST',
+    )
+
+
+def build_dataset(directory, target_size=TARGET_SIZE, batch_size=BATCH_SIZE, training=False, subset=None,
+                  validation_split=0.0, seed=SEED, cache=True, shuffle_buffer=SHUFFLE_BUFFER, class_indices=None):
+    """
+    flow_from_directory(class_mode='categorical')를 대신하는 tf.data 데이터셋을 만듭니다.
+
+    Args:
+        directory (str): 클래스별 하위 폴더가 있는 데이터 폴더 또는 file_pre_processing.py --pack으로 만든 shard 폴더
+        training (bool): True이면 셔플하고 shear/zoom/flip 증강을 적용합니다.
+        subset (str): validation_split을 사용할 때 'training' 또는 'validation'
+        cache (bool | str): True이면 메모리에, 문자열이면 그 경로의 파일에 디코딩된 이미지를 캐시합니다. False이면 캐시하지 않습니다.
+        class_indices (dict): 지정하면 클래스 이름 기준으로 라벨을 이 인덱스에 맞춥니다. (학습한 모델을 다른 데이터로 평가할 때)
+                              여기에 없는 클래스의 이미지는 제외합니다.
+
+    Returns:
+        tuple: ((이미지, one-hot 라벨) 배치 데이터셋, class_indices 딕셔너리)
+               이미지는 0~1 범위의 float32입니다. (rescale=1/255와 같음)
+    """
+    index = read_shard_index(directory)
+    if index is not None:
+        if subset is not None:
+            raise ValueError(f"shard 폴더는 validation_split을 지원하지 않습니다. 학습/검증 shard를 따로 만들어 주세요. ({directory})")
+        dataset = load_shards(directory, index, target_size, training, seed, cache)
+        if class_indices is None or class_indices == index['class_indices']:
+            class_indices = index['class_indices']
+            count = index['total']
+        else:
+            dataset, count = remap_shard_labels(dataset, directory, index, class_indices)
+    else:
+        paths, labels, class_indices = list_image_files(directory, subset, validation_split, class_indices)
+        count = len(paths)
+        dataset = tf.data.Dataset.from_tensor_slices((paths, labels))
+        if training:
+            # 파일 목록은 클래스 순서로 정렬되어 있으므로 디코딩 전에 전체를 셔플합니다. (파일 경로만 보관하므로 가벼움)
+            # 캐시하는 경우에는 캐시된 순서를 고정하고, 에포크마다의 순서는 캐시 뒤의 셔플 버퍼로 바꿉니다.
+            dataset = dataset.shuffle(max(count, 1), seed=seed, reshuffle_each_iteration=not cache)
+
+        dataset = dataset.map(lambda path, label: (load_image(path, target_size), label),
+                              num_parallel_calls=tf.data.AUTOTUNE)
+
+    num_classes = len(class_indices)
+    print(f"Found {count} images belonging to {num_classes} classes. ({directory})")
+
+    if cache:
+        dataset = dataset.cache(cache if isinstance(cache, str) else '')
+    if training and (cache or index is not None):
+        # shard는 파일 단위 셔플이 없으므로 캐시하지 않는 경우에도 셔플 버퍼로 에포크마다 순서를 바꿉니다.
+        dataset = dataset.shuffle(min(shuffle_buffer, max(count, 1)), seed=seed, reshuffle_each_iteration=True)
+
+    dataset = dataset.batch(batch_size)
+
+    def to_model_input(images, labels):
+        return tf.cast(images, tf.float32) / 255.0, tf.one_hot(labels, num_classes)
+
+    def augment(batch, batch_seed):
+        images, labels = to_model_input(*batch)
+        return augment_batch(images, batch_seed), labels
+
+    if training:
+        # 배치마다 다른 시드를 사용하고, 에포크마다 새 시드 순서를 만듭니다. (seed가 같으면 전체 학습이 재현됨)
+        batch_seeds = tf.data.Dataset.random(seed=seed, rerandomize_each_iteration=True).batch(2)
+        dataset = tf.data.Dataset.zip((dataset, batch_seeds))
+        dataset = dataset.map(augment, num_parallel_calls=tf.data.AUTOTUNE)
+    else:
+        dataset = dataset.map(to_model_input, num_parallel_calls=tf.data.AUTOTUNE)
+
+    return dataset.prefetch(tf.data.AUTOTUNE), class_indices
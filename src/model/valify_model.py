@@ -1,7 +1,7 @@
 import os
 import json
-from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from tensorflow.keras.models import load_model
+from train_input import build_dataset
 
 BATCH_SIZE = 64
 
@@ -12,7 +12,7 @@ BATCH_SIZE = 64
 # MODEL_PATH = './models/cho_korean_food_classifier-fine-20250827-150232.keras'
 MODEL_PATH = './models/cho_korean_food_classifier-fine-20250827-161229.keras'
 INDICES_JSON_PATH = './models/indices-fine-20250827-125904.json'  # 예시: 실제 훈련된 인덱스 파일 경로로 변경
-CHECK_DIR = 'E:\\AIWork\\Data\\테스트\\valid'  # 검증 데이터 경로
+CHECK_DIR = 'E:\\AIWork\\Data\\테스트\\valid'  # 검증 데이터 경로 (이미지 폴더 또는 file_pre_processing.py --pack으로 만든 shard 폴더)
 
 # 1. 훈련 시 사용된 클래스 인덱스 불러오기
 try:
@@ -35,20 +35,12 @@ except (IOError, FileNotFoundError):
     print("훈련된 모델 파일의 정확한 경로를 설정해주세요.")
     exit()
 
-# 3. 검증 데이터 생성기 설정 (훈련과 동일한 클래스 순서 지정)
-validation_datagen = ImageDataGenerator(rescale=1. / 255.0)
-validation_generator = validation_datagen.flow_from_directory(
-    CHECK_DIR,
-    target_size=(224, 224),
-    batch_size=BATCH_SIZE,
-    class_mode='categorical',
-    shuffle=False,
-    classes=class_labels  # <<< 핵심: 훈련 시의 클래스 순서를 동일하게 적용합니다.
-)
+# 3. 검증 데이터 설정 (라벨은 클래스 이름 기준으로 훈련 시의 클래스 인덱스에 맞춤)
+validation_dataset, _ = build_dataset(CHECK_DIR, batch_size=BATCH_SIZE, cache=False, class_indices=class_indices)
 
 # 4. 모델 평가
 print("\n모델 평가를 시작합니다...")
-loss, accuracy = model.evaluate(validation_generator)
+loss, accuracy = model.evaluate(validation_dataset)
 print(f"\n평가 결과:")
 print(f"  - Loss: {loss:.4f}")
 print(f"  - Accuracy: {accuracy:.4f}")
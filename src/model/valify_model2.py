@@ -1,8 +1,30 @@
+"""
+검증 데이터 전체를 배치로 예측해서 모델 성능을 평가합니다.
+
+- 이미지 디코딩/리사이즈는 tf.data로 병렬 처리하고, 예측은 BATCH_SIZE 단위로 실행합니다.
+- 한 번의 예측으로 전체/클래스별 정답률, top-k 정답률, 혼동 행렬, 신뢰도 보정(calibration)을 함께 계산합니다.
+- 결과는 OUTPUT_DIR에 JSON/CSV로 저장하므로 야간 회귀 테스트로 실행할 수 있습니다.
+  --min-accuracy를 지정하면 정답률이 그보다 낮을 때 종료 코드 1로 끝납니다.
+  모델/인덱스 파일이나 검증 폴더가 없으면 종료 코드 2, 평가할 이미지가 없으면 종료 코드 1로 끝납니다.
+
+CHECK_DIR에는 클래스별 하위 폴더가 있는 폴더, 클래스 폴더 하나, 또는 file_pre_processing.py --pack으로 만든 shard 폴더를 지정할 수 있습니다.
+실제 정답은 이미지 파일이 속한 폴더 이름(shard는 shards.json의 클래스)입니다.
+
+사용 예:
+    python valify_model2.py
+    python valify_model2.py --data E:\\AIWork\\Data\\테스트\\valid --output ./reports/nightly --min-accuracy 0.80
+"""
 import os
+import sys
+import csv
 import json
+import time
+import argparse
+import datetime
 import numpy as np
-from tensorflow.keras.preprocessing import image
+import tensorflow as tf
 from tensorflow.keras.models import load_model
+from train_input import load_image, load_shards, read_shard_index
 
 # --- 설정 ---
 # MODEL_PATH = './models/cho_korean_food_classifier-fine-20250827-125904.keras'
@@ -11,98 +33,275 @@ INDICES_JSON_PATH = './models/indices-fine-20250827-125904.json'
 
 # CHECK_DIR = 'E:\\AIWork\\Data\\테스트\\valid'  # 예측할 이미지가 있는 폴더 경로
 CHECK_DIR = 'E:\\AIWork\\Data\\테스트\\valid\\감자탕'  # 예측할 이미지가 있는 폴더 경로
+OUTPUT_DIR = './reports'
 
-# 1. 훈련 시 사용된 클래스 인덱스 불러오기
-try:
-    with open(INDICES_JSON_PATH, 'r', encoding='utf-8') as f:
-        class_indices = json.load(f)
-except FileNotFoundError:
-    print(f"오류: 클래스 인덱스 파일({INDICES_JSON_PATH})을 찾을 수 없습니다.")
-    exit()
+BATCH_SIZE = 128
+TOP_K = 5
+# 신뢰도 보정(calibration) 구간 수. 예측 신뢰도를 [0, 1]에서 같은 폭으로 나눕니다.
+CALIBRATION_BINS = 10
 
-class_labels = sorted(class_indices.keys(), key=lambda x: class_indices[x])
+image_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.gif']
 
-# 2. 모델 불러오기
-try:
-    model = load_model(MODEL_PATH)
-    print(f"모델 로딩 성공: {MODEL_PATH}")
-except (IOError, FileNotFoundError):
-    print(f"오류: 모델 파일({MODEL_PATH})을 찾을 수 없습니다.")
-    exit()
 
-# 3. CHECK_DIR의 이미지에 대한 예측 수행
-print(f"\n--- {CHECK_DIR} 폴더의 이미지 예측 시작 ---")
+def list_check_images(check_dir):
+    """CHECK_DIR 아래의 이미지 파일과 실제 정답(파일이 속한 폴더 이름)을 정렬된 순서로 반환합니다."""
+    image_paths = []
+    actual_labels = []
+    for root, _, files in sorted(os.walk(check_dir)):
+        for file in sorted(files):
+            if os.path.splitext(file)[1].lower() in image_extensions:
+                image_paths.append(os.path.join(root, file))
+                actual_labels.append(os.path.basename(root))
+    return image_paths, actual_labels
 
-image_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.gif']
-if not os.path.exists(CHECK_DIR) or not os.path.isdir(CHECK_DIR):
-    print(f"오류: 체크할 디렉토리({CHECK_DIR})를 찾을 수 없습니다.")
-    exit()
 
-image_paths = []
-for root, _, files in os.walk(CHECK_DIR):
-    for file in files:
-        if os.path.splitext(file)[1].lower() in image_extensions:
-            image_paths.append(os.path.join(root, file))
+def folder_batches(image_paths, actual_labels, input_shape, batch_size):
+    """
+    이미지 파일을 병렬로 디코딩해서 (이미지 배치, 실제 정답 배치, 파일 경로 배치)를 반환합니다.
+    읽을 수 없는 이미지는 건너뛰며, 경로를 함께 전달하므로 이미지와 정답의 순서가 어긋나지 않습니다.
+    """
+    dataset = tf.data.Dataset.from_tensor_slices((image_paths, actual_labels))
+    dataset = dataset.map(
+        lambda path, label: (tf.cast(load_image(path, input_shape), tf.float32) / 255.0, label, path),
+        num_parallel_calls=tf.data.AUTOTUNE,
+    )
+    dataset = dataset.ignore_errors().batch(batch_size).prefetch(tf.data.AUTOTUNE)
+    for images, labels, paths in dataset:
+        yield images, [label.decode('utf-8') for label in labels.numpy()], \
+            [path.decode('utf-8') for path in paths.numpy()]
+
+
+def shard_batches(check_dir, index, input_shape, batch_size):
+    """shard 폴더의 이미지를 (이미지 배치, 실제 정답 배치, 'shard 순번' 배치)로 반환합니다."""
+    shard_labels = sorted(index['class_indices'], key=lambda name: index['class_indices'][name])
+    dataset = load_shards(check_dir, index, tuple(input_shape), training=False, cache=False)
+    dataset = dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+    position = 0
+    for images, labels in dataset:
+        count = len(labels)
+        yield tf.cast(images, tf.float32) / 255.0, [shard_labels[label] for label in labels.numpy()], \
+            [f"shard#{position + i}" for i in range(count)]
+        position += count
+
+
+class EvaluationAccumulator:
+    """
+    예측 결과를 배치 단위로 받아 정답률/top-k/혼동 행렬/신뢰도 보정 통계를 누적합니다.
+    전체 예측 확률은 보관하지 않고, 이미지마다 predictions.csv에 쓸 예측 결과 한 줄만 보관합니다.
+    """
+
+    def __init__(self, class_labels, top_k=TOP_K, bins=CALIBRATION_BINS):
+        self.class_labels = class_labels
+        self.class_indices = {name: i for i, name in enumerate(class_labels)}
+        self.top_k = min(top_k, len(class_labels))
+        self.bins = bins
+        num_classes = len(class_labels)
+        # 행: 실제 클래스, 열: 예측 클래스
+        self.confusion = np.zeros((num_classes, num_classes), dtype=np.int64)
+        self.top_k_correct = np.zeros(num_classes, dtype=np.int64)
+        self.confidence_sum = np.zeros(num_classes, dtype=np.float64)
+        self.bin_count = np.zeros(bins, dtype=np.int64)
+        self.bin_correct = np.zeros(bins, dtype=np.int64)
+        self.bin_confidence = np.zeros(bins, dtype=np.float64)
+        # 훈련 클래스에 없는 폴더 이름별 이미지 수 (항상 오답으로 계산)
+        self.unknown = {}
+        self.predictions = []
+
+    def update(self, probabilities, actual_labels, ids):
+        probabilities = np.asarray(probabilities)
+        predicted = np.argmax(probabilities, axis=1)
+        confidence = probabilities[np.arange(len(predicted)), predicted]
+        actual = np.array([self.class_indices.get(label, -1) for label in actual_labels], dtype=np.int64)
+        known = actual >= 0
+        correct = known & (predicted == actual)
+
+        np.add.at(self.confusion, (actual[known], predicted[known]), 1)
+        np.add.at(self.confidence_sum, actual[known], confidence[known])
+        top_k = np.argpartition(-probabilities, self.top_k - 1, axis=1)[:, :self.top_k]
+        in_top_k = known & (top_k == actual[:, None]).any(axis=1)
+        np.add.at(self.top_k_correct, actual[in_top_k], 1)
+
+        bin_index = np.minimum((confidence * self.bins).astype(np.int64), self.bins - 1)
+        np.add.at(self.bin_count, bin_index, 1)
+        np.add.at(self.bin_correct, bin_index, correct.astype(np.int64))
+        np.add.at(self.bin_confidence, bin_index, confidence)
+
+        for label, is_known in zip(actual_labels, known):
+            if not is_known:
+                self.unknown[label] = self.unknown.get(label, 0) + 1
+        for item_id, label, index, conf, is_correct in zip(ids, actual_labels, predicted, confidence, correct):
+            self.predictions.append((item_id, label, self.class_labels[index], float(conf), bool(is_correct)))
+
+    def summary(self):
+        known_total = int(self.confusion.sum())
+        unknown_total = sum(self.unknown.values())
+        total = known_total + unknown_total
+        correct = int(np.trace(self.confusion))
+        per_class_total = self.confusion.sum(axis=1)
+
+        per_class = {}
+        for i, name in enumerate(self.class_labels):
+            if per_class_total[i] == 0:
+                continue
+            predicted_total = int(self.confusion[:, i].sum())
+            per_class[name] = {
+                'total': int(per_class_total[i]),
+                'correct': int(self.confusion[i, i]),
+                'accuracy': float(self.confusion[i, i] / per_class_total[i]),
+                'top_k_accuracy': float(self.top_k_correct[i] / per_class_total[i]),
+                'precision': float(self.confusion[i, i] / predicted_total) if predicted_total else 0.0,
+                'mean_confidence': float(self.confidence_sum[i] / per_class_total[i]),
+            }
+
+        calibration = []
+        ece = 0.0
+        for b in range(self.bins):
+            count = int(self.bin_count[b])
+            entry = {'range': [b / self.bins, (b + 1) / self.bins], 'count': count}
+            if count:
+                entry['accuracy'] = float(self.bin_correct[b] / count)
+                entry['confidence'] = float(self.bin_confidence[b] / count)
+                # ECE: 구간별 |정답률 - 평균 신뢰도|를 이미지 수로 가중 평균
+                ece += count / total * abs(entry['accuracy'] - entry['confidence'])
+            calibration.append(entry)
 
-if not image_paths:
-    print(f"{CHECK_DIR}에서 이미지를 찾을 수 없습니다.")
-    exit()
+        return {
+            'total': total,
+            'correct': correct,
+            'accuracy': correct / total if total else 0.0,
+            'top_k': self.top_k,
+            'top_k_accuracy': int(self.top_k_correct.sum()) / total if total else 0.0,
+            'expected_calibration_error': ece,
+            'unknown_labels': self.unknown,
+            'per_class': per_class,
+            'calibration': calibration,
+        }
 
-print(f"총 {len(image_paths)}개의 이미지를 찾았습니다. 예측을 시작합니다.\n")
 
-try:
-    input_shape = model.input_shape[1:3]
-except Exception:
-    input_shape = (224, 224)
-    print(f"모델 입력 크기를 자동으로 감지할 수 없어 기본값 {input_shape}를 사용합니다.")
+def write_reports(output_dir, accumulator, summary):
+    """summary.json, per_class.csv, confusion_matrix.csv, predictions.csv를 저장합니다. (CSV는 엑셀에서 한글이 보이도록 utf-8-sig)"""
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
 
-# 정답률 계산을 위한 변수
-dir_stats = {}
-total_correct = 0
+    with open(os.path.join(output_dir, 'per_class.csv'), 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['class', 'total', 'correct', 'accuracy', f"top_{summary['top_k']}_accuracy", 'precision',
+                         'mean_confidence'])
+        for name, stats in sorted(summary['per_class'].items()):
+            writer.writerow([name, stats['total'], stats['correct'], f"{stats['accuracy']:.4f}",
+                             f"{stats['top_k_accuracy']:.4f}", f"{stats['precision']:.4f}",
+                             f"{stats['mean_confidence']:.4f}"])
+
+    # 평가 데이터에 나온 클래스(행)와 예측된 클래스(열)만 저장합니다.
+    rows = np.flatnonzero(accumulator.confusion.sum(axis=1))
+    columns = np.flatnonzero(accumulator.confusion.sum(axis=0))
+    with open(os.path.join(output_dir, 'confusion_matrix.csv'), 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['actual \\ predicted'] + [accumulator.class_labels[c] for c in columns])
+        for r in rows:
+            writer.writerow([accumulator.class_labels[r]] + accumulator.confusion[r, columns].tolist())
+
+    with open(os.path.join(output_dir, 'predictions.csv'), 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['file', 'actual', 'predicted', 'confidence', 'correct'])
+        for item_id, actual, predicted, confidence, is_correct in accumulator.predictions:
+            writer.writerow([item_id, actual, predicted, f"{confidence:.4f}", int(is_correct)])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="검증 데이터 전체를 배치로 예측해서 모델을 평가합니다.")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--indices", default=INDICES_JSON_PATH)
+    parser.add_argument("--data", default=CHECK_DIR, help="검증 이미지 폴더 또는 shard 폴더")
+    parser.add_argument("--output", default=None, help="결과 저장 폴더 (기본값: OUTPUT_DIR/eval-<시각>)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--min-accuracy", type=float, default=None, help="이 값보다 정답률이 낮으면 종료 코드 1")
+    args = parser.parse_args()
+
+    # 1. 훈련 시 사용된 클래스 인덱스 불러오기
+    try:
+        with open(args.indices, 'r', encoding='utf-8') as f:
+            class_indices = json.load(f)
+    except FileNotFoundError:
+        print(f"오류: 클래스 인덱스 파일({args.indices})을 찾을 수 없습니다.")
+        sys.exit(2)
+
+    class_labels = sorted(class_indices.keys(), key=lambda x: class_indices[x])
+
+    # 2. 모델 불러오기
+    try:
+        model = load_model(args.model)
+        print(f"모델 로딩 성공: {args.model}")
+    except (IOError, FileNotFoundError, ValueError):
+        # Keras 3는 없는 모델 파일에 ValueError를 발생시킵니다.
+        print(f"오류: 모델 파일({args.model})을 찾을 수 없습니다.")
+        sys.exit(2)
 
-for img_path in image_paths:
     try:
-        img = image.load_img(img_path, target_size=input_shape)
-        img_array = image.img_to_array(img)
-        img_array /= 255.0
-        img_batch = np.expand_dims(img_array, axis=0)
-
-        prediction = model.predict(img_batch, verbose=0)
-
-        predicted_index = np.argmax(prediction[0])
-        predicted_label = class_labels[predicted_index]
-        predicted_confidence = np.max(prediction[0])
-
-        # 실제 정답 (파일이 속한 디렉토리 이름)
-        actual_label = os.path.basename(os.path.dirname(img_path))
-
-        # 정답률 통계 업데이트
-        if actual_label not in dir_stats:
-            dir_stats[actual_label] = {'correct': 0, 'total': 0}
-        
-        dir_stats[actual_label]['total'] += 1
-        is_correct = predicted_label == actual_label
-        if is_correct:
-            dir_stats[actual_label]['correct'] += 1
-            total_correct += 1
-
-        relative_path = os.path.relpath(img_path, CHECK_DIR)
-        result_marker = "(정답)" if is_correct else "(오답)"
-        print(f"파일: {relative_path}, 예측: {predicted_label}, 실제: {actual_label} {result_marker}")
-
-    except Exception as e:
-        print(f"파일 처리 중 오류 발생 {img_path}: {e}")
-
-# --- 예측 결과 요약 ---
-print("\n--- 디렉토리별 정답률 ---")
-
-# 디렉토리 이름으로 정렬하여 출력
-for dir_name, stats in sorted(dir_stats.items()):
-    accuracy = (stats['correct'] / stats['total']) * 100 if stats['total'] > 0 else 0
-    print(f"- {dir_name}: {accuracy:.2f}% ({stats['correct']}/{stats['total']})")
-
-# --- 전체 정답률 ---
-print("\n--- 전체 정답률 ---")
-total_images = len(image_paths)
-overall_accuracy = (total_correct / total_images) * 100 if total_images > 0 else 0
-print(f">> {overall_accuracy:.2f}% ({total_correct}/{total_images})")
+        input_shape = tuple(model.input_shape[1:3])
+    except Exception:
+        input_shape = (224, 224)
+        print(f"모델 입력 크기를 자동으로 감지할 수 없어 기본값 {input_shape}를 사용합니다.")
+
+    # 3. CHECK_DIR의 이미지에 대한 예측 수행
+    if not os.path.exists(args.data) or not os.path.isdir(args.data):
+        print(f"오류: 체크할 디렉토리({args.data})를 찾을 수 없습니다.")
+        sys.exit(2)
+
+    shard_index = read_shard_index(args.data)
+    if shard_index is not None:
+        expected = shard_index['total']
+        batches = shard_batches(args.data, shard_index, input_shape, args.batch_size)
+    else:
+        image_paths, actual_labels = list_check_images(args.data)
+        if not image_paths:
+            print(f"{args.data}에서 이미지를 찾을 수 없습니다.")
+            sys.exit(1)
+        expected = len(image_paths)
+        batches = folder_batches(image_paths, actual_labels, input_shape, args.batch_size)
+
+    print(f"\n--- {args.data} 폴더의 이미지 {expected}개 예측 시작 (batch={args.batch_size}) ---")
+    accumulator = EvaluationAccumulator(class_labels, top_k=args.top_k)
+    start = time.perf_counter()
+    done = 0
+    for images, labels, ids in batches:
+        probabilities = model.predict_on_batch(images)
+        accumulator.update(probabilities, labels, ids)
+        done += len(labels)
+        print(f"\r{done}/{expected}", end='', flush=True)
+    elapsed = time.perf_counter() - start
+    print()
+
+    summary = accumulator.summary()
+    summary.update({
+        'model': os.path.abspath(args.model),
+        'indices': os.path.abspath(args.indices),
+        'data': os.path.abspath(args.data),
+        'skipped': expected - summary['total'],
+        'seconds': elapsed,
+        'images_per_second': summary['total'] / elapsed if elapsed else 0.0,
+        'evaluated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+    })
+    output_dir = args.output or os.path.join(OUTPUT_DIR, f"eval-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}")
+    write_reports(output_dir, accumulator, summary)
+
+    # --- 예측 결과 요약 ---
+    print("\n--- 디렉토리별 정답률 ---")
+    for dir_name, stats in sorted(summary['per_class'].items()):
+        print(f"- {dir_name}: {stats['accuracy'] * 100:.2f}% ({stats['correct']}/{stats['total']})")
+    for dir_name, count in sorted(summary['unknown_labels'].items()):
+        print(f"- {dir_name}: 훈련 클래스에 없는 폴더 (0/{count})")
+
+    print("\n--- 전체 정답률 ---")
+    print(f">> {summary['accuracy'] * 100:.2f}% ({summary['correct']}/{summary['total']})")
+    print(f">> top-{summary['top_k']}: {summary['top_k_accuracy'] * 100:.2f}%, "
+          f"ECE: {summary['expected_calibration_error']:.4f}, {summary['images_per_second']:.1f} images/sec")
+    if summary['skipped']:
+        print(f">> 읽을 수 없어 건너뛴 이미지: {summary['skipped']}개")
+    print(f"결과 저장: {output_dir}")
+
+    if args.min_accuracy is not None and summary['accuracy'] < args.min_accuracy:
+        print(f"정답률이 기준({args.min_accuracy:.4f})보다 낮습니다.")
+        sys.exit(1)
@@ -0,0 +1,106 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from service.food_nutrition_service import stream_analysis_for_ui
+
+# LLM 분석을 동시에 실행할 백그라운드 작업 스레드 수
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "8"))
+
+
+class AnalysisJob:
+    """
+    실행 중인 분석 하나. future는 최종 결과를, partial()은 스트리밍으로 지금까지 받은 결과를 반환합니다.
+    """
+
+    def __init__(self, food_name):
+        self.food_name = food_name
+        self.future = None
+        self._lock = threading.Lock()
+        self._partial = None
+
+    def update(self, partial):
+        with self._lock:
+            self._partial = partial
+
+    def partial(self):
+        """지금까지 확정된 분석 결과. 아직 받은 내용이 없으면 None"""
+        with self._lock:
+            return self._partial
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout=timeout)
+
+
+class AnalysisJobs:
+    """
+    LLM 영양 분석을 Streamlit 스크립트 스레드 밖에서 실행하는 백그라운드 작업 큐입니다.
+    submit()은 바로 AnalysisJob을 반환하므로 화면은 분류 결과를 먼저 그리고, 분석 결과는 받는 대로(스트리밍) 표시합니다.
+    같은 음식에 대한 분석이 이미 실행 중이면 새로 실행하지 않고 그 작업을 함께 사용합니다.
+    LLM 호출은 대부분 네트워크 대기이므로, 느린 호출 하나가 다른 세션의 분석을 막지 않도록 스레드 여러 개로 처리합니다.
+    """
+
+    def __init__(self, max_workers=ANALYSIS_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="AnalysisJobs")
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.submitted = 0
+        self.shared = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_seconds = 0.0
+
+    def submit(self, food_name, food_data=None):
+        """
+        음식 분석을 백그라운드에서 시작하고 AnalysisJob을 반환합니다.
+        최종 결과(job.result())는 get_analysis_for_ui()와 같은 형식의 딕셔너리입니다.
+        """
+        with self._lock:
+            job = self._inflight.get(food_name)
+            if job is not None:
+                self.shared += 1
+                return job
+            job = AnalysisJob(food_name)
+            job.future = self._executor.submit(self._run, job, food_data)
+            self._inflight[food_name] = job
+            self.submitted += 1
+        job.future.add_done_callback(lambda _: self._finish(food_name))
+        return job
+
+    def _run(self, job, food_data):
+        start = time.perf_counter()
+        try:
+            analysis = None
+            for analysis in stream_analysis_for_ui(job.food_name, food_data):
+                job.update(analysis)
+            return analysis
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.completed += 1
+                self.total_seconds += time.perf_counter() - start
+
+    def _finish(self, food_name):
+        with self._lock:
+            self._inflight.pop(food_name, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "shared": self.shared,
+                "in_flight": len(self._inflight),
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_seconds": self.total_seconds / self.completed if self.completed else 0.0,
+            }
+
+
+# 프로세스 전체에서 공유하는 기본 작업 큐
+analysis_jobs = AnalysisJobs()
@@ -0,0 +1,138 @@
+import os
+import threading
+import numpy as np
+
+
+# 사용할 추론 백엔드는 .env 또는 환경 변수 PREDICT_BACKEND로 지정합니다. (keras / tflite / onnx)
+# 이 모듈은 load_dotenv()보다 먼저 import될 수 있으므로 값은 모델을 로드할 때 읽습니다.
+def default_backend():
+    return os.getenv("PREDICT_BACKEND", "keras")
+
+
+# 백엔드별 모델 파일 확장자. export_model.py가 Keras 모델 옆에 같은 이름으로 변환 파일을 만듭니다.
+BACKEND_EXTENSIONS = {
+    "keras": ".keras",
+    "tflite": ".tflite",
+    "onnx": ".onnx",
+}
+
+
+class KerasBackend:
+    """전체 TensorFlow 런타임으로 Keras 모델을 실행하는 백엔드입니다."""
+
+    name = "keras"
+
+    def __init__(self, model_path):
+        import tensorflow as tf
+        from tensorflow.keras.models import load_model
+
+        self.model = load_model(model_path)
+        self.input_shape = tuple(self.model.input_shape[1:])
+
+        # model.predict()는 호출마다 tf.data 파이프라인과 진행바를 만들기 때문에 한 장 예측에는 부담이 큽니다.
+        # 입력 시그니처를 고정한 tf.function으로 model(x, training=False)를 직접 호출해서 재추적 없이 실행합니다.
+        self._infer = tf.function(
+            lambda x: self.model(x, training=False),
+            input_signature=[tf.TensorSpec(shape=(None,) + self.input_shape, dtype=tf.float32)],
+        )
+
+    def predict_proba(self, img_array):
+        return self._infer(img_array).numpy()
+
+
+class TFLiteBackend:
+    """
+    TFLite 인터프리터로 변환된 모델을 실행하는 백엔드입니다.
+    tflite_runtime 패키지가 있으면 TensorFlow 전체를 불러오지 않고 그것만 사용합니다.
+    인터프리터는 스레드에 안전하지 않으므로 레지스트리로 공유되는 인스턴스에서 예측을 한 번에 하나씩 실행합니다.
+    """
+
+    name = "tflite"
+
+    def __init__(self, model_path, num_threads=None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+
+        self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads or os.cpu_count())
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self.input_shape = tuple(int(d) for d in self._input["shape"][1:])
+        self._batch_size = int(self._input["shape"][0])
+        # resize/allocate/set_tensor/invoke/get_tensor 순서가 다른 요청과 섞이지 않도록 전체를 잠급니다.
+        self._lock = threading.Lock()
+
+    def _resize(self, batch_size):
+        # 인터프리터는 고정된 배치 크기로 텐서를 할당하므로 배치 크기가 바뀔 때만 다시 할당합니다.
+        if batch_size != self._batch_size:
+            self.interpreter.resize_tensor_input(self._input["index"], (batch_size,) + self.input_shape)
+            self.interpreter.allocate_tensors()
+            self._input = self.interpreter.get_input_details()[0]
+            self._output = self.interpreter.get_output_details()[0]
+            self._batch_size = batch_size
+
+    def predict_proba(self, img_array):
+        with self._lock:
+            return self._predict_proba(img_array)
+
+    def _predict_proba(self, img_array):
+        self._resize(img_array.shape[0])
+
+        # 전체 정수 양자화 모델은 입력/출력이 int8/uint8이므로 scale, zero_point로 변환합니다.
+        input_dtype = self._input["dtype"]
+        if input_dtype != np.float32:
+            scale, zero_point = self._input["quantization"]
+            info = np.iinfo(input_dtype)
+            img_array = np.clip(np.round(img_array / scale + zero_point), info.min, info.max).astype(input_dtype)
+
+        self.interpreter.set_tensor(self._input["index"], img_array)
+        self.interpreter.invoke()
+        output = self.interpreter.get_tensor(self._output["index"])
+
+        if self._output["dtype"] != np.float32:
+            scale, zero_point = self._output["quantization"]
+            output = (output.astype(np.float32) - zero_point) * scale
+        return output
+
+
+class OnnxBackend:
+    """ONNX Runtime(CPU)으로 변환된 모델을 실행하는 백엔드입니다."""
+
+    name = "onnx"
+
+    def __init__(self, model_path):
+        import onnxruntime as ort
+
+        self.session = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self._input_name = model_input.name
+        self.input_shape = tuple(int(d) for d in model_input.shape[1:])
+
+    def predict_proba(self, img_array):
+        return self.session.run(None, {self._input_name: img_array})[0]
+
+
+BACKENDS = {
+    "keras": KerasBackend,
+    "tflite": TFLiteBackend,
+    "onnx": OnnxBackend,
+}
+
+
+def resolve_model_path(model_path, backend):
+    """
+    Keras 모델 경로를 백엔드에 맞는 변환 파일 경로로 바꿉니다.
+    예: ('model/models/kfood_model.keras', 'tflite') -> 'model/models/kfood_model.tflite'
+    """
+    if backend not in BACKEND_EXTENSIONS:
+        raise ValueError(f"지원하지 않는 백엔드입니다: {backend} (사용 가능: {', '.join(BACKENDS)})")
+    base, ext = os.path.splitext(model_path)
+    if ext in BACKEND_EXTENSIONS.values():
+        return base + BACKEND_EXTENSIONS[backend]
+    return model_path
+
+
+def load_backend(model_path, backend):
+    return BACKENDS[backend](model_path)
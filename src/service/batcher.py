@@ -0,0 +1,99 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+import numpy as np
+from service.predict import predict_batch
+
+
+class MicroBatcher:
+    """
+    여러 세션에서 동시에 들어오는 예측 요청을 모아서 한 번의 forward pass로 처리하는 마이크로 배처입니다.
+    최대 max_batch_size장이 모이거나, 첫 요청 이후 max_wait_ms가 지나면 모인 요청을 한꺼번에 예측합니다.
+    """
+
+    def __init__(self, model_path, indices_path, max_batch_size=32, max_wait_ms=10, top_k=1):
+        self.model_path = model_path
+        self.indices_path = indices_path
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.top_k = top_k
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self.batches = 0
+        self.images = 0
+
+        self._worker = threading.Thread(target=self._run, name="MicroBatcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, img_array):
+        """
+        이미지 한 장(또는 (1, 224, 224, 3) 배열)을 큐에 넣고 결과를 받을 Future를 반환합니다.
+        """
+        if self._closed:
+            raise RuntimeError("MicroBatcher가 이미 종료되었습니다.")
+        if img_array.ndim == 4:
+            img_array = img_array[0]
+        future = Future()
+        self._queue.put((img_array, future))
+        return future
+
+    def predict(self, img_array, timeout=None):
+        """submit() 후 결과가 나올 때까지 기다립니다. predict()와 같은 형식의 딕셔너리를 반환합니다."""
+        return self.submit(img_array).result(timeout=timeout)
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "images": self.images,
+            "avg_batch_size": self.images / self.batches if self.batches else 0.0,
+        }
+
+    def _collect(self):
+        """첫 요청을 기다린 뒤, 배치가 가득 차거나 대기 시간이 끝날 때까지 요청을 모읍니다."""
+        first = self._queue.get()
+        if first is None:
+            return None
+
+        items = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(items) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # 종료 신호는 남은 요청을 처리한 다음 루프에서 받도록 다시 넣어둡니다.
+                self._queue.put(None)
+                break
+            items.append(item)
+        return items
+
+    def _run(self):
+        while True:
+            items = self._collect()
+            if items is None:
+                break
+
+            futures = [future for _, future in items]
+            try:
+                img_batch = np.stack([img for img, _ in items])
+                results = predict_batch(img_batch, self.model_path, self.indices_path, top_k=self.top_k)
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.images += len(items)
+            for future, result in zip(futures, results):
+                future.set_result(result)
@@ -2,22 +2,50 @@
 import sys
 import os
 import re
+import time
+import queue
+import threading
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+from dotenv import load_dotenv
+# .env 파일에서 환경 변수를 불러옵니다 (API 키 등)
+# 아래 모듈들이 import 시점에 읽는 설정에도 적용되도록 가장 먼저 불러옵니다.
+load_dotenv()
 # import src.db.database as DB
 from src.db import database as DB
+from src.db.nutrition_index import get_nutrition_index
+from src.db.class_resolution import indices_version
+from src.service.llm_cache import get_llm_cache
 import os
-from dotenv import load_dotenv
+import httpx
 from openai import OpenAI
 from langchain.agents import create_openai_functions_agent, tool, AgentExecutor
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.callbacks import BaseCallbackHandler
 
-# .env 파일에서 환경 변수를 불러옵니다 (API 키 등)
-load_dotenv()
 # OpenAI 클라이언트를 초기화합니다.
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 # LangChain에서 사용할 언어 모델(LLM)을 설정합니다. 여기서는 gpt-4o-mini를 사용합니다.
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+LLM_MODEL = "gpt-4o-mini"
+# 에이전트 실행 과정을 콘솔에 출력할지 여부입니다. 운영 환경에서는 끄고, 디버깅할 때만 LLM_VERBOSE=true로 켭니다.
+LLM_VERBOSE = os.getenv("LLM_VERBOSE", "false").lower() == "true"
+# OpenAI API 호출에 재사용할 HTTP 연결 수와 타임아웃(초)입니다.
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+
+# true이면 서비스 시작 시 영양 DB 전체를 메모리 인덱스로 올려서 SQLite 대신 사용합니다.
+USE_NUTRITION_INDEX = os.getenv("NUTRITION_INDEX", "false").lower() == "true"
+
+# 분석 방식입니다.
+# - agent: 에이전트가 get_food_info 도구를 호출해서 데이터를 조회합니다. (LLM 호출 2회 이상)
+# - direct: DB에서 먼저 영양 데이터를 조회해서 프롬프트에 넣고 LLM을 한 번만 호출합니다.
+#           DB에 데이터가 없으면 agent 방식으로 처리합니다.
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "agent")
+
+# 프롬프트(system_prompt, human_prompt, 입력 문구)를 수정하면 버전을 올려서 이전 캐시 결과를 사용하지 않도록 합니다.
+PROMPT_VERSION = "1"
+# 분석 방식마다 프롬프트가 다르므로 캐시 키에 분석 방식도 포함합니다.
+CACHE_PROMPT_VERSION = f"{PROMPT_VERSION}-{ANALYSIS_MODE}"
 
 # LLM 에이전트에게 전달할 시스템 프롬프트입니다.
 # 에이전트의 역할, 목표, 규칙을 정의하여 행동을 제어합니다.
@@ -44,11 +72,113 @@ human_prompt = """
     3) 개선 팁: (실천 가능한 제안 2~4개)"),
 """
 
+# direct 모드에서 사용하는 시스템 프롬프트입니다. 도구 대신 프롬프트에 포함된 영양 데이터를 사용합니다.
+direct_system_prompt = """
+    역할: 당신은 식품 영양 분석 전문가입니다.
+    목표:
+    1) 함께 제공된 영양 데이터를 근거로 건강 점수(0~100)를 산출하고, 과/부족 항목을 설명합니다.
+    2) 개선 팁(예: 나트륨 낮추기, 단백질 보완)을 제안합니다.
+    규칙:
+    - 제공된 영양 데이터의 수치를 우선 사용할 것.
+    - 출력은 마지막에 깔끔한 한국어 문단으로 제공.,
+"""
+
+direct_human_prompt = """
+    {input}
+    영양 데이터:
+    {nutrition}
+    출력 형식 가이드:
+    1) 건강 점수: NN/100
+    2) 이유: (성분별 근거)
+    3) 개선 팁: (실천 가능한 제안 2~4개)
+"""
+
+# direct 모드 프롬프트에 넣을 영양 성분 (컬럼명, 표시명, 단위)
+DIRECT_PROMPT_NUTRIENTS = [
+    ("nutrition_content_standard_amount", "영양성분 기준량", ""),
+    ("food_weight", "1회 제공량", ""),
+    ("energy_kcal", "열량", "kcal"),
+    ("carbohydrates_g", "탄수화물", "g"),
+    ("sugars_g", "당류", "g"),
+    ("dietary_fiber_g", "식이섬유", "g"),
+    ("protein_g", "단백질", "g"),
+    ("fat_g", "지방", "g"),
+    ("saturated_fatty_acids_g", "포화지방산", "g"),
+    ("trans_fatty_acids_g", "트랜스지방산", "g"),
+    ("cholesterol_mg", "콜레스테롤", "mg"),
+    ("sodium_mg", "나트륨", "mg"),
+    ("potassium_mg", "칼륨", "mg"),
+    ("calcium_mg", "칼슘", "mg"),
+]
+
+
+# 분류 클래스(DB 검색명) -> 식품코드 매핑. load_class_resolution()으로 서비스 시작 시 읽어 둡니다.
+# 식품코드가 None인 항목은 DB에 없는 것으로 확인된 클래스입니다.
+_class_resolution = {}
+_class_resolution_version = None
+
+
+def load_class_resolution(indices_path):
+    """
+    class_resolution.py로 미리 만들어 둔 클래스 -> 식품코드 매핑을 읽습니다.
+    같은 클래스 목록(모델 버전)은 한 번만 읽고, 매핑이 없으면 기존처럼 음식명 검색을 사용합니다.
+
+    Returns:
+        int: 읽은 매핑 수
+    """
+    global _class_resolution, _class_resolution_version
+    model_version = indices_version(indices_path)
+    if model_version == _class_resolution_version:
+        return len(_class_resolution)
+    resolution, dataset_version = DB.get_class_resolution(model_version)
+    if not resolution:
+        print(f"클래스 매핑이 없어서 음식명 검색을 사용합니다. (모델 버전 {model_version}, src/db/class_resolution.py로 생성)")
+    elif dataset_version != DB.get_dataset_version():
+        print(f"클래스 매핑이 이전 데이터셋(버전 {dataset_version})으로 만들어졌습니다. src/db/class_resolution.py를 다시 실행해주세요.")
+    _class_resolution = resolution
+    _class_resolution_version = model_version
+    return len(resolution)
+
+
+def get_food_nutrition_infos(food_names: list):
+    """
+    여러 음식 이름의 영양 정보를 한 번에 조회합니다.
+    분류 클래스는 미리 정해 둔 식품코드로, 그 외 이름은 음식명 검색으로 조회하며 각각 한 번의 쿼리로 처리합니다.
+    음식명 검색 결과 중 '외식'으로 분류된 음식을 우선적으로, 없을 경우 첫 번째 검색 결과를 사용합니다.
+
+    Args:
+        food_names (list): 조회할 음식 이름의 리스트.
+
+    Returns:
+        dict: {음식 이름: 영양 정보 딕셔너리 또는 None}. 입력 순서를 유지하며, 찾지 못한 음식은 None입니다.
+    """
+    results = dict.fromkeys(food_names)
+    # DB에 없는 것으로 확인된 클래스(식품코드가 None)는 검색하지 않습니다.
+    codes = {name: _class_resolution[name] for name in results if _class_resolution.get(name)}
+    search_names = [name for name in results if name not in _class_resolution]
+
+    if USE_NUTRITION_INDEX:
+        # 메모리 인덱스는 쿼리 비용이 없으므로 이름마다 바로 조회합니다.
+        index = get_nutrition_index()
+        for name, food_code in codes.items():
+            results[name] = index.get_by_code(food_code)
+        for name in search_names:
+            results[name] = DB.choose_food_data(index.search(name))
+        return results
+
+    if codes:
+        by_code = DB.get_food_info_by_codes(list(codes.values()))
+        for name, food_code in codes.items():
+            results[name] = by_code[food_code]
+    if search_names:
+        results.update(DB.get_food_info_by_names(search_names))
+    return results
+
 
 def get_food_nutrition_info(food_names: list):
     """
     주어진 음식 이름 목록을 기반으로 데이터베이스에서 음식 영양 정보를 조회합니다.
-    '외식'으로 분류된 음식을 우선적으로 반환하며, 없을 경우 첫 번째 검색 결과를 반환합니다.
+    목록 순서대로 처음 찾은 음식의 영양 정보를 반환합니다. (앞의 이름을 찾지 못하면 다음 이름을 사용)
 
     Args:
         food_names (list): 조회할 음식 이름의 리스트.
@@ -57,19 +187,9 @@ def get_food_nutrition_info(food_names: list):
         dict: 조회된 음식의 영양 정보 데이터 (딕셔너리).
               데이터를 찾지 못한 경우 None을 반환합니다.
     """
-    for food_name in food_names:
-        # 데이터베이스 모듈을 통해 음식 정보를 가져옵니다.
-        food_datas = DB.get_food_info_by_name(food_name)
-
-        if not food_datas:
-            return None
-        else:
-            # '외식' 데이터가 있으면 우선적으로 반환합니다.
-            for food_data in food_datas:
-                if '외식 ' in food_data.get("food_origin_name", ""):
-                    return food_data
-            # '외식' 데이터가 없으면 첫 번째 결과를 반환합니다.
-            return food_datas[0]
+    for food_data in get_food_nutrition_infos(food_names).values():
+        if food_data:
+            return food_data
     return None
 
 
@@ -84,96 +204,377 @@ def get_food_info(food_name: str) -> str:
         return "데이터베이스에서 해당 음식 정보를 찾을 수 없습니다."
 
 
-def ask_llm(food_name):
-    """
-    LLM 에이전트를 설정하고 실행하여 음식에 대한 영양 분석을 요청합니다.
-
-    Args:
-        food_name (str): 분석할 음식의 이름.
-
-    Returns:
-        str: LLM 에이전트가 생성한 최종 분석 결과.
-    """
-    # 에이전트가 사용할 프롬프트 템플릿을 구성합니다.
-    nutrition_prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("human", human_prompt),
-        MessagesPlaceholder("agent_scratchpad"),  # 에이전트의 중간 작업 과정을 저장하는 공간
-    ])
-
-    # LLM, 도구, 프롬프트를 연결하여 에이전트를 생성합니다.
-    agent = create_openai_functions_agent(llm, tools=[get_food_info], prompt=nutrition_prompt)
-    # 생성된 에이전트를 실행할 실행기(Executor)를 만듭니다.
-    agent_executor = AgentExecutor(agent=agent, tools=[get_food_info], verbose=True)
-
-    # 사용자 입력을 받아 프롬프트 형식에 맞게 구성합니다.
-    input_prompt = f"""
+def build_input_prompt(food_name):
+    """사용자 입력을 받아 프롬프트 형식에 맞게 구성합니다."""
+    return f"""
         {food_name}의 영양 정보를 바탕으로 
         1) 건강 점수를 0~100으로 매겨줘.
         2) 점수 이유를 성분별로 설명해줘.
         3) 개선 팁을 알려줘.
     """
-    # 에이전트 실행기에게 입력을 전달하여 결과를 얻습니다.
-    response = agent_executor.invoke({"input": input_prompt})
-    return response["output"]
 
 
+def format_nutrition(food_data):
+    """DB 조회 결과에서 분석에 필요한 영양 성분만 골라 프롬프트용 문자열로 만듭니다."""
+    lines = [f"- 식품명: {food_data.get('food_name')}"]
+    for column, label, unit in DIRECT_PROMPT_NUTRIENTS:
+        value = food_data.get(column)
+        if value not in (None, ""):
+            lines.append(f"- {label}: {value}{unit}")
+    return "\n".join(lines)
+
 
-def ask_llm_for_ui(food_name: str):
+class _TokenQueueHandler(BaseCallbackHandler):
+    """LLM이 생성하는 토큰을 큐에 넣는 콜백입니다. (에이전트 스트리밍용)"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def on_llm_new_token(self, token, **kwargs):
+        if token:
+            self.tokens.put(token)
+
+
+class NutritionAnalysisEngine:
     """
-    UI에 바로 사용할 수 있는 영양 분석 결과를 반환합니다.
-    반환 형식(딕셔너리):
-    {
-        "score": int,  # 건강 점수 (0~100)
-        "nutrients": dict,  # 영양소 데이터
-        "analysis": {
-            "score_text": str,   # 예: "75/100"
-            "reason": [str, ...],  # 이유 
-            "tips": [str, ...]     # 개선 팁 
-        }
-    }
+    프롬프트 템플릿, 에이전트, 실행기(Executor)를 한 번만 만들어 두고 요청마다 재사용하는 분석 엔진입니다.
+    OpenAI API 호출은 연결 풀을 가진 HTTP 클라이언트 하나를 공유합니다.
+    AgentExecutor.invoke는 호출 간 상태를 공유하지 않으므로 여러 스레드에서 동시에 사용할 수 있습니다.
+    """
+
+    def __init__(self, llm=None, verbose=LLM_VERBOSE):
+        start = time.perf_counter()
+
+        self.http_client = None
+        if llm is None:
+            self.http_client = httpx.Client(
+                limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS,
+                                    max_keepalive_connections=LLM_MAX_CONNECTIONS),
+                timeout=LLM_TIMEOUT,
+            )
+            # streaming=True이면 invoke()도 토큰 단위로 받아서 콜백(on_llm_new_token)에 전달합니다. 최종 결과는 같습니다.
+            llm = ChatOpenAI(model=LLM_MODEL, temperature=0, http_client=self.http_client, streaming=True)
+        self.llm = llm
+
+        # 에이전트가 사용할 프롬프트 템플릿을 구성합니다.
+        nutrition_prompt = ChatPromptTemplate.from_messages([
+            ("system", system_prompt),
+            ("human", human_prompt),
+            MessagesPlaceholder("agent_scratchpad"),  # 에이전트의 중간 작업 과정을 저장하는 공간
+        ])
+
+        # LLM, 도구, 프롬프트를 연결하여 에이전트를 생성합니다.
+        agent = create_openai_functions_agent(self.llm, tools=[get_food_info], prompt=nutrition_prompt)
+        # 생성된 에이전트를 실행할 실행기(Executor)를 만듭니다.
+        self.agent_executor = AgentExecutor(agent=agent, tools=[get_food_info], verbose=verbose)
+
+        # direct 모드용 프롬프트 템플릿 (도구 없이 LLM을 한 번만 호출)
+        self.direct_prompt = ChatPromptTemplate.from_messages([
+            ("system", direct_system_prompt),
+            ("human", direct_human_prompt),
+        ])
+
+        self.build_seconds = time.perf_counter() - start
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.call_seconds = 0.0
+
+    def ask(self, food_name):
+        start = time.perf_counter()
+        # 에이전트 실행기에게 입력을 전달하여 결과를 얻습니다.
+        response = self.agent_executor.invoke({"input": build_input_prompt(food_name)})
+        self._record(start)
+        return response["output"]
+
+    def ask_direct(self, food_name, food_data):
+        """
+        DB에서 조회한 영양 데이터를 프롬프트에 넣어 LLM을 한 번만 호출합니다.
+        데이터가 없으면(None) 에이전트 방식(ask)으로 처리합니다.
+        """
+        if not food_data:
+            return self.ask(food_name)
+
+        start = time.perf_counter()
+        messages = self.direct_prompt.format_messages(input=build_input_prompt(food_name),
+                                                      nutrition=format_nutrition(food_data))
+        response = self.llm.invoke(messages)
+        self._record(start)
+        return response.content
+
+    def stream(self, food_name, food_data=None):
+        """
+        분석 결과 텍스트를 토큰(조각) 단위로 차례로 반환합니다.
+        direct 모드이고 영양 데이터가 있으면 LLM 응답을 바로 스트리밍하고,
+        그 외에는 에이전트를 별도 스레드에서 실행하면서 최종 답변 토큰을 콜백으로 받아 전달합니다.
+        """
+        start = time.perf_counter()
+        if ANALYSIS_MODE == "direct" and food_data:
+            messages = self.direct_prompt.format_messages(input=build_input_prompt(food_name),
+                                                          nutrition=format_nutrition(food_data))
+            for chunk in self.llm.stream(messages):
+                if chunk.content:
+                    yield chunk.content
+            self._record(start)
+            return
+
+        tokens = queue.Queue()
+        done = object()
+        errors = []
+
+        def run():
+            try:
+                # 도구 호출 단계의 토큰은 내용이 비어 있고, 최종 답변 단계의 토큰만 내용이 있습니다.
+                self.agent_executor.invoke({"input": build_input_prompt(food_name)},
+                                           config={"callbacks": [_TokenQueueHandler(tokens)]})
+            except Exception as e:
+                errors.append(e)
+            finally:
+                tokens.put(done)
+
+        threading.Thread(target=run, name="NutritionAnalysisStream", daemon=True).start()
+        while True:
+            token = tokens.get()
+            if token is done:
+                break
+            yield token
+        if errors:
+            raise errors[0]
+        self._record(start)
+
+    def _record(self, start):
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.calls += 1
+            self.call_seconds += elapsed
+
+    def stats(self):
+        """엔진 생성 비용과 호출 비용을 비교할 수 있는 지표를 반환합니다."""
+        with self._lock:
+            return {
+                "build_seconds": self.build_seconds,
+                "calls": self.calls,
+                "avg_call_seconds": self.call_seconds / self.calls if self.calls else 0.0,
+            }
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """프로세스 전체에서 공유하는 분석 엔진을 반환합니다. 처음 호출될 때 한 번만 생성합니다."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = NutritionAnalysisEngine()
+                # 메모리 인덱스를 사용하는 경우 엔진과 함께 시작 시 미리 로드합니다.
+                if USE_NUTRITION_INDEX:
+                    get_nutrition_index()
+    return _engine
+
+
+def ask_llm(food_name, food_data=None):
+    """
+    LLM을 실행하여 음식에 대한 영양 분석을 요청합니다. ANALYSIS_MODE 설정에 따라 방식이 달라집니다.
+
+    Args:
+        food_name (str): 분석할 음식의 이름.
+        food_data (dict): direct 모드에서 사용할 영양 정보. 없으면 DB에서 조회합니다.
+
+    Returns:
+        str: LLM이 생성한 최종 분석 결과.
+    """
+    engine = get_engine()
+    if ANALYSIS_MODE == "direct":
+        if food_data is None:
+            food_data = get_food_nutrition_info([food_name])
+        return engine.ask_direct(food_name, food_data)
+    return engine.ask(food_name)
+
+
+def parse_analysis(response_text: str):
     """
-    response_text = ask_llm(food_name)
+    LLM 응답 텍스트에서 건강 점수, 이유, 개선 팁을 추출합니다.
 
+    Returns:
+        dict: {"score": int, "score_text": str, "reason": [str, ...], "tips": [str, ...]}
+    """
     # 1) 건강 점수
     score_match = re.search(r"건강\s*점수[:\s]+(\d+)", response_text)
     score = int(score_match.group(1)) if score_match else 0
     score_text = f"{score}/100"
 
-    # 2) 영양소 데이터 (DB에서 가져오기)
-    food_data = get_food_nutrition_info([food_name])
-    nutrients = {
-        "열량(kcal)": food_data.get("energy_kcal", 0) if food_data else 0,
-        "탄수화물(g)": food_data.get("carbohydrates_g", 0) if food_data else 0,
-        "단백질(g)": food_data.get("protein_g", 0) if food_data else 0,
-        "지방(g)": food_data.get("fat_g", 0) if food_data else 0,
-        "당(g)": food_data.get("sugars_g", 0) if food_data else 0,
-    }
-
-    # 3) 이유
+    # 2) 이유
     reason_match = re.search(r"2\)\s*이유[:\s]*([\s\S]*?)(?:3\)|$)", response_text)
     reasons = []
     if reason_match:
         reason_lines = reason_match.group(1).strip().split("\n")
         reasons = [line.lstrip("* ").strip() for line in reason_lines if line.strip()]
 
-    # 4) 개선 팁
+    # 3) 개선 팁
     tips_match = re.search(r"3\)\s*개선\s*팁[:\s]*([\s\S]*)", response_text)
     tips = []
     if tips_match:
         tip_lines = tips_match.group(1).strip().split("\n")
         tips = [line.lstrip("* ").strip() for line in tip_lines if line.strip()]
 
-
     return {
         "score": score,
+        "score_text": score_text,
+        "reason": reasons,
+        "tips": tips
+    }
+
+
+class AnalysisStreamParser:
+    """
+    스트리밍으로 받는 LLM 응답을 조각마다 이어 붙이면서 지금까지 확정된 분석 결과를 만듭니다.
+    - 건강 점수는 숫자가 끝난 것이 확인되는 즉시(예: "건강 점수: 75/") 반환합니다.
+    - 이유와 개선 팁은 줄이 끝난 항목만 반환하므로, 쓰는 중인 문장이 잘려서 보이지 않습니다.
+    close()의 결과는 전체 응답을 parse_analysis()로 처리한 결과와 같습니다.
+    """
+
+    SCORE_PATTERN = re.compile(r"건강\s*점수[:\s]+(\d+)\D")
+
+    def __init__(self):
+        self.text = ""
+        self.score = None
+        self._parsed_upto = 0
+        self._snapshot = {"score": None, "score_text": None, "reason": [], "tips": []}
+
+    def feed(self, chunk):
+        """
+        응답 조각을 추가하고, 지금까지 확정된 결과를 반환합니다.
+
+        Returns:
+            dict: parse_analysis()와 같은 형식. 점수를 아직 받지 못했으면 score/score_text는 None입니다.
+        """
+        self.text += chunk
+        if self.score is None:
+            score_match = self.SCORE_PATTERN.search(self.text)
+            if score_match:
+                self.score = int(score_match.group(1))
+                self._snapshot["score"] = self.score
+                self._snapshot["score_text"] = f"{self.score}/100"
+
+        # 새 줄이 끝났을 때만 이유/팁을 다시 계산합니다.
+        complete = self.text.rfind("\n") + 1
+        if complete > self._parsed_upto:
+            self._parsed_upto = complete
+            parsed = parse_analysis(self.text[:complete])
+            self._snapshot["reason"] = parsed["reason"]
+            self._snapshot["tips"] = parsed["tips"]
+        return dict(self._snapshot)
+
+    def close(self):
+        """응답이 끝났을 때 전체 텍스트로 최종 결과를 반환합니다."""
+        return parse_analysis(self.text)
+
+
+def stream_analysis_for_ui(food_name: str, food_data=None, use_cache: bool = True):
+    """
+    get_analysis_for_ui()의 스트리밍 버전입니다. 분석 결과를 받는 대로 지금까지의 결과를 차례로 반환합니다.
+    마지막으로 반환하는 값은 get_analysis_for_ui()의 결과와 같고, 캐시에 있으면 그 결과 하나만 반환합니다.
+
+    Yields:
+        dict: {"score": int 또는 None, "score_text": str 또는 None, "reason": [str, ...], "tips": [str, ...]}
+    """
+    analysis = get_llm_cache().get(food_name, CACHE_PROMPT_VERSION, LLM_MODEL) if use_cache else None
+    if analysis is not None:
+        yield analysis
+        return
+
+    if ANALYSIS_MODE == "direct" and food_data is None:
+        food_data = get_food_nutrition_info([food_name])
+
+    parser = AnalysisStreamParser()
+    last = None
+    for chunk in get_engine().stream(food_name, food_data):
+        partial = parser.feed(chunk)
+        # 화면에 보이는 내용이 바뀐 경우에만 반환합니다.
+        if partial != last:
+            last = partial
+            yield partial
+
+    analysis = parser.close()
+    # 형식에 맞지 않는 응답(팁을 찾지 못한 경우)은 캐시하지 않고 다음 요청에서 다시 시도합니다.
+    if analysis["tips"]:
+        get_llm_cache().put(food_name, CACHE_PROMPT_VERSION, LLM_MODEL, analysis)
+    yield analysis
+
+
+def get_nutrients_for_ui(food_name: str):
+    """
+    UI에 표시할 영양소 데이터를 DB에서 조회합니다. LLM을 호출하지 않으므로 분류 결과와 함께 바로 표시할 수 있습니다.
+
+    Returns:
+        tuple: (DB 영양 정보 딕셔너리 또는 None, UI용 영양소 딕셔너리)
+    """
+    food_data = get_food_nutrition_info([food_name])
+    nutrients = {
+        "열량(kcal)": food_data.get("energy_kcal", 0) if food_data else 0,
+        "탄수화물(g)": food_data.get("carbohydrates_g", 0) if food_data else 0,
+        "단백질(g)": food_data.get("protein_g", 0) if food_data else 0,
+        "지방(g)": food_data.get("fat_g", 0) if food_data else 0,
+        "당(g)": food_data.get("sugars_g", 0) if food_data else 0,
+    }
+    return food_data, nutrients
+
+
+def get_analysis_for_ui(food_name: str, food_data=None, use_cache: bool = True):
+    """
+    LLM 영양 분석 결과(점수/이유/팁)를 반환합니다.
+    같은 음식의 분석 결과는 (음식명, 프롬프트 버전, 모델명) 키로 캐시해서 LLM을 다시 호출하지 않습니다.
+
+    Args:
+        food_name (str): 분석할 음식의 이름.
+        food_data (dict): direct 모드 프롬프트에 사용할 영양 정보. 없으면 DB에서 조회합니다.
+
+    Returns:
+        dict: {"score": int, "score_text": str, "reason": [str, ...], "tips": [str, ...]}
+    """
+    analysis = get_llm_cache().get(food_name, CACHE_PROMPT_VERSION, LLM_MODEL) if use_cache else None
+    if analysis is None:
+        analysis = parse_analysis(ask_llm(food_name, food_data))
+        # 형식에 맞지 않는 응답(팁을 찾지 못한 경우)은 캐시하지 않고 다음 요청에서 다시 시도합니다.
+        if analysis["tips"]:
+            get_llm_cache().put(food_name, CACHE_PROMPT_VERSION, LLM_MODEL, analysis)
+    return analysis
+
+
+def build_ui_result(nutrients, analysis):
+    """영양소 데이터와 LLM 분석 결과를 ask_llm_for_ui() 반환 형식으로 합칩니다."""
+    return {
+        "score": analysis["score"],
         "nutrients": nutrients,
         "analysis": {
-            "score_text": score_text,
-            "reason": reasons,
-            "tips": tips
+            "score_text": analysis["score_text"],
+            "reason": analysis["reason"],
+            "tips": analysis["tips"]
+        }
+    }
+
+
+def ask_llm_for_ui(food_name: str, use_cache: bool = True):
+    """
+    UI에 바로 사용할 수 있는 영양 분석 결과를 반환합니다.
+    같은 음식의 분석 결과는 (음식명, 프롬프트 버전, 모델명) 키로 캐시해서 LLM을 다시 호출하지 않습니다.
+    반환 형식(딕셔너리):
+    {
+        "score": int,  # 건강 점수 (0~100)
+        "nutrients": dict,  # 영양소 데이터
+        "analysis": {
+            "score_text": str,   # 예: "75/100"
+            "reason": [str, ...],  # 이유 
+            "tips": [str, ...]     # 개선 팁 
         }
     }
+    """
+    # 영양소 데이터 (DB에서 가져오기). direct 모드에서는 같은 데이터를 프롬프트에도 사용합니다.
+    food_data, nutrients = get_nutrients_for_ui(food_name)
+    analysis = get_analysis_for_ui(food_name, food_data, use_cache)
+    return build_ui_result(nutrients, analysis)
 
 
 
@@ -1,13 +1,69 @@
 from PIL import Image
 import numpy as np
 
-def get_image_from_uploader(uploaded_file):
+TARGET_SIZE = (224, 224)
+
+# JPEG draft 디코딩 시 목표 크기의 몇 배까지 줄여서 읽을지 정합니다.
+# 너무 작게 읽으면 리사이즈 품질이 떨어지므로 목표 크기의 2배 이상은 유지합니다.
+DRAFT_SCALE = 2
+
+
+def _load_rgb(uploaded_file, target_size):
     img = Image.open(uploaded_file)
+    # 휴대폰 사진(12MP 등)은 JPEG DCT 스케일링으로 1/2~1/8 크기로 바로 디코딩해서 디코딩 비용을 줄입니다.
+    # draft()는 JPEG에만 적용되고 다른 형식에서는 아무 동작도 하지 않습니다.
+    img.draft('RGB', (target_size[0] * DRAFT_SCALE, target_size[1] * DRAFT_SCALE))
     if img.mode != 'RGB':
         img = img.convert('RGB')
-    img = img.resize((224, 224))
-    img_array = np.array(img)
-    img_array = np.expand_dims(img_array, axis=0)
-    img_array = img_array / 255.0
+    return img.resize(target_size)
+
+
+def preprocess_into(uploaded_file, out, target_size=TARGET_SIZE):
+    """
+    업로드된 이미지를 디코딩/리사이즈해서 미리 할당된 float32 버퍼에 0~1 범위로 기록합니다.
+
+    Args:
+        uploaded_file: 파일 경로 또는 파일 객체 (Streamlit UploadedFile 포함)
+        out (np.ndarray): (H, W, 3) 형태의 float32 버퍼
+        target_size (tuple): (너비, 높이)
+
+    Returns:
+        np.ndarray: 값이 채워진 out
+    """
+    img = _load_rgb(uploaded_file, target_size)
+    # uint8 / float32 나눗셈 결과를 out에 바로 기록해서 float64 중간 배열을 만들지 않습니다.
+    np.divide(np.asarray(img, dtype=np.uint8), np.float32(255.0), out=out)
+    return out
+
+
+def get_image_from_uploader(uploaded_file, out=None):
+    """
+    업로드된 이미지 한 장을 모델 입력 형태((1, 224, 224, 3), float32)로 변환합니다.
+    out에 미리 할당한 버퍼를 넘기면 새로 할당하지 않고 재사용합니다.
+    """
+    if out is None:
+        out = np.empty((1,) + TARGET_SIZE[::-1] + (3,), dtype=np.float32)
+    preprocess_into(uploaded_file, out[0])
+
+    return out
+
+
+def get_images_from_uploader(uploaded_files, out=None):
+    """
+    여러 장의 업로드 이미지를 하나의 연속된 (N, 224, 224, 3) float32 배치로 변환합니다.
+    predict_batch()에 그대로 넘길 수 있습니다.
+
+    Args:
+        uploaded_files (list): 업로드된 파일 목록
+        out (np.ndarray): 재사용할 (N 이상, 224, 224, 3) float32 버퍼. 없으면 새로 할당합니다.
+
+    Returns:
+        np.ndarray: (N, 224, 224, 3) 형태의 배치 (out을 넘긴 경우 그 앞부분의 view)
+    """
+    count = len(uploaded_files)
+    if out is None or out.shape[0] < count:
+        out = np.empty((count,) + TARGET_SIZE[::-1] + (3,), dtype=np.float32)
+    for i, uploaded_file in enumerate(uploaded_files):
+        preprocess_into(uploaded_file, out[i])
 
-    return img_array
\ No newline at end of file
+    return out[:count]
@@ -0,0 +1,120 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+# 기본 설정값. 환경 변수(.env) LLM_CACHE_DB, LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES로 바꿀 수 있습니다.
+# 이 모듈은 load_dotenv()보다 먼저 import될 수 있으므로 환경 변수는 get_llm_cache()에서 캐시를 만들 때 읽습니다.
+# LLM 분석 결과 캐시 파일 경로 (기본값: 프로젝트 루트의 llm_cache.db)
+LLM_CACHE_DB = os.path.join(os.path.dirname(__file__), '../../llm_cache.db')
+# 캐시 유효 시간(초). 기본값은 7일입니다.
+LLM_CACHE_TTL = 7 * 24 * 60 * 60
+LLM_CACHE_MAX_ENTRIES = 10000
+
+
+def normalize_food_name(food_name):
+    """DB 검색과 같이 공백을 제거해서 '김치 찌개'와 '김치찌개'를 같은 키로 취급합니다."""
+    return food_name.replace(" ", "").strip()
+
+
+class LLMCache:
+    """
+    음식별 LLM 분석 결과(점수/이유/팁)를 SQLite에 보관하는 캐시입니다.
+    키는 (정규화된 음식명, 프롬프트 버전, 모델명)이며, TTL이 지난 항목은 사용하지 않습니다.
+    """
+
+    def __init__(self, db_path=LLM_CACHE_DB, ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_analysis_cache (
+                food_name TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                model_name TEXT NOT NULL,
+                analysis TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (food_name, prompt_version, model_name)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, food_name, prompt_version, model_name):
+        """
+        캐시된 분석 결과를 반환합니다. 없거나 TTL이 지났으면 None을 반환합니다.
+
+        Returns:
+            dict: {"score": int, "score_text": str, "reason": [str, ...], "tips": [str, ...]}
+        """
+        key = (normalize_food_name(food_name), prompt_version, model_name)
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT analysis FROM llm_analysis_cache
+                WHERE food_name = ? AND prompt_version = ? AND model_name = ? AND created_at >= ?
+                """,
+                key + (time.time() - self.ttl,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, food_name, prompt_version, model_name, analysis):
+        key = (normalize_food_name(food_name), prompt_version, model_name)
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_analysis_cache (food_name, prompt_version, model_name, analysis, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                key + (json.dumps(analysis, ensure_ascii=False), time.time()),
+            )
+            # 만료된 항목과 최대 개수를 넘는 오래된 항목을 정리합니다.
+            self._conn.execute("DELETE FROM llm_analysis_cache WHERE created_at < ?", (time.time() - self.ttl,))
+            self._conn.execute(
+                """
+                DELETE FROM llm_analysis_cache WHERE rowid IN (
+                    SELECT rowid FROM llm_analysis_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_analysis_cache").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """프로세스 전체에서 공유하는 기본 캐시를 반환합니다. 처음 호출될 때 환경 변수 설정으로 한 번만 만듭니다."""
+    global _llm_cache
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMCache(
+                    db_path=os.getenv("LLM_CACHE_DB", LLM_CACHE_DB),
+                    ttl=int(os.getenv("LLM_CACHE_TTL", str(LLM_CACHE_TTL))),
+                    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", str(LLM_CACHE_MAX_ENTRIES))),
+                )
+    return _llm_cache
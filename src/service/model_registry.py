@@ -0,0 +1,137 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+from service.backends import default_backend, load_backend, resolve_model_path
+
+
+class Classifier:
+    """
+    로드가 끝난 분류 모델과 클래스 인덱스를 묶어서 들고 있는 객체입니다.
+    레지스트리가 한 번 만들어 두고 요청마다 재사용합니다.
+    """
+
+    def __init__(self, backend, class_indices, version):
+        self.backend = backend
+        self.class_indices = class_indices
+        # {'갈비구이': 2} -> {2: '갈비구이'} 형태로 뒤집어서 예측 인덱스를 바로 이름으로 바꿀 수 있게 합니다.
+        self.index_to_class = {v: k for k, v in class_indices.items()}
+        self.version = version
+        self.input_shape = backend.input_shape
+
+    def predict_proba(self, img_array):
+        """
+        이미지 배열(배치)을 입력받아 클래스별 확률을 반환합니다.
+
+        Args:
+            img_array (np.ndarray): (N, 224, 224, 3) 형태의 이미지 배열
+
+        Returns:
+            np.ndarray: (N, 클래스 수) 형태의 확률 배열
+        """
+        img_array = np.asarray(img_array, dtype=np.float32)
+        return self.backend.predict_proba(img_array)
+
+    def warmup(self):
+        """그래프 추적과 커널 초기화를 미리 끝내서 첫 요청이 느려지지 않도록 합니다."""
+        self.predict_proba(np.zeros((1,) + self.input_shape, dtype=np.float32))
+
+    def class_name(self, index):
+        return self.index_to_class[int(index)]
+
+
+def _file_signature(path):
+    """파일 변경 여부를 판단하기 위한 (수정시각, 크기) 값을 반환합니다."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _file_digest(*paths):
+    """모델 버전으로 사용할 파일 내용 해시를 계산합니다."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+class ModelRegistry:
+    """
+    (모델 경로, 인덱스 경로, 백엔드) 조합마다 분류 모델을 프로세스당 한 번만 로드해서 보관하는 레지스트리입니다.
+    디스크의 파일이 바뀐 경우(수정시각/크기 변경)에만 다시 로드합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.load_seconds = {}
+
+    def get(self, model_path, indices_path, backend=None):
+        """
+        준비된 Classifier 객체를 반환합니다. 캐시에 없거나 파일이 바뀌었으면 새로 로드합니다.
+
+        Args:
+            model_path (str): Keras 모델 파일 경로. tflite/onnx 백엔드는 같은 이름의 변환 파일을 사용합니다.
+            indices_path (str): class_indices JSON 파일 경로
+            backend (str): 'keras', 'tflite', 'onnx' 중 하나. None이면 PREDICT_BACKEND 설정을 따릅니다.
+
+        Returns:
+            Classifier: 바로 예측에 사용할 수 있는 분류기
+        """
+        backend = backend or default_backend()
+        model_path = resolve_model_path(model_path, backend)
+        key = (os.path.abspath(model_path), os.path.abspath(indices_path), backend)
+        signature = (_file_signature(key[0]), _file_signature(key[1]))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self.hits += 1
+                return entry[1]
+
+            self.misses += 1
+            if entry is not None:
+                self.reloads += 1
+
+            classifier = self._load(*key)
+            self._entries[key] = (signature, classifier)
+            return classifier
+
+    def _load(self, model_path, indices_path, backend):
+        start = time.perf_counter()
+        with open(indices_path, "r", encoding="utf-8") as f:
+            class_indices = json.load(f)
+        version = _file_digest(model_path, indices_path)
+        classifier = Classifier(load_backend(model_path, backend), class_indices, version)
+        classifier.warmup()
+        self.load_seconds[(model_path, indices_path, backend)] = time.perf_counter() - start
+        return classifier
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """로드 시간과 히트/미스 카운터를 딕셔너리로 반환합니다."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "loaded": len(self._entries),
+                "load_seconds": {f"{model} ({backend})": seconds for (model, _, backend), seconds in self.load_seconds.items()},
+            }
+
+
+# 프로세스 전체에서 공유하는 기본 레지스트리
+registry = ModelRegistry()
+
+
+def get_classifier(model_path, indices_path, backend=None):
+    return registry.get(model_path, indices_path, backend)
@@ -1,6 +1,5 @@
-import json
 import numpy as np
-from tensorflow.keras.models import load_model
+from service.model_registry import get_classifier
 
 DB_CONVERT_DIC = {
     "간장게장": "게장_간장",
@@ -28,24 +27,42 @@ DB_CONVERT_DIC = {
 }
 
 def predict(img_array, model_path, indices_path):
-    indices_data = {}
-    with open(indices_path, "r") as f:    
-        indices_data = json.load(f)
+    # 모델과 인덱스는 레지스트리에서 프로세스당 한 번만 로드됩니다.
+    classifier = get_classifier(model_path, indices_path)
+    predictions = classifier.predict_proba(img_array)
 
-    indices_data = {v: k for k, v in indices_data.items()}
+    return _to_result(classifier, predictions[0])
 
-    model = load_model(model_path)
-    # print(model)
-    predictions = model.predict(img_array)
+def predict_batch(img_batch, model_path, indices_path, top_k=1):
+    """
+    여러 장의 이미지를 한 번의 forward pass로 분류합니다.
 
-    predicted_class_index = np.argmax(predictions[0])
-    predicted_class_name = indices_data[predicted_class_index]
-    confidence = predictions[0][predicted_class_index]
+    Args:
+        img_batch (np.ndarray): (N, 224, 224, 3) 형태의 이미지 배치
+        model_path (str): 모델 파일 경로
+        indices_path (str): class_indices JSON 파일 경로
+        top_k (int): 이미지마다 반환할 상위 클래스 수
+
+    Returns:
+        list: 이미지 순서대로 predict()와 같은 형식의 결과 딕셔너리 리스트
+    """
+    classifier = get_classifier(model_path, indices_path)
+    predictions = classifier.predict_proba(img_batch)
+
+    return [_to_result(classifier, probs, top_k) for probs in predictions]
+
+def _to_result(classifier, probs, top_k=1):
+    # 확률이 높은 순서대로 top_k개의 인덱스를 고릅니다.
+    # 동률일 때는 np.argmax와 같이 앞쪽 인덱스가 먼저 오도록 stable 정렬을 사용합니다.
+    top_indices = np.argsort(-probs, kind="stable")[:top_k]
+    confidences = [f"{(probs[i] * 100):.4f}" for i in top_indices]
 
     returned_values = {
-        "predict": [convert_class_name_db(predicted_class_name)],
-        "confidence": f"{(confidence * 100):.4f}"
+        "predict": [convert_class_name_db(classifier.class_name(i)) for i in top_indices],
+        "confidence": confidences[0]
     }
+    if top_k > 1:
+        returned_values["confidences"] = confidences
 
     return returned_values
 
@@ -0,0 +1,46 @@
+"""
+인덱스 JSON에 있는 모든 분류 클래스에 대해 LLM 분석을 미리 실행해서 캐시를 채웁니다.
+이미 유효한 캐시가 있는 음식은 건너뜁니다.
+
+사용 예:
+    python src/service/prewarm_llm_cache.py --indices src/model/models/indices-fine-20250827-161229.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.service.food_nutrition_service import ask_llm_for_ui, CACHE_PROMPT_VERSION, LLM_MODEL
+from src.service.llm_cache import get_llm_cache
+from service.predict import convert_class_name_db
+
+DEFAULT_INDICES_PATH = os.path.join(os.path.dirname(__file__), '../model/models/indices-fine-20250827-161229.json')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="모든 클래스의 LLM 분석 결과를 캐시에 미리 저장합니다.")
+    parser.add_argument("--indices", default=DEFAULT_INDICES_PATH)
+    parser.add_argument("--force", action="store_true", help="캐시가 있어도 다시 분석합니다.")
+    args = parser.parse_args()
+
+    with open(args.indices, "r", encoding="utf-8") as f:
+        class_indices = json.load(f)
+
+    # 서비스와 동일하게 DB 음식명으로 변환한 이름을 기준으로 캐시합니다.
+    food_names = sorted({convert_class_name_db(name) for name in class_indices})
+    print(f"총 {len(food_names)}개 음식 (prompt v{CACHE_PROMPT_VERSION}, {LLM_MODEL})")
+
+    warmed = 0
+    for i, food_name in enumerate(food_names, 1):
+        if not args.force and get_llm_cache().get(food_name, CACHE_PROMPT_VERSION, LLM_MODEL) is not None:
+            continue
+        start = time.perf_counter()
+        try:
+            ask_llm_for_ui(food_name, use_cache=not args.force)
+            warmed += 1
+            print(f"[{i}/{len(food_names)}] {food_name} ({time.perf_counter() - start:.1f}s)")
+        except Exception as e:
+            print(f"[{i}/{len(food_names)}] {food_name} 분석 실패: {e}")
+
+    print(f"완료: {warmed}개 분석, 캐시 상태 {get_llm_cache().stats()}")
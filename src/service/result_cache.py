@@ -0,0 +1,132 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+# 기본 설정값. 환경 변수(.env) RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_DB, RESULT_CACHE_MAX_DISK_ENTRIES로 바꿀 수 있습니다.
+# 이 모듈은 load_dotenv()보다 먼저 import될 수 있으므로 환경 변수는 get_result_cache()에서 캐시를 만들 때 읽습니다.
+# 메모리 캐시에 보관할 최대 결과 수
+RESULT_CACHE_MAX_ENTRIES = 1024
+# 재시작 후에도 유지할 SQLite 캐시 파일 경로. 비워두면 메모리 캐시만 사용합니다.
+RESULT_CACHE_DB = ""
+RESULT_CACHE_MAX_DISK_ENTRIES = 100000
+
+
+def make_cache_key(image_bytes, model_version):
+    """이미지 바이트와 모델 버전으로 캐시 키(sha256)를 만듭니다. 파일명은 사용하지 않습니다."""
+    digest = hashlib.sha256()
+    digest.update(model_version.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(image_bytes)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    이미지 분석 결과(예측, 신뢰도, LLM 분석)를 이미지 내용 해시로 보관하는 캐시입니다.
+    메모리에는 LRU 방식으로 max_entries개까지 보관하고, db_path를 지정하면 SQLite에도 저장해서 재시작 후에도 사용합니다.
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_MAX_ENTRIES, db_path=None, max_disk_entries=RESULT_CACHE_MAX_DISK_ENTRIES):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._conn = None
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS result_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_result_cache_last_access ON result_cache (last_access)")
+            self._conn.commit()
+
+    def get(self, key):
+        """캐시된 결과를 반환합니다. 없으면 None을 반환합니다."""
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return value
+
+            if self._conn is not None:
+                row = self._conn.execute("SELECT value FROM result_cache WHERE cache_key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE result_cache SET last_access = ? WHERE cache_key = ?", (time.time(), key))
+                    self._conn.commit()
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO result_cache (cache_key, value, last_access) VALUES (?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), time.time()),
+                )
+                # 디스크 캐시도 오래 사용하지 않은 항목부터 지워서 크기를 제한합니다.
+                self._conn.execute(
+                    """
+                    DELETE FROM result_cache WHERE cache_key IN (
+                        SELECT cache_key FROM result_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_disk_entries,),
+                )
+                self._conn.commit()
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._memory),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """프로세스 전체에서 공유하는 기본 캐시를 반환합니다. 처음 호출될 때 환경 변수 설정으로 한 번만 만듭니다."""
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache(
+                    max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", str(RESULT_CACHE_MAX_ENTRIES))),
+                    db_path=os.getenv("RESULT_CACHE_DB", RESULT_CACHE_DB) or None,
+                    max_disk_entries=int(os.getenv("RESULT_CACHE_MAX_DISK_ENTRIES", str(RESULT_CACHE_MAX_DISK_ENTRIES))),
+                )
+    return _result_cache
@@ -1,6 +1,6 @@
 import streamlit as st
 from service.img import get_image_from_uploader
-from service.predict import predict
+from service.predict import predict, get_predictor
 from service.api import connection_api
 from streamlit_star_rating import st_star_rating
 import pandas as pd
@@ -83,6 +83,9 @@ def result_fragment():
 
 
 def main():
+    # 앱 시작 시 모델을 미리 로드하고 워밍업합니다. 이후 실행에서는 같은 모델을 그대로 사용합니다.
+    get_predictor()
+
     st.title("🥣 AI 음식 검사")
     st.badge("음식 사진을 업로드해서 좋은 음식인지 나쁜 음식인지 알아보세요", color="blue")
     st.divider()
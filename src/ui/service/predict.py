@@ -1,21 +1,60 @@
 import json
+import threading
 import numpy as np
+import tensorflow as tf
 from tensorflow.keras.models import load_model
 
-def predict(img_array):
-    indices_path = "model/test-indices.json"
-    indices_data = {}
-    with open(indices_path, "r") as f:    
-        indices_data = json.load(f)
+MODEL_PATH = "model/test-model.keras"
+INDICES_PATH = "model/test-indices.json"
+
+_predictor = None
+_predictor_lock = threading.Lock()
+
+
+class Predictor:
+    """
+    로드가 끝난 모델과 클래스 인덱스를 묶어 두는 객체입니다. get_predictor()가 프로세스당 한 번만 만듭니다.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, indices_path=INDICES_PATH):
+        with open(indices_path, "r") as f:
+            indices_data = json.load(f)
+        self.index_to_class = {v: k for k, v in indices_data.items()}
+
+        self.model = load_model(model_path)
+        self.input_shape = tuple(self.model.input_shape[1:])
+        # model.predict() 대신 입력 시그니처를 고정한 tf.function으로 직접 호출해서 한 장 예측 시 재추적 없이 실행합니다.
+        self._infer = tf.function(
+            lambda x: self.model(x, training=False),
+            input_signature=[tf.TensorSpec(shape=(None,) + self.input_shape, dtype=tf.float32)],
+        )
 
-    indices_data = {v: k for k, v in indices_data.items()}
+    def predict_proba(self, img_array):
+        return self._infer(np.asarray(img_array, dtype=np.float32)).numpy()
 
-    model = load_model("model/test-model.keras")
-    # print(model)
-    predictions = model.predict(img_array)
+    def warmup(self):
+        """그래프 추적과 커널 초기화를 미리 끝내서 첫 요청이 느려지지 않도록 합니다."""
+        self.predict_proba(np.zeros((1,) + self.input_shape, dtype=np.float32))
+
+
+def get_predictor():
+    """모델을 처음 호출될 때 한 번만 로드하고 워밍업해서 반환합니다."""
+    global _predictor
+    if _predictor is None:
+        with _predictor_lock:
+            if _predictor is None:
+                predictor = Predictor()
+                predictor.warmup()
+                _predictor = predictor
+    return _predictor
+
+
+def predict(img_array):
+    predictor = get_predictor()
+    predictions = predictor.predict_proba(img_array)
 
     predicted_class_index = np.argmax(predictions[0])
-    predicted_class_name = indices_data[predicted_class_index]
+    predicted_class_name = predictor.index_to_class[predicted_class_index]
     confidence = predictions[0][predicted_class_index]
 
     returned_values = {
@@ -23,4 +62,4 @@ def predict(img_array):
         "confidence": f"{(confidence * 100):.4f}"
     }
 
-    return returned_values
\ No newline at end of file
+    return returned_values
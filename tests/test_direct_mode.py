@@ -0,0 +1,108 @@
+"""
+ANALYSIS_MODE=direct 분석 방식 테스트입니다. OpenAI 대신 LangChain의 FakeListChatModel을 사용하므로 네트워크 없이 실행됩니다.
+
+실행:
+    python -m pytest -q tests
+"""
+import os
+import sys
+import importlib
+
+import pytest
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+# 서비스 모듈은 import 시 OpenAI 클라이언트를 만들므로 실제 키가 없어도 되도록 더미 값을 넣습니다.
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+from src.service.llm_cache import LLMCache
+
+RESPONSE = "1) 건강 점수: 72\n2) 이유:\n* 나트륨이 높습니다.\n3) 개선 팁:\n* 국물을 적게 드세요."
+
+FOOD_ROW = {
+    "food_code": "D101-001",
+    "food_name": "김치찌개",
+    "energy_kcal": 123.4,
+    "protein_g": 8.7,
+    "sodium_mg": 987.6,
+}
+
+
+class RecordingHandler(BaseCallbackHandler):
+    """LLM 호출마다 전달된 메시지를 기록합니다."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.prompts.append("\n".join(str(message.content) for message in messages[0]))
+
+
+@pytest.fixture
+def load_service(monkeypatch, tmp_path):
+    """
+    ANALYSIS_MODE를 지정해서 서비스 모듈을 다시 불러오고, 가짜 LLM 엔진과 임시 LLM 캐시를 연결합니다.
+    반환값: (서비스 모듈, 호출 기록 핸들러)
+    """
+    cache = LLMCache(db_path=str(tmp_path / "llm_cache.db"))
+
+    def load(mode, food_row=FOOD_ROW):
+        monkeypatch.setenv("ANALYSIS_MODE", mode)
+        import src.service.food_nutrition_service as service
+        service = importlib.reload(service)
+
+        handler = RecordingHandler()
+        llm = FakeListChatModel(responses=[RESPONSE], callbacks=[handler])
+        monkeypatch.setattr(service, "_engine", service.NutritionAnalysisEngine(llm=llm))
+        monkeypatch.setattr(service, "get_llm_cache", lambda: cache)
+        monkeypatch.setattr(service, "get_food_nutrition_info", lambda names: food_row)
+        # 에이전트의 get_food_info 도구도 실제 DB를 읽지 않도록 합니다.
+        monkeypatch.setattr(service.DB, "get_food_info_by_name", lambda name: [food_row] if food_row else [])
+        return service, handler
+
+    return load
+
+
+def test_direct_mode_calls_llm_once_with_db_nutrients(load_service):
+    service, handler = load_service("direct")
+
+    result = service.ask_llm_for_ui("김치찌개")
+
+    assert len(handler.prompts) == 1
+    prompt = handler.prompts[0]
+    assert "987.6" in prompt
+    assert "123.4" in prompt
+    assert "get_food_info" not in prompt
+    assert result["score"] == 72
+    assert result["analysis"]["tips"] == ["국물을 적게 드세요."]
+    assert result["nutrients"]["열량(kcal)"] == 123.4
+
+
+def test_direct_mode_falls_back_to_agent_on_db_miss(load_service):
+    service, handler = load_service("direct", food_row=None)
+
+    result = service.ask_llm_for_ui("없는음식")
+
+    # 영양 데이터가 없으면 도구(get_food_info)를 사용하는 에이전트 프롬프트로 호출합니다.
+    assert len(handler.prompts) == 1
+    assert "get_food_info" in handler.prompts[0]
+    assert result["score"] == 72
+    assert result["nutrients"]["열량(kcal)"] == 0
+
+
+def test_analysis_mode_is_part_of_cache_key(load_service):
+    service, agent_handler = load_service("agent")
+    agent_version = service.CACHE_PROMPT_VERSION
+    service.ask_llm_for_ui("김치찌개")
+    assert len(agent_handler.prompts) == 1
+
+    # 같은 음식이라도 agent 모드에서 캐시한 결과는 direct 모드에서 사용하지 않습니다.
+    service, direct_handler = load_service("direct")
+    assert service.CACHE_PROMPT_VERSION != agent_version
+    assert "direct" in service.CACHE_PROMPT_VERSION
+    service.ask_llm_for_ui("김치찌개")
+    assert len(direct_handler.prompts) == 1
+
+    # direct 모드에서 다시 요청하면 캐시를 사용해서 LLM을 호출하지 않습니다.
+    service.ask_llm_for_ui("김치찌개")
+    assert len(direct_handler.prompts) == 1